@@ -1,13 +1,18 @@
+import importlib
 import streamlit as st
-import pandas as pd
-from pathlib import Path
-import os
 from streamlit_option_menu import option_menu
-import plotly.express as px
-from collections import Counter
-from home import home
-from competitor import competitor
-from issues import issues
+from profiler import start_run, render_panel
+from warmup import load_bundle
+
+# Navigation label -> (module, icon); a page's module is only imported once it is selected
+PAGES = {
+    'Home': ('home', 'house'),
+    'Competitor Analysis': ('competitor', 'bar-chart-line'),
+    'Issues Analysis': ('issues', 'list-check'),
+    'Link Structure': ('links', 'diagram-3'),
+    'Crawl Changes': ('changes', 'clock-history'),
+    'SERP Snippets': ('serp', 'search'),
+}
 
 st.set_page_config(
     page_title="Splashtop Content Analysis",
@@ -54,8 +59,8 @@ with st.sidebar:
     st.divider()
     selected = option_menu(
         'Navigation',
-        ['Home', 'Competitor Analysis', 'Issues Analysis'],
-        icons=['house', 'bar-chart-line', 'list-check'],
+        list(PAGES),
+        icons=[icon for _, icon in PAGES.values()],
         default_index=0,
         menu_icon="cast"
     )
@@ -67,6 +72,9 @@ with st.sidebar:
             <li>Content analysis</li>
             <li>Competitor analysis</li>
             <li>Issues tracking</li>
+            <li>Internal link structure</li>
+            <li>Crawl-to-crawl changes</li>
+            <li>SERP title and description widths</li>
         </ul>
         <p>Navigate through different sections to explore various aspects of the analysis.</p>
     </div>
@@ -75,11 +83,14 @@ with st.sidebar:
         '<h4>Made in &nbsp<img src="https://streamlit.io/images/brand/streamlit-mark-color.png" alt="Streamlit logo" height="16">&nbsp by <a href="https://github.com/naveen3830"> @Naveen</a></h4>',
             unsafe_allow_html=True,
         )
-if selected == "Home":
-    home()
-    
-elif selected == "Competitor Analysis":
-    competitor()
-    
-elif selected == "Issues Analysis":
-    issues()
\ No newline at end of file
+    profiling = st.toggle("Profile page sections", value=False, key="profiling")
+
+start_run(profiling)
+page = PAGES[selected][0]
+module = importlib.import_module(page)
+# Seeds the caches the page uses from the prebuilt bundle (see warmup.py)
+load_bundle(page)
+getattr(module, page)()
+
+with st.sidebar:
+    render_panel()
@@ -0,0 +1,182 @@
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import subprocess
+import numpy as np
+import pandas as pd
+from data_loader import DATA_DIR
+
+BENCHMARK_DIR = "benchmarks"
+SIZES = [1_000, 100_000, 1_000_000]
+PAGES = ['home', 'competitor', 'issues', 'links']
+# Exports whose size scales with the crawl; everything else in Data is copied as-is
+SCALED_EXPORTS = re.compile(r'^(internal_all|analysis_results|issues_overview_report|serp_summary)[^.]*\.csv$')
+
+
+def _scale_export(df, rows, rng):
+    # Resample real rows so every column keeps its dtype and value distribution,
+    # then make the identifying columns unique again
+    sample = df.iloc[rng.integers(0, len(df), rows)].reset_index(drop=True)
+    if 'URL_ID' in sample:
+        sample['URL_ID'] = np.arange(1, rows + 1)
+    for column in ('Address', 'URL'):
+        if column in sample:
+            # The first row keeps the crawl's start URL (home page)
+            sample.loc[0, column] = df[column].iloc[0]
+            sample.loc[1:, column] = df[column].iloc[0].rstrip('/') + '/bench/' + pd.Series(np.arange(1, rows), index=range(1, rows)).astype(str)
+    if 'Hash' in sample:
+        sample['Hash'] = [f'{value:032x}' for value in rng.integers(0, 1 << 62, rows)]
+    return sample
+
+
+def generate(rows, output_dir, source_dir=DATA_DIR, seed=0):
+    # Writes a copy of Data where the crawl exports have `rows` rows each
+    rng = np.random.default_rng(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    for file_name in sorted(os.listdir(source_dir)):
+        source = os.path.join(source_dir, file_name)
+        if not os.path.isfile(source) or not file_name.endswith('.csv'):
+            continue
+        if SCALED_EXPORTS.match(file_name):
+            with open(source, 'rb') as file:
+                encoding = 'utf-8-sig' if file.read(3) == b'\xef\xbb\xbf' else 'utf-8'
+            df = pd.read_csv(source, encoding='utf-8-sig')
+            _scale_export(df, rows, rng).to_csv(os.path.join(output_dir, file_name), index=False, encoding=encoding)
+        else:
+            shutil.copy(source, output_dir)
+    return output_dir
+
+
+def _count_payload():
+    # Adds up the size of every message the page sends to the browser
+    from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+    counter = {'bytes': 0}
+    enqueue = ForwardMsgQueue.enqueue
+
+    def counting_enqueue(self, msg):
+        counter['bytes'] += msg.ByteSize()
+        return enqueue(self, msg)
+
+    ForwardMsgQueue.enqueue = counting_enqueue
+    return counter
+
+
+def _peak_rss_mb():
+    # VmHWM starts fresh in every process; ru_maxrss on Linux also counts the memory
+    # the parent had before exec, which would include the data generator
+    try:
+        with open('/proc/self/status') as file:
+            for line in file:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure_page(page):
+    # Runs in a fresh interpreter with SPLASHTOP_DATA_DIR set, so caches start cold
+    # and peak RSS belongs to this page alone
+    from streamlit.testing.v1 import AppTest
+    import data_loader
+    import figure_cache
+
+    payload = _count_payload()
+    app = AppTest.from_string(f"from {page} import {page}\n{page}()", default_timeout=3600)
+    start = time.perf_counter()
+    app.run()
+    first_run = time.perf_counter() - start
+    first_payload = payload['bytes']
+
+    start = time.perf_counter()
+    app.run()
+    rerun = time.perf_counter() - start
+    return {
+        'page': page,
+        'first_run_seconds': round(first_run, 4),
+        'rerun_seconds': round(rerun, 4),
+        'load_seconds': round(data_loader.cache_stats()['load_seconds'], 4),
+        'figure_build_seconds': round(figure_cache.cache_stats()['build_seconds'], 4),
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+        'payload_bytes': first_payload,
+        'rerun_payload_bytes': payload['bytes'] - first_payload,
+        'exceptions': [str(exception.value) for exception in app.exception],
+    }
+
+
+def run_page(page, data_dir):
+    env = dict(os.environ, SPLASHTOP_DATA_DIR=os.path.abspath(data_dir))
+    here = os.path.dirname(os.path.abspath(__file__))
+    process = subprocess.run([sys.executable, os.path.join(here, 'benchmark.py'), '--measure', page], env=env, cwd=here,
+                             capture_output=True, text=True)
+    if process.returncode != 0:
+        # A page killed for running out of memory is a result too, not a benchmark failure
+        lines = process.stderr.strip().splitlines()
+        if process.returncode < 0:
+            reason = f'killed by signal {-process.returncode}'
+        else:
+            reason = lines[-1] if lines else f'exited with status {process.returncode}'
+        return {'page': page, 'error': reason}
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def _version():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_benchmarks(sizes=SIZES, pages=PAGES, output_dir=BENCHMARK_DIR, regenerate=False):
+    import plotly
+    import streamlit
+    version = _version()
+    results = []
+    for rows in sizes:
+        data_dir = os.path.join(output_dir, 'data', str(rows))
+        if regenerate or not os.path.isdir(data_dir):
+            start = time.perf_counter()
+            generate(rows, data_dir)
+            print(f"Generated {rows:,}-row exports in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        for page in pages:
+            result = dict(run_page(page, data_dir), rows=rows)
+            if 'error' in result:
+                print(f"{page} @ {rows:,} rows: {result['error']}", file=sys.stderr)
+            else:
+                print(f"{page} @ {rows:,} rows: {result['first_run_seconds']}s, {result['peak_rss_mb']} MB, {result['payload_bytes']:,} bytes", file=sys.stderr)
+            results.append(result)
+
+    report = {
+        'version': version,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'plotly': plotly.__version__,
+        'streamlit': streamlit.__version__,
+        'results': results,
+    }
+    path = os.path.join(output_dir, f'results-{version}.json')
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=1)
+    return path
+
+
+if __name__ == "__main__":
+    # python benchmark.py [--sizes 1000 100000] [--pages home issues] [--regenerate]
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard pages on synthetic crawl exports")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--pages', nargs='+', default=PAGES, choices=PAGES)
+    parser.add_argument('--output-dir', default=BENCHMARK_DIR)
+    parser.add_argument('--regenerate', action='store_true')
+    parser.add_argument('--measure', choices=PAGES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        print(json.dumps(measure_page(args.measure)))
+    else:
+        print(run_benchmarks(args.sizes, args.pages, args.output_dir, args.regenerate))
@@ -0,0 +1,80 @@
+import streamlit as st
+from crawl_diff import CHANGE_TYPES, DIFF_COLUMNS, find_crawls, crawl_diff, change_summary
+from figure_cache import cached_figure, dataset_fingerprint
+from sites import SITES, site_names
+from table_view import table_view
+from profiler import profiled, plotly_chart
+
+@profiled("changes")
+def changes():
+    st.markdown("<h1 style='text-align: center;'>Crawl Changes</h1><hr style='border: 2px solid rainbow; border-radius: 5px;'>", unsafe_allow_html=True)
+
+    site = st.selectbox("Website", site_names(), key="changes_site")
+    internal_file = SITES[site]['internal_file']
+    crawls = find_crawls(internal_file)
+    if len(crawls) < 2:
+        st.info(f"""Only one crawl of {site} is available. Save each weekly Screaming Frog **Internal → All** export as
+        `Data/{internal_file[:-len('.csv')]}_<YYYY-MM-DD>.csv` (the undated `{internal_file}` is the latest crawl) to compare crawls.""")
+        return
+
+    labels = [crawl for crawl, _ in crawls]
+    files = dict(crawls)
+    col1, col2 = st.columns(2)
+    with col1:
+        old = st.selectbox("Previous crawl", labels, index=len(labels) - 2, key="changes_old")
+    with col2:
+        new = st.selectbox("Current crawl", labels, index=len(labels) - 1, key="changes_new")
+    if old == new:
+        st.info("Select two different crawls to compare.")
+        return
+    log = crawl_diff(files[old], files[new])
+
+    st.markdown(f"""### Data Overview
+    This page lists what changed on the {site} website between the {old} and {new} crawls: pages that were added or removed,
+    and edits to status codes, indexability, titles, meta descriptions, headings, canonicals and word counts.
+    """)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Added URLs", f"{(log['Change'] == 'Added').sum():,}")
+    col2.metric("Removed URLs", f"{(log['Change'] == 'Removed').sum():,}")
+    col3.metric("Changed URLs", f"{log.loc[log['Change'] == 'Changed', 'Address'].nunique():,}")
+    col4.metric("Changed Fields", f"{(log['Change'] == 'Changed').sum():,}")
+    st.divider()
+
+    st.subheader("Changes by Field",divider='rainbow')
+    st.write("This chart counts the changes of each kind, so sitewide edits such as a new title template stand out.")
+
+    fig1 = cached_figure(change_summary(log), {
+        'chart': 'bar',
+        'args': dict(x='Count', y='Column', color='Change', orientation='h', title='Changes by Field'),
+        'layout': dict(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', yaxis=dict(categoryorder='total ascending'))})
+
+    plotly_chart(fig1, use_container_width=True)
+    st.divider()
+
+    st.subheader("Change Log",divider='rainbow')
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        change_types = st.multiselect("Change", CHANGE_TYPES, default=CHANGE_TYPES, key="changes_types")
+    with col2:
+        fields = st.multiselect("Field", DIFF_COLUMNS, key="changes_fields", placeholder="All fields")
+    with col3:
+        min_swing = st.number_input("Minimum word count swing", min_value=0, value=0, step=50, key="changes_swing")
+    search = st.text_input("Address contains", key="changes_search")
+
+    mask = log['Change'].isin(change_types)
+    if fields:
+        mask &= log['Column'].isin(fields) | (log['Change'] != 'Changed')
+    if min_swing:
+        mask &= (log['Column'] != 'Word Count') | (log['Delta'].abs() >= min_swing)
+    if search:
+        mask &= log['Address'].str.contains(search, case=False, regex=False)
+    filtered = log[mask]
+
+    st.write(f"{len(filtered):,} of {len(log):,} changes")
+    # The filtered log is a new frame per filter combination, so its table is keyed on the filters,
+    # and its CSV is only built when downloaded
+    table_view(filtered, key="changes_log",
+               query_key=(dataset_fingerprint(log), tuple(change_types), tuple(fields), min_swing, search))
+    st.download_button("Download change log (CSV)", lambda: filtered.to_csv(index=False), file_name=f"changes_{old}_{new}.csv", mime="text/csv")
+    st.divider()
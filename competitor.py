@@ -1,9 +1,13 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from figure_cache import cached_figure, merge_specs
+from keyword_gap import load_rankings, keyword_gap, competitor_columns
+from sites import PRIMARY_SITE
+from table_view import table_view
+from profiler import profiled, plotly_chart
 
+SHORT_NAMES = {'GoogleRemoteDesktop': 'Google RD'}
+
+@profiled("competitor")
 def competitor():
     st.markdown(
         """
@@ -48,93 +52,90 @@ def competitor():
         """, unsafe_allow_html=True
     )
     
-    st.markdown("""
+    st.markdown(f"""
     <div style="text-align: center;">
-        <h1>Splashtop Competitor Analysis Dashboard</h1>
+        <h1>{PRIMARY_SITE} Competitor Analysis Dashboard</h1>
     </div>
 """, unsafe_allow_html=True)
     
-    st.markdown("""
+    st.markdown(f"""
         <div style="text-align: center; font-size: 1.2em; color: #666; padding-bottom: 20px;">
-            The remote desktop market has witnessed significant growth, with various players competing for market share. This analysis compares Splashtop with its top competitors.
+            The remote desktop market has witnessed significant growth, with various players competing for market share. This analysis compares {PRIMARY_SITE} with its top competitors.
         </div>
     """, unsafe_allow_html=True)
 
-    data = {'Keyword': ['remote desktop', 'remote pc', 'go to my pc', 'teamviewer remote control', 'remote pc login', 
-                    'remotepc login', 'remote desktop software', 'remote desktop programs', 'teamviewer free', 
-                    'windows remote desktop'],
-        'Intent': ['NT', 'I', 'NT', 'N', 'NT', 'NT', 'C', 'I', 'IT', 'I'],
-        'Splashtop': [31, 14, 21, 27, 15, 24, 26, 16, 9, 46],
-        'TeamViewer': [7, 6, 63, 1, 13, 39, 2, 3, 1, 31],
-        'AnyViewer': [68, 94, 37, 29, 58, 48, 14, 13, 22, 76],
-        'GoogleRemoteDesktop': [15, 2, 57, 59, 2, 2, 6, 9, 94, 23],
-        'Volume': [74000, 18100, 9900, 8100, 6600, 6600, 5400, 4400, 4400, 4400],
-        'KD%': [98, 93, 62, 69, 77, 61, 94, 84, 44, 75],
-        'CPC': [3.68, 3.34, 9.94, 6.45, 1.01, 1.01, 4.66, 4.66, 2.50, 3.90],
-        'Competition': [0.1, 0.08, 0.2, 0.24, 0.11, 0.11, 0.26, 0.26, 0.19, 0.11]
-    }
-
-    df = pd.DataFrame(data)
+    df = load_rankings()
+    if PRIMARY_SITE not in competitor_columns(df):
+        st.warning(f"""The rank export `Data/keyword_rankings.csv` has no **{PRIMARY_SITE}** column. Add {PRIMARY_SITE}'s ranking
+        positions as a column next to the competitors' to compare them.""")
+        return
+    gaps = keyword_gap(df, PRIMARY_SITE)
+    competitors = gaps['competitors']
+    # Per-keyword charts draw the highest-volume slice only; the table below pages through every keyword
+    top, plotted = gaps['top_keywords'], gaps['plotted_keywords']
     
-    def create_styled_figure(fig):
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(family="Helvetica Neue, Helvetica, Arial, sans-serif", size=12, color="#2c3e50"),
-            margin=dict(l=50, r=50, t=50, b=50),
-            legend=dict(
-                bgcolor='rgba(255,255,255,0.8)',
-                bordercolor='rgba(0,0,0,0)'
-            )
-        )
-        fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='#E5E5E5')
-        fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='#E5E5E5')
-        return fig
+    def create_styled_figure(data, spec):
+        style = {
+            'layout': dict(
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                font=dict(family="Helvetica Neue, Helvetica, Arial, sans-serif", size=12, color="#2c3e50"),
+                margin=dict(l=50, r=50, t=50, b=50),
+                legend=dict(
+                    bgcolor='rgba(255,255,255,0.8)',
+                    bordercolor='rgba(0,0,0,0)'
+                )
+            ),
+            'xaxes': dict(showgrid=True, gridwidth=1, gridcolor='#E5E5E5'),
+            'yaxes': dict(showgrid=True, gridwidth=1, gridcolor='#E5E5E5'),
+        }
+        return cached_figure(data, merge_specs(spec, style))
     
     st.markdown("<h1 style='text-align: center;'>Competitor Ranking Comparison</h1><hr style='border: 2px solid rainbow; border-radius: 5px;'>", unsafe_allow_html=True)
-    st.write("This bar chart compares how each competitor ranks for specific keywords. A lower ranking position is better.")
+    st.write(f"This bar chart compares how each competitor ranks for the {len(top)} highest-volume keywords. A lower ranking position is better.")
 
-    fig1 = px.bar(df, x='Keyword', y=['Splashtop', 'TeamViewer', 'AnyViewer', 'GoogleRemoteDesktop'],
+    fig1 = create_styled_figure(top, {
+        'chart': 'bar',
+        'args': dict(x='Keyword', y=competitors,
                 title='Competitor Ranking Comparison', barmode='group',
                 labels={'value': 'Ranking Position', 'variable': 'Competitor'},
-                hover_data=['Volume', 'KD%', 'CPC'])
-    fig1.update_layout(yaxis_title='Ranking Position (Lower is Better)')
-    fig1 = create_styled_figure(fig1)
+                hover_data=['Volume', 'KD%', 'CPC']),
+        'layout': dict(yaxis_title='Ranking Position (Lower is Better)')})
     with st.expander("Click to view the dataset"):
-        st.dataframe(df)
-    st.plotly_chart(fig1, use_container_width=True)
+        table_view(df, key="competitor_dataset")
+    plotly_chart(fig1, use_container_width=True)
     
     st.markdown("<h1 style='text-align: center;'>Keyword Difficulty vs. Search Volume</h1><hr style='border: 2px solid rainbow; border-radius: 5px;'>", unsafe_allow_html=True)
     
-    st.write("This scatter plot visualizes the relationship between keyword difficulty (KD%) and search volume. The size of the bubbles represents the cost per click (CPC), and the color indicates the intent behind the keyword.")
+    st.write(f"This scatter plot visualizes the relationship between keyword difficulty (KD%) and search volume for the top {len(plotted):,} keywords by volume. The size of the bubbles represents the cost per click (CPC), and the color indicates the intent behind the keyword.")
 
-    fig2 = px.scatter(df, x='KD%', y='Volume', size='CPC', color='Intent', hover_name='Keyword',
+    fig2 = create_styled_figure(plotted, {
+        'chart': 'scatter',
+        'args': dict(x='KD%', y='Volume', size='CPC', color='Intent', hover_name='Keyword',
                     title='Keyword Difficulty vs. Search Volume',
-                    labels={'KD%': 'Keyword Difficulty (%)', 'Volume': 'Search Volume', 'CPC': 'Cost Per Click'})
-    fig2 = create_styled_figure(fig2)
-    st.plotly_chart(fig2, use_container_width=True)
+                    labels={'KD%': 'Keyword Difficulty (%)', 'Volume': 'Search Volume', 'CPC': 'Cost Per Click'})})
+    plotly_chart(fig2, use_container_width=True)
 
-    st.markdown("<h1 style='text-align: center;'>Splashtop's Ranking and Market Share</h1><hr style='border: 2px solid rainbow; border-radius: 5px;'>", unsafe_allow_html=True)
+    st.markdown(f"<h1 style='text-align: center;'>{PRIMARY_SITE}'s Ranking and Market Share</h1><hr style='border: 2px solid rainbow; border-radius: 5px;'>", unsafe_allow_html=True)
     col1, col2 = st.columns(2)
 
     with col1:
-        st.subheader("Splashtop's Ranking by Keyword")
-        st.write("This heatmap shows Splashtop's ranking for each keyword, where a lower value indicates a higher ranking position.")
-        fig3 = px.imshow(df.set_index('Keyword')[['Splashtop']], 
-                        labels=dict(x="Metric", y="Keyword", color="Ranking"),
-                        title="Splashtop's Ranking by Keyword")
-        fig3 = create_styled_figure(fig3)
-        st.plotly_chart(fig3, use_container_width=True)
+        st.subheader(f"{PRIMARY_SITE}'s Ranking by Keyword")
+        st.write(f"This heatmap shows {PRIMARY_SITE}'s ranking for the {len(top)} highest-volume keywords, where a lower value indicates a higher ranking position.")
+        fig3 = create_styled_figure(top.set_index('Keyword')[[PRIMARY_SITE]], {
+            'chart': 'imshow',
+            'args': dict(labels=dict(x="Metric", y="Keyword", color="Ranking"),
+                        title=f"{PRIMARY_SITE}'s Ranking by Keyword")})
+        plotly_chart(fig3, use_container_width=True)
 
     with col2:
         st.subheader("Estimated Competitor Market Share")
         st.write("This pie chart shows the estimated market share based on which competitor has the top ranking position for each keyword.")
-        top_rankings = df[['Splashtop', 'TeamViewer', 'AnyViewer', 'GoogleRemoteDesktop']].apply(lambda x: x == x.min(), axis=1)
-        market_share = top_rankings.sum() / len(df) * 100
-        fig4 = px.pie(values=market_share, names=market_share.index, 
-                    title='Estimated Market Share (Based on Top Rankings)')
-        fig4 = create_styled_figure(fig4)
-        st.plotly_chart(fig4, use_container_width=True)
+        fig4 = create_styled_figure(gaps['top_share'], {
+            'chart': 'pie',
+            'args': dict(values='Share', names='Competitor', labels={'Competitor': 'label', 'Share': 'value'},
+                    title='Estimated Market Share (Based on Top Rankings)')})
+        plotly_chart(fig4, use_container_width=True)
 
     st.markdown("<h1 style='text-align: center;'>Keyword Intent Distribution</h1><hr style='border: 2px solid rainbow; border-radius: 5px;'>", unsafe_allow_html=True)
     st.write("This bar chart shows the distribution of keyword intents. Different types of intents (Informational, Navigational, etc.) help us understand the user's search behavior.")
@@ -142,28 +143,59 @@ def competitor():
     intent_counts = df['Intent'].value_counts().reset_index()
     intent_counts.columns = ['Intent', 'Count']
 
-    fig5 = px.bar(intent_counts, x='Intent', y='Count', 
+    fig5 = create_styled_figure(intent_counts, {
+        'chart': 'bar',
+        'args': dict(x='Intent', y='Count',
                 title='Keyword Intent Distribution',
-                labels={'Count': 'Number of Keywords'})
-    fig5 = create_styled_figure(fig5)
-    st.plotly_chart(fig5, use_container_width=True)
+                labels={'Count': 'Number of Keywords'})})
+    plotly_chart(fig5, use_container_width=True)
     
     st.markdown("<h1 style='text-align: center;'>Competitive Landscape Overview</h1><hr style='border: 2px solid rainbow; border-radius: 5px;'>", unsafe_allow_html=True)
-    st.write("This overview provides insights into ranking distribution, keyword volume vs. difficulty, CPC vs. competition, and keyword intent distribution.")
-
-    fig6 = make_subplots(rows=2, cols=2, 
-                        subplot_titles=("Ranking Distribution", "Volume vs. KD%", 
-                                        "CPC vs. Competition", "Intent Distribution"))
-    fig6.add_trace(go.Box(y=df['Splashtop'], name='Splashtop'), row=1, col=1)
-    fig6.add_trace(go.Box(y=df['TeamViewer'], name='TeamViewer'), row=1, col=1)
-    fig6.add_trace(go.Box(y=df['AnyViewer'], name='AnyViewer'), row=1, col=1)
-    fig6.add_trace(go.Box(y=df['GoogleRemoteDesktop'], name='Google RD'), row=1, col=1)
-    fig6.add_trace(go.Scatter(x=df['KD%'], y=df['Volume'], mode='markers', 
-                            text=df['Keyword'], name='Keywords'), row=1, col=2)
-
-    fig6.add_trace(go.Scatter(x=df['Competition'], y=df['CPC'], mode='markers', 
-                            text=df['Keyword'], name='Keywords'), row=2, col=1)
-    fig6.add_trace(go.Bar(x=intent_counts['Intent'], y=intent_counts['Count'], name='Intent'), row=2, col=2)
-    fig6.update_layout(height=800, title_text="Competitive Landscape Overview")
-    fig6 = create_styled_figure(fig6)
-    st.plotly_chart(fig6, use_container_width=True)
\ No newline at end of file
+    st.write(f"This overview provides insights into ranking distribution, keyword volume vs. difficulty and CPC vs. competition for the top {len(plotted):,} keywords by volume, and the keyword intent distribution of the whole export.")
+
+    fig6 = create_styled_figure(plotted, {
+        'chart': 'subplots',
+        'subplots': dict(rows=2, cols=2,
+                        subplot_titles=("Ranking Distribution", "Volume vs. KD%",
+                                        "CPC vs. Competition", "Intent Distribution")),
+        'traces': [
+            *[dict(type='box', columns={'y': name}, props={'name': SHORT_NAMES.get(name, name)}, row=1, col=1)
+            for name in competitors],
+            dict(type='scatter', columns={'x': 'KD%', 'y': 'Volume', 'text': 'Keyword'},
+                props={'mode': 'markers', 'name': 'Keywords'}, row=1, col=2),
+            dict(type='scatter', columns={'x': 'Competition', 'y': 'CPC', 'text': 'Keyword'},
+                props={'mode': 'markers', 'name': 'Keywords'}, row=2, col=1),
+            dict(type='bar', props={'x': intent_counts['Intent'].tolist(), 'y': intent_counts['Count'].tolist(),
+                'name': 'Intent'}, row=2, col=2),
+        ],
+        'layout': dict(height=800, title_text="Competitive Landscape Overview")})
+    plotly_chart(fig6, use_container_width=True)
+
+    st.markdown("<h1 style='text-align: center;'>Share of Voice</h1><hr style='border: 2px solid rainbow; border-radius: 5px;'>", unsafe_allow_html=True)
+    st.write("""Share of voice estimates how much of the organic traffic for these keywords each competitor captures.
+    Every ranking is weighted by the keyword's search volume and the expected click-through rate of its position, so a first place on a high-volume keyword counts far more than a tenth place.""")
+
+    fig7 = create_styled_figure(gaps['share_of_voice'].sort_values('Share of Voice', ascending=False), {
+        'chart': 'bar',
+        'args': dict(x='Competitor', y='Share of Voice', color='Competitor', hover_data=['Estimated Clicks'],
+                title='Share of Voice (Volume x CTR Weighted)',
+                labels={'Share of Voice': 'Share of Voice (%)'})})
+    plotly_chart(fig7, use_container_width=True)
+
+    st.markdown(f"<h1 style='text-align: center;'>{PRIMARY_SITE} Keyword Gaps</h1><hr style='border: 2px solid rainbow; border-radius: 5px;'>", unsafe_allow_html=True)
+    st.write(f"""**Missing** keywords are ranked by at least one competitor but not by {PRIMARY_SITE}.
+    **Weak** keywords are ones where {PRIMARY_SITE} ranks below every competitor that ranks for them. Both are sorted by search volume.""")
+
+    col3, col4 = st.columns(2)
+    for column, name in [(col3, 'missing'), (col4, 'weak')]:
+        with column:
+            gap = gaps[name]
+            st.subheader(f"{name.capitalize()} Keywords ({len(gap)})")
+            if gap.empty:
+                st.info(f"No {name} keywords in the current rank export.")
+                continue
+            fig = create_styled_figure(gap.head(20), {
+                'chart': 'bar',
+                'args': dict(x='Keyword', y='Volume', hover_data=[PRIMARY_SITE],
+                        title=f'{name.capitalize()} Keywords by Search Volume')})
+            plotly_chart(fig, use_container_width=True)
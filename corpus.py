@@ -0,0 +1,35 @@
+import os
+import re
+
+CORPUS_DIR = "extracted_content"
+
+
+def save_document(folder, url_id, content):
+    os.makedirs(folder, exist_ok=True)
+    filename = os.path.join(folder, f"{url_id}.txt")
+    with open(filename, 'w', encoding='utf-8') as file:
+        file.write(content)
+    return filename
+
+
+def document_ids(folder):
+    if not os.path.isdir(folder):
+        return []
+    return sorted(
+        (os.path.splitext(name)[0] for name in os.listdir(folder) if name.endswith('.txt')),
+        key=lambda url_id: (not url_id.isdigit(), int(url_id) if url_id.isdigit() else 0, url_id),
+    )
+
+
+def read_document(folder, url_id):
+    with open(os.path.join(folder, f"{url_id}.txt"), encoding='utf-8') as file:
+        return file.read()
+
+
+def iter_documents(folder):
+    for url_id in document_ids(folder):
+        yield url_id, read_document(folder, url_id)
+
+
+def tokenize(text):
+    return re.findall(r"[a-z0-9]+(?:['’][a-z]+)?", text.lower())
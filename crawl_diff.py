@@ -0,0 +1,139 @@
+import os
+import re
+import sys
+import numpy as np
+import pandas as pd
+from cache import LRUCache
+from data_loader import DATA_DIR
+from ingest import iter_export
+from issues_cube import LATEST_CRAWL
+from profiler import section
+
+# Compared fields of an internal_all export; Address is the join key
+DIFF_COLUMNS = [
+    'Status Code', 'Indexability', 'Indexability Status', 'Title 1', 'Meta Description 1',
+    'H1-1', 'Canonical Link Element 1', 'Word Count',
+]
+NUMERIC_COLUMNS = ['Status Code', 'Word Count']
+CHANGE_TYPES = ['Added', 'Removed', 'Changed']
+
+_diffs = LRUCache(max_entries=8, sizeof=lambda log: int(log.memory_usage(deep=True).sum()))
+
+
+def find_crawls(internal_file, folder=DATA_DIR):
+    # Weekly crawls are saved as internal_all[_<site>]_<YYYY-MM-DD>.csv next to the
+    # undated export, which is the latest crawl
+    pattern = re.compile(re.escape(internal_file[:-len('.csv')]) + r'(?:_(?P<crawl>\d{4}-\d{2}-\d{2}))?\.csv$')
+    crawls = []
+    for file_name in sorted(os.listdir(folder)):
+        match = pattern.match(file_name)
+        if match:
+            crawls.append((match.group('crawl') or LATEST_CRAWL, file_name))
+    return sorted(crawls, key=lambda crawl: (crawl[0] == LATEST_CRAWL, crawl[0]))
+
+
+def normalize_addresses(addresses):
+    # Scheme and host are case-insensitive; fragments and trailing slashes don't change the page
+    addresses = addresses.astype(str).str.strip().str.replace(r'#.*$', '', regex=True)
+    parts = addresses.str.extract(r'^([^:/?#]+://[^/?#]*)(.*)$')
+    normalized = parts[0].str.lower() + parts[1].str.replace(r'/+$', '', regex=True)
+    return normalized.fillna(addresses)
+
+
+def _column_hash(values, column):
+    if column in NUMERIC_COLUMNS:
+        values = pd.to_numeric(values, errors='coerce').astype(float)
+    else:
+        values = values.astype(object).where(values.notna(), '').astype(str).str.strip()
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def hash_export(path, columns=DIFF_COLUMNS):
+    # One pass over the export keeping only a uint64 per row for the address and for
+    # each compared column, so memory stays at 8 bytes per cell whatever the text length
+    keys, hashes = [], []
+    with section(f"hash {os.path.basename(path)}"):
+        for chunk in iter_export(path, ['Address'] + columns, html_only=False, indexable_only=False):
+            keys.append(pd.util.hash_pandas_object(normalize_addresses(chunk['Address']), index=False).to_numpy())
+            # A column missing from an older export compares as blank
+            hashes.append(np.column_stack([
+                _column_hash(chunk[column] if column in chunk else pd.Series('', index=chunk.index), column)
+                for column in columns]))
+    if not keys:
+        return np.zeros(0, np.uint64), np.zeros((0, len(columns)), np.uint64)
+    return np.concatenate(keys), np.concatenate(hashes)
+
+
+def _fetch_rows(path, rows, columns=DIFF_COLUMNS):
+    # Second pass: materializes only the rows that appear in the change log
+    wanted = np.sort(np.asarray(rows, dtype=np.int64))
+    found, offset = [], 0
+    for chunk in iter_export(path, ['Address'] + columns, html_only=False, indexable_only=False):
+        positions = wanted[(wanted >= offset) & (wanted < offset + len(chunk))]
+        if len(positions):
+            found.append(chunk.iloc[positions - offset].set_axis(positions).reindex(columns=['Address'] + columns).astype(object))
+        offset += len(chunk)
+    return pd.concat(found) if found else pd.DataFrame(columns=['Address'] + columns)
+
+
+def diff_exports(old_path, new_path, columns=DIFF_COLUMNS):
+    old_keys, old_hashes = hash_export(old_path, columns)
+    new_keys, new_hashes = hash_export(new_path, columns)
+
+    # Hash join on the normalized address; a URL crawled twice keeps its first row
+    old_rows = np.flatnonzero(~pd.Index(old_keys).duplicated())
+    new_rows = np.flatnonzero(~pd.Index(new_keys).duplicated())
+    matches = pd.Index(old_keys[old_rows]).get_indexer(new_keys[new_rows])
+    matched = matches >= 0
+    added = new_rows[~matched]
+    removed = np.setdiff1d(old_rows, old_rows[matches[matched]])
+    old_matched, new_matched = old_rows[matches[matched]], new_rows[matched]
+    changed_row, changed_column = np.nonzero(old_hashes[old_matched] != new_hashes[new_matched])
+
+    old_values = _fetch_rows(old_path, np.concatenate([removed, old_matched[changed_row]]), columns)
+    new_values = _fetch_rows(new_path, np.concatenate([added, new_matched[changed_row]]), columns)
+    cells = pd.DataFrame({
+        'Address': new_values['Address'].reindex(new_matched[changed_row]).to_numpy(),
+        'Change': 'Changed',
+        'Column': np.array(columns, dtype=object)[changed_column],
+        'Old': old_values.to_numpy()[old_values.index.get_indexer(old_matched[changed_row]), changed_column + 1] if len(changed_row) else [],
+        'New': new_values.to_numpy()[new_values.index.get_indexer(new_matched[changed_row]), changed_column + 1] if len(changed_row) else [],
+    })
+    log = pd.concat([
+        pd.DataFrame({'Address': new_values['Address'].reindex(added).to_numpy(), 'Change': 'Added'}),
+        pd.DataFrame({'Address': old_values['Address'].reindex(removed).to_numpy(), 'Change': 'Removed'}),
+        cells,
+    ], ignore_index=True)
+
+    numeric = log['Column'].isin(NUMERIC_COLUMNS)
+    log['Delta'] = np.where(numeric, pd.to_numeric(log['New'].where(numeric), errors='coerce') - pd.to_numeric(log['Old'].where(numeric), errors='coerce'), np.nan)
+    for column in ('Old', 'New'):
+        log[column] = log[column].where(log[column].notna(), None).astype('string')
+    log['Change'] = pd.Categorical(log['Change'], categories=CHANGE_TYPES)
+    log['Column'] = pd.Categorical(log['Column'], categories=columns)
+    return log
+
+
+def crawl_diff(old_file, new_file, folder=DATA_DIR):
+    # Cached on both file versions, like data_loader.load_dataset
+    paths = [os.path.abspath(os.path.join(folder, file_name)) for file_name in (old_file, new_file)]
+    key = tuple((path, os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in paths)
+    log = _diffs.get(key)
+    if log is None:
+        with section(f"diff {old_file} {new_file}"):
+            log = _diffs.put(key, diff_exports(*paths))
+    return log
+
+
+def change_summary(log):
+    counts = log.groupby(['Change', 'Column'], observed=True, dropna=False).size().rename('Count').reset_index()
+    counts['Column'] = counts['Column'].astype(object).fillna('URL')
+    return counts
+
+
+if __name__ == "__main__":
+    # python crawl_diff.py internal_all_2024-10-12.csv internal_all.csv [changes.csv]
+    log = crawl_diff(sys.argv[1], sys.argv[2])
+    if len(sys.argv) > 3:
+        log.to_csv(sys.argv[3], index=False)
+    print(change_summary(log).to_string(index=False))
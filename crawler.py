@@ -0,0 +1,224 @@
+import re
+import sys
+import time
+import random
+import asyncio
+import pandas as pd
+import aiohttp
+from urllib.parse import urljoin, urlsplit, urlunsplit
+from bs4 import BeautifulSoup
+from corpus import save_document
+from sites import PRIMARY_SITE, SITES
+
+USER_AGENT = "Mozilla/5.0 (compatible; SplashtopContentAnalysis/1.0)"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def clean_text(text):
+    # Remove extra whitespace and newlines
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def extract_text(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    # Remove script and style elements
+    for script in soup(["script", "style"]):
+        script.decompose()
+    return clean_text(soup.get_text())
+
+
+def extract_links(html, base_url):
+    # Same-host <a href> targets, resolved against the page URL and normalized
+    host = urlsplit(base_url).netloc.lower()
+    links = []
+    for anchor in BeautifulSoup(html, 'html.parser').find_all('a', href=True):
+        url = urljoin(base_url, anchor['href'])
+        if url.startswith(('http://', 'https://')) and urlsplit(url).netloc.lower() == host:
+            links.append(normalize_url(url))
+    return links
+
+
+def normalize_url(url):
+    parts = urlsplit(str(url).strip())
+    path = parts.path or '/'
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/')
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+
+class TokenBucket:
+    # Allows `rate` requests per second on average with bursts of up to `capacity`
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CrawlStats:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.finished = None
+        self.requests = 0
+        self.pages = 0
+        self.errors = 0
+        self.retries = 0
+        self.not_modified = 0
+        self.callback_errors = 0
+        self.bytes = 0
+        self.latencies = []
+
+    def summary(self):
+        elapsed = (self.finished or time.monotonic()) - self.started
+        latencies = sorted(self.latencies)
+
+        def percentile(q):
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else 0.0
+
+        return {
+            'pages': self.pages,
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'not_modified': self.not_modified,
+            'callback_errors': self.callback_errors,
+            'bytes': self.bytes,
+            'elapsed_seconds': elapsed,
+            'pages_per_second': self.pages / elapsed if elapsed else 0.0,
+            'latency_p50': percentile(0.5),
+            'latency_p95': percentile(0.95),
+        }
+
+
+async def fetch(session, url, bucket, stats, retries=3, backoff=0.5, headers=None):
+    for attempt in range(retries + 1):
+        await bucket.acquire()
+        start = time.monotonic()
+        stats.requests += 1
+        try:
+            async with session.get(url, headers=headers) as response:
+                body = await response.read()
+                elapsed = time.monotonic() - start
+                if response.status in RETRY_STATUSES and attempt < retries:
+                    retry_after = response.headers.get('Retry-After', '')
+                    delay = float(retry_after) if retry_after.isdigit() else backoff * 2 ** attempt
+                    stats.retries += 1
+                    await asyncio.sleep(delay + random.uniform(0, backoff))
+                    continue
+                stats.latencies.append(elapsed)
+                stats.bytes += len(body)
+                result = {
+                    'url': url,
+                    'status': response.status,
+                    'headers': dict(response.headers),
+                    'body': body.decode(response.get_encoding() or 'utf-8', errors='replace'),
+                    'elapsed': elapsed,
+                    'error': None,
+                }
+                if response.status >= 400:
+                    stats.errors += 1
+                    result['error'] = f"HTTP {response.status}"
+                elif response.status == 304:
+                    stats.not_modified += 1
+                else:
+                    stats.pages += 1
+                return result
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt < retries:
+                stats.retries += 1
+                await asyncio.sleep(backoff * 2 ** attempt + random.uniform(0, backoff))
+                continue
+            stats.errors += 1
+            return {'url': url, 'status': None, 'headers': {}, 'body': None,
+                    'elapsed': time.monotonic() - start, 'error': str(e) or type(e).__name__}
+
+
+async def crawl_async(urls, on_result, concurrency=16, per_host_rate=4.0, burst=4,
+                      timeout=10, retries=3, backoff=0.5, request_headers=None):
+    # A fixed pool of workers keeps at most `concurrency` requests in flight,
+    # however many URLs are queued. request_headers(url) may add per-URL headers,
+    # e.g. If-None-Match for conditional requests.
+    stats = CrawlStats()
+    buckets = {}
+    queue = asyncio.Queue()
+    for url in urls:
+        queue.put_nowait(url)
+
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency, keepalive_timeout=30)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                     headers={'User-Agent': USER_AGENT}) as session:
+        async def worker():
+            while True:
+                try:
+                    url = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                host = urlsplit(url).netloc
+                if host not in buckets:
+                    buckets[host] = TokenBucket(per_host_rate, burst)
+                headers = request_headers(url) if request_headers else None
+                result = await fetch(session, url, buckets[host], stats, retries, backoff, headers)
+                # A failing callback (e.g. a full disk while saving) costs this page, not the crawl
+                try:
+                    on_result(result)
+                except Exception as e:
+                    stats.callback_errors += 1
+                    print(f"Error handling {url}: {e!r}")
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    stats.finished = time.monotonic()
+    return stats
+
+
+def crawl(urls, on_result=None, **kwargs):
+    results = []
+    stats = asyncio.run(crawl_async(urls, on_result or results.append, **kwargs))
+    return results, stats
+
+
+async def extract_corpus_async(links, site=PRIMARY_SITE, output_dir=None, **kwargs):
+    # links is the URL_ID/URL frame written by data_preprocessing.ipynb; pages are saved
+    # to the site's corpus folder, where the keyword, index and topic engines read them
+    output_dir = output_dir or SITES[site]['corpus']
+    url_ids = dict(zip(links['URL'], links['URL_ID']))
+    saved = []
+
+    def save(result):
+        if result['error'] is not None:
+            print(f"Error extracting content from {result['url']}: {result['error']}")
+            return
+        content = extract_text(result['body'])
+        if content:
+            saved.append(save_document(output_dir, url_ids[result['url']], content))
+
+    stats = await crawl_async(list(url_ids), save, **kwargs)
+    return saved, stats
+
+
+def extract_corpus(links, site=PRIMARY_SITE, output_dir=None, **kwargs):
+    # Notebooks already run an event loop, so they should await extract_corpus_async instead
+    return asyncio.run(extract_corpus_async(links, site, output_dir, **kwargs))
+
+
+if __name__ == "__main__":
+    # python crawler.py links.csv [site]
+    site = sys.argv[2] if len(sys.argv) > 2 else PRIMARY_SITE
+    if site not in SITES:
+        sys.exit(f"Unknown site {site}; choose one of {', '.join(SITES)}")
+    links = pd.read_csv(sys.argv[1])
+    saved, stats = extract_corpus(links, site)
+    print(f"Saved {len(saved)} pages: {stats.summary()}")
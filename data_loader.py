@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import streamlit as st
+import pandas as pd
+import pyarrow.parquet as pq
+from cache import LRUCache
+from profiler import section
+
+# SPLASHTOP_DATA_DIR points the app at another export folder (e.g. benchmark data)
+DATA_DIR = os.environ.get("SPLASHTOP_DATA_DIR", "Data")
+SNAPSHOT_DIR = "snapshots"
+MAX_CACHE_ENTRIES = 32
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+
+def _frame_size(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+_cache = LRUCache(max_entries=MAX_CACHE_ENTRIES, max_bytes=MAX_CACHE_BYTES, sizeof=_frame_size)
+_load_seconds = 0.0
+
+
+def snapshot_paths(file_name, folder=DATA_DIR):
+    stem = os.path.splitext(file_name)[0]
+    snapshot_dir = os.path.join(folder, SNAPSHOT_DIR)
+    return (os.path.join(snapshot_dir, f"{stem}.parquet"),
+            os.path.join(snapshot_dir, f"{stem}.schema.json"))
+
+
+def read_schema(file_name, folder=DATA_DIR):
+    _, schema_path = snapshot_paths(file_name, folder)
+    try:
+        with open(schema_path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _fresh_snapshot(file_name, folder, stat):
+    # Snapshots written by snapshot_store.py are only used while their source CSV is unchanged
+    schema = read_schema(file_name, folder)
+    if schema is None or schema['source_size'] != stat.st_size or schema['source_mtime_ns'] != stat.st_mtime_ns:
+        return None
+    parquet_path, _ = snapshot_paths(file_name, folder)
+    return (parquet_path, schema) if os.path.exists(parquet_path) else None
+
+
+def _read_snapshot(parquet_path, schema, columns):
+    if columns is not None:
+        columns = [col for col in columns if col in schema['columns']]
+    return pq.read_table(parquet_path, columns=columns, memory_map=True).to_pandas()
+
+
+def _read_file(file_path, columns=None):
+    try:
+        if columns is not None:
+            wanted = set(columns)
+            return pd.read_csv(file_path, on_bad_lines='skip', usecols=lambda col: col in wanted)
+        return pd.read_csv(file_path, on_bad_lines='skip')
+    except pd.errors.ParserError:
+        try:
+            return pd.read_excel(file_path)
+        except Exception:
+            with open(file_path, 'r') as file:
+                content = file.read()
+            return pd.DataFrame({'content': [content]})
+
+
+def load_dataset(file_name, folder=DATA_DIR, columns=None):
+    # Frames are shared between reruns and sessions, so callers must not mutate them in place.
+    # Passing columns projects the read to just those columns.
+    global _load_seconds
+    file_path = os.path.abspath(os.path.join(folder, file_name))
+    try:
+        stat = os.stat(file_path)
+    except OSError as e:
+        st.error(f"Error loading {file_name}: {str(e)}")
+        return None
+
+    key = (file_path, stat.st_mtime_ns, stat.st_size, tuple(columns) if columns is not None else None)
+    df = _cache.get(key)
+    if df is not None:
+        return df
+
+    # The file changed on disk; drop frames parsed from older versions of it
+    _cache.discard(lambda k: k[0] == file_path and k[1:3] != key[1:3])
+    start = time.perf_counter()
+    try:
+        with section(f"load {file_name}"):
+            snapshot = _fresh_snapshot(file_name, folder, stat)
+            if snapshot is not None:
+                df = _read_snapshot(*snapshot, columns)
+            else:
+                df = _read_file(file_path, columns)
+    except Exception as e:
+        st.error(f"Error loading {file_name}: {str(e)}")
+        return None
+    finally:
+        _load_seconds += time.perf_counter() - start
+    return _cache.put(key, df)
+
+
+def load_datasets(file_names, folder=DATA_DIR, columns=None):
+    data_dict = {}
+    for file_name in file_names:
+        df = load_dataset(file_name, folder, columns)
+        if df is not None:
+            data_dict[file_name] = df
+    return data_dict
+
+
+def cache_stats():
+    return dict(_cache.stats(), load_seconds=_load_seconds)
+
+
+def clear_cache():
+    _cache.clear()
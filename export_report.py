@@ -0,0 +1,154 @@
+import os
+import sys
+import json
+import html
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+from data_loader import DATA_DIR
+from crawl_diff import find_crawls
+from issues_cube import issues_cube
+from sites import SITES, site_names, site_slug
+from table_view import FULL_TABLES_KEY
+
+REPORT_DIR = "report"
+
+
+def report_views(folder=DATA_DIR):
+    # A view is one page rendered with a fixed widget state, so every tab, site and crawl
+    # shown by the app gets its own static page in the report
+    views = [(f"home-{site_slug(site)}", "home", f"{site} Analysis", {'home_tab': f"{site} Analysis"}) for site in site_names()]
+    views.append(("home-comparison", "home", "Site Comparison", {'home_tab': "Comparison"}))
+    views.append(("competitor", "competitor", "Competitor Analysis", {}))
+    for site, crawl in issues_cube(folder)['reports']:
+        views.append((f"issues-{site_slug(site)}-{crawl}", "issues", f"{site} Issues ({crawl})", {'issues_site': site, 'issues_crawl': crawl}))
+    views.extend((f"links-{site_slug(site)}", "links", f"{site} Link Structure", {'links_site': site}) for site in site_names())
+    views.append(("serp", "serp", "SERP Snippet Audit", {}))
+    views.extend((f"changes-{site_slug(site)}", "changes", f"{site} Crawl Changes", {'changes_site': site})
+                 for site in site_names() if len(find_crawls(SITES[site]['internal_file'], folder)) > 1)
+    return views
+
+
+def run_view(page, state):
+    # Runs the page headlessly with the given widget state
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_string(f"from {page} import {page}\n{page}()", default_timeout=600)
+    for key, value in state.items():
+        app.session_state[key] = value
+    app.run()
+    if app.exception:
+        raise RuntimeError(f"{page} failed: {app.exception[0].value}")
+    return app
+
+
+def _page_elements(page, state):
+    # Yields the page's headings, figures and tables in display order
+    for node in run_view(page, state).main:
+        if node.type in ('header', 'subheader'):
+            yield 'heading', node.value
+        elif node.type == 'plotly_chart':
+            yield 'figure', node.proto.spec
+        elif node.type == 'dataframe':
+            yield 'table', node.value
+
+
+def export_view(view, output_dir, images=False):
+    # Worker: renders one view to <name>.html plus a JSON file per figure and a CSV per table
+    name, page, title, state = view
+    body, files = [], []
+    figure_count = table_count = 0
+    # Tables are exported whole, not as the page of rows the app shows
+    for kind, value in _page_elements(page, {**state, FULL_TABLES_KEY: True}):
+        if kind == 'heading':
+            body.append(f"<h2>{html.escape(value)}</h2>")
+        elif kind == 'figure':
+            figure_count += 1
+            stem = f"{name}-figure{figure_count}"
+            fig = pio.from_json(value, skip_invalid=True)
+            with open(os.path.join(output_dir, 'data', f"{stem}.json"), 'w') as file:
+                file.write(value)
+            files.append(f"data/{stem}.json")
+            if images:
+                try:
+                    fig.write_image(os.path.join(output_dir, 'images', f"{stem}.png"))
+                    files.append(f"images/{stem}.png")
+                except (ValueError, RuntimeError, ImportError):
+                    # No static image renderer (kaleido) installed
+                    images = False
+            body.append(fig.to_html(full_html=False, include_plotlyjs=False, div_id=stem))
+        else:
+            table_count += 1
+            stem = f"{name}-table{table_count}"
+            value.to_csv(os.path.join(output_dir, 'data', f"{stem}.csv"), index=False)
+            files.append(f"data/{stem}.csv")
+            body.append(f"<p><a href='data/{stem}.csv'>Download table (CSV)</a></p>")
+            body.append(value.head(500).to_html(index=False, border=0, classes='table'))
+
+    with open(os.path.join(output_dir, f"{name}.html"), 'w', encoding='utf-8') as file:
+        file.write(_html_page(title, '\n'.join(body), scripts=figure_count > 0))
+    return {'name': name, 'page': page, 'title': title, 'state': state,
+            'figures': figure_count, 'tables': table_count, 'files': [f"{name}.html"] + files}
+
+
+def _html_page(title, body, scripts=False):
+    script = "<script src='plotly.min.js'></script>" if scripts else ""
+    return f"""<!DOCTYPE html>
+<html><head><meta charset='utf-8'><title>{html.escape(title)}</title>{script}
+<style>body {{font-family: sans-serif; margin: 2em; background-color: #f0f2f6;}} .table {{border-collapse: collapse; font-size: 13px;}}
+.table td, .table th {{padding: 4px 8px; border-bottom: 1px solid #ddd;}}</style></head>
+<body><p><a href='index.html'>All reports</a></p><h1>{html.escape(title)}</h1>
+{body}
+</body></html>
+"""
+
+
+def export_report(output_dir=REPORT_DIR, views=None, processes=None, images=False):
+    views = report_views() if views is None else views
+    os.makedirs(os.path.join(output_dir, 'data'), exist_ok=True)
+    if images:
+        os.makedirs(os.path.join(output_dir, 'images'), exist_ok=True)
+    # Shared by every view page, the same file write_html(include_plotlyjs='directory') would use
+    with open(os.path.join(output_dir, 'plotly.min.js'), 'w', encoding='utf-8') as file:
+        file.write(get_plotlyjs())
+
+    with ProcessPoolExecutor(processes) as pool:
+        futures = [pool.submit(export_view, view, output_dir, images) for view in views]
+        manifest = []
+        for view, future in zip(views, futures):
+            try:
+                manifest.append(future.result())
+            except Exception as error:
+                manifest.append({'name': view[0], 'page': view[1], 'title': view[2], 'error': str(error)})
+
+    links = ''.join(
+        f"<li>{html.escape(entry['title'])}: {html.escape(entry['error'])}</li>" if 'error' in entry else
+        f"<li><a href='{entry['name']}.html'>{html.escape(entry['title'])}</a> ({entry['figures']} charts, {entry['tables']} tables)</li>"
+        for entry in manifest)
+    with open(os.path.join(output_dir, 'index.html'), 'w', encoding='utf-8') as file:
+        file.write(_html_page("Splashtop Content Analysis", f"<p>Generated {time.strftime('%Y-%m-%d %H:%M')}</p><ul>{links}</ul>")
+                   .replace("<p><a href='index.html'>All reports</a></p>", ""))
+    with open(os.path.join(output_dir, 'manifest.json'), 'w') as file:
+        json.dump({'generated': time.strftime('%Y-%m-%dT%H:%M:%S'), 'views': manifest}, file, indent=1)
+    return manifest
+
+
+if __name__ == "__main__":
+    # python export_report.py [--output-dir report] [--pages home issues] [--processes 4] [--images]
+    parser = argparse.ArgumentParser(description="Render every dashboard view to a static HTML/JSON report")
+    parser.add_argument('--output-dir', default=REPORT_DIR)
+    parser.add_argument('--pages', nargs='+', choices=['home', 'competitor', 'issues', 'links', 'changes', 'serp'])
+    parser.add_argument('--processes', type=int)
+    parser.add_argument('--images', action='store_true', help="also write PNGs (needs kaleido)")
+    args = parser.parse_args()
+    # AppTest replaces __main__ inside the workers, so pool tasks must refer to the importable module
+    import export_report as exporter
+    views = [view for view in exporter.report_views() if not args.pages or view[1] in args.pages]
+    start = time.perf_counter()
+    manifest = exporter.export_report(args.output_dir, views, args.processes, args.images)
+    failed = [entry for entry in manifest if 'error' in entry]
+    for entry in failed:
+        print(f"{entry['name']}: {entry['error']}", file=sys.stderr)
+    print(f"Exported {len(manifest) - len(failed)} views to {args.output_dir} in {time.perf_counter() - start:.1f}s")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,111 @@
+import json
+import time
+import hashlib
+import weakref
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from cache import LRUCache
+from profiler import section
+
+MAX_CACHED_FIGURES = 128
+
+# A chart spec is a plain dict, e.g.
+#   {'chart': 'pie', 'args': {'values': 'Count', 'names': 'Issue Type'}, 'layout': {...}}
+# 'chart' is any plotly.express function name, 'figure' for hand-built go traces
+# or 'subplots' for make_subplots grids. 'traces' entries name their data columns
+# under 'columns' and everything else under 'props'.
+_cache = LRUCache(max_entries=MAX_CACHED_FIGURES)
+_fingerprints = {}
+_build_seconds = 0.0
+
+
+def dataset_fingerprint(df):
+    # Loader frames are shared and never mutated, so fingerprints are memoized per frame object
+    memo = _fingerprints.get(id(df))
+    if memo is not None and memo[0]() is df:
+        return memo[1]
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    fingerprint = digest.hexdigest()
+
+    key = id(df)
+    _fingerprints[key] = (weakref.ref(df, lambda _, key=key: _fingerprints.pop(key, None)), fingerprint)
+    return fingerprint
+
+
+def spec_fingerprint(spec):
+    return hashlib.blake2b(json.dumps(spec, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+
+def spec_title(spec):
+    return spec.get('args', {}).get('title') or spec.get('layout', {}).get('title') or spec['chart']
+
+
+def _trace(df, trace_spec):
+    trace = {'type': trace_spec.get('type', 'scatter')}
+    for prop, col in trace_spec.get('columns', {}).items():
+        trace[prop] = df[col]
+    trace.update(trace_spec.get('props', {}))
+    return trace
+
+
+def build_figure(df, spec):
+    chart = spec['chart']
+    if chart == 'figure':
+        fig = go.Figure(data=[_trace(df, t) for t in spec.get('traces', [])])
+    elif chart == 'subplots':
+        fig = make_subplots(**spec['subplots'])
+        for t in spec.get('traces', []):
+            fig.add_trace(_trace(df, t), row=t.get('row'), col=t.get('col'))
+    else:
+        fig = getattr(px, chart)(df, **spec.get('args', {}))
+
+    if 'update_traces' in spec:
+        fig.update_traces(**spec['update_traces'])
+    if 'layout' in spec:
+        fig.update_layout(**spec['layout'])
+    if 'xaxes' in spec:
+        fig.update_xaxes(**spec['xaxes'])
+    if 'yaxes' in spec:
+        fig.update_yaxes(**spec['yaxes'])
+    return fig
+
+
+def cached_figure(df, spec):
+    # Caches the built go.Figure, not its JSON. st.plotly_chart re-validates a dict spec into
+    # a figure and serializes whatever it gets, so a cached JSON string could only be rendered
+    # through Streamlit's private chart proto; only the figure build is skipped on reruns.
+    # The figure is shared between sessions; render it, don't modify it.
+    global _build_seconds
+    key = (dataset_fingerprint(df), spec_fingerprint(spec))
+    fig = _cache.get(key)
+    if fig is None:
+        start = time.perf_counter()
+        with section(f"build {spec_title(spec)}"):
+            fig = _cache.put(key, build_figure(df, spec))
+        _build_seconds += time.perf_counter() - start
+    return fig
+
+
+def merge_specs(*specs):
+    # Later specs win; nested dicts such as 'layout' are merged key by key
+    merged = {}
+    for spec in specs:
+        for key, value in spec.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                merged[key] = {**merged[key], **value}
+            else:
+                merged[key] = value
+    return merged
+
+
+def cache_stats():
+    return dict(_cache.stats(), build_seconds=_build_seconds)
+
+
+def clear_cache():
+    _cache.clear()
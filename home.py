@@ -1,59 +1,80 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objs as go
-import os
-from pathlib import Path
-from plotly.subplots import make_subplots
-
+from data_loader import load_dataset
+from figure_cache import cached_figure, dataset_fingerprint
+from inverted_index import load_index, url_hits
+from keywords import load_keyword_table, site_keywords, keyword_comparison
+from large_series import is_large, trace_type, downsample
+from site_comparison import site_summaries, metrics_table, keyword_leaders, keyword_gaps
+from sites import PRIMARY_SITE, SITES, site_names, site_slug
+from table_view import table_view
+from topic_gap import METHODS, load_terms, topic_gaps
+from profiler import profiled, plotly_chart, section
+
+@profiled("home")
 def home():
-    def load_data(folder_name="Data"):
-        data_dict = {}
-        for file_name in os.listdir(folder_name):
-            file_path = os.path.join(folder_name, file_name)
-            try:
-                df = pd.read_csv(file_path, on_bad_lines='skip')
-                data_dict[file_name] = df
-            except pd.errors.ParserError:
-                try:
-                    df = pd.read_excel(file_path)
-                    data_dict[file_name] = df
-                except Exception as e:
-                    with open(file_path, 'r') as file:
-                        content = file.read()
-                    df = pd.DataFrame({'content': [content]})
-                    data_dict[file_name] = df
-            except Exception as e:
-                st.error(f"Error loading {file_name}: {str(e)}")
-        return data_dict
-
-    data_dict = load_data()
-        
-    def splashtop_content():
-        st.header("Splashtop Content Analysis", divider='rainbow')
+    def url_range(df_sentiment, key):
+        # Large crawls are drawn downsampled; narrowing the range re-fetches full detail
+        if not is_large(df_sentiment):
+            return None
+        low, high = int(df_sentiment['URL_ID'].min()), int(df_sentiment['URL_ID'].max())
+        return st.slider("URL ID range", low, high, (low, high), key=key)
+
+    def keyword_insights(df_keywords):
+        # Up to three most frequent keywords; a site may mention fewer, or none at all
+        ranked = df_keywords[df_keywords['frequency'] > 0].sort_values('frequency', ascending=False).head(3)
+        if ranked.empty:
+            insights = """
+                <li>None of the tracked keywords appear on the extracted pages.</li>"""
+        else:
+            top, others = ranked.iloc[0], ranked.iloc[1:]
+            insights = f"""
+                <li>The term <b>"{top['keyword']}"</b> appears most frequently, with {top['frequency']} occurrences.</li>"""
+            if len(others):
+                names = ' and '.join(f'<b>"{keyword}"</b>' for keyword in [others['keyword'].iloc[0].capitalize()] + others['keyword'].iloc[1:].tolist())
+                counts = ' and '.join(str(count) for count in others['frequency'])
+                insights += f"""
+                <li>{names} {'are' if len(others) > 1 else 'is'} heavily used, with {counts} mentions{', respectively' if len(others) > 1 else ''}.</li>"""
+        missing = df_keywords[df_keywords['frequency'] == 0]['keyword'].tolist()
+        if missing:
+            examples = ' and '.join(f'<b>"{keyword}"</b>' for keyword in missing[:2])
+            insights += f"""
+                <li>Some keywords, such as {examples}, have 0 occurrences, indicating a potential gap.</li>"""
+        return insights
+
+    def site_content(site):
+        primary = site == PRIMARY_SITE
+        slug = site_slug(site)
+        st.header(f"{site} Content Analysis", divider='rainbow')
         
-        st.markdown("""
+        st.markdown(f"""
         <div class='intro'>
-            <p>Welcome to the <b>Splashtop Content Analysis</b> web app! This web application is designed to analyze the content coverage of Splashtop's website around the phrase <b>“Remote Access”</b> and its related keywords.</p>
+            <p>{SITES[site]['intro']}</p>
         </div>
         """, unsafe_allow_html=True)
 
-        col1, col2 = st.columns([1.9, 1.2])
-        
-        with col1:
-            st.markdown("""
-            <div class='info-box'>
-                <h3 class='header'>Steps Followed:</h3>
-                <ol>
-                    <li><b>Data Collection</b>: I used Screaming Frog application to crawl Splashtop's website and collect all page URLs.</li>
-                    <li><b>Content Extraction</b>: Beautiful Soup was employed to extract textual data from each page.</li>
-                    <li><b>Keyword Analysis</b>: I have analyzed the frequency of "Remote Access" and related keywords across all the extracted pages.</li>
-                </ol>
-            </div>
-            """, unsafe_allow_html=True)
+        if primary:
+            col1, col2 = st.columns([1.9, 1.2])
             
-        with col2:
-            st.image("https://www.splashtop.com/splashtop-logo-large.png", width=300)
+            with col1:
+                st.markdown(f"""
+                <div class='info-box'>
+                    <h3 class='header'>Steps Followed:</h3>
+                    <ol>
+                        <li><b>Data Collection</b>: I used Screaming Frog application to crawl {site}'s website and collect all page URLs.</li>
+                        <li><b>Content Extraction</b>: Beautiful Soup was employed to extract textual data from each page.</li>
+                        <li><b>Keyword Analysis</b>: I have analyzed the frequency of "Remote Access" and related keywords across all the extracted pages.</li>
+                    </ol>
+                </div>
+                """, unsafe_allow_html=True)
+                
+            with col2:
+                st.image(SITES[site]['logo'], width=300)
+        else:
+            st.markdown(f"""
+                <div style="text-align: center;">
+                    <img src="{SITES[site]['logo']}" width="300">
+                </div>
+            """, unsafe_allow_html=True)
             
         st.divider()
         
@@ -64,48 +85,65 @@ def home():
             <p>Below is a summary of the keyword frequency analysis, showing how often each keyword or phrase appears across the pages:</p>
             """, unsafe_allow_html=True)
             
-            splashtop_data = {
-                    'keyword': ['remote access', 'remote desktop', 'virtual access', 'remote control',
-                        'remote', 'remote desktop software', 'remote access solutions',
-                        'virtual desktop connection', 'secure remote access', 'remote control software'],
-                    'frequency': [614, 487, 0, 65, 4045, 62, 52, 0, 57, 1]}
-                
-            df_splashtop = pd.DataFrame(splashtop_data)
-            st.dataframe(df_splashtop, use_container_width=True)
+            df_keywords = site_keywords(load_keyword_table(), site)
+            st.dataframe(df_keywords, use_container_width=True)
             
         with col8:
-            st.markdown("""
-            <h3 class='header'>Analysis</h3>
-            <p><b>Key Insights:</b></p>
-            <ul>
-                <li>The term <b>"remote"</b> appears most frequently, with 4045 occurrences.</li>
-                <li><b>"Remote access"</b> and <b>"remote desktop"</b> are heavily used, with 614 and 487 mentions, respectively.</li>
-                <li>Some keywords, such as <b>"virtual access"</b> and <b>"virtual desktop connection"</b>, have 0 occurrences, indicating a potential gap.</li>
-            </ul>
-            
+            recommendations = ""
+            if primary and len(df_keywords):
+                underused = df_keywords.sort_values('frequency').iloc[0]['keyword']
+                recommendations = f"""
             <p><b>Recommendations:</b></p>
             <ul>
-                <li>We must consider optimizing content for underused but relevant phrases like <b>"virtual access"</b> to cover more areas related to remote access solutions.</li>
+                <li>We must consider optimizing content for underused but relevant phrases like <b>"{underused}"</b> to cover more areas related to remote access solutions.</li>
+            </ul>"""
+            st.markdown(f"""
+            <h3 class='header'>Analysis</h3>
+            <p><b>Key Insights:</b></p>
+            <ul>{keyword_insights(df_keywords)}
             </ul>
+            {recommendations}
             """, unsafe_allow_html=True)
 
         st.divider()
         
-        st.markdown("""
+        st.markdown(f"""
         <h3 class='header'>Keyword Frequency Treemap</h3>
-        This treemap visualizes the frequency of the keywords related to "Remote Access" found across Splashtop’s pages:
+        This treemap visualizes the frequency of the keywords related to "Remote Access" found across {site}’s pages:
         """, unsafe_allow_html=True)
 
-        fig_splashtop = px.treemap(df_splashtop, values='frequency', path=['keyword'], 
-                                hover_data={'keyword': False, 'frequency': True})
-        fig_splashtop.update_traces(hovertemplate='<b>Keyword:</b> %{label}<br><b>Frequency:</b> %{value}<extra></extra>')
-        fig_splashtop.update_layout(
-            font_size=15,
-            margin=dict(l=10, r=10, t=50, b=10),
-            paper_bgcolor='rgba(0,0,0,0)',  
-            plot_bgcolor='rgba(0,0,0,0)'   
-        )
-        st.plotly_chart(fig_splashtop)
+        fig_keywords = cached_figure(df_keywords, {
+            'chart': 'treemap',
+            'args': dict(values='frequency', path=['keyword'],
+                                hover_data={'keyword': False, 'frequency': True}),
+            'update_traces': dict(hovertemplate='<b>Keyword:</b> %{label}<br><b>Frequency:</b> %{value}<extra></extra>'),
+            'layout': dict(
+                font_size=15,
+                margin=dict(l=10, r=10, t=50, b=10),
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)'
+            )})
+        plotly_chart(fig_keywords, key=f"{slug}_treemap")
+
+        st.markdown("""
+        <h3 class='header'>Keyword Explorer</h3>
+        Look up any word or phrase across the extracted pages, or find pages where words appear close together:
+        """, unsafe_allow_html=True)
+        index = load_index()
+        if index is None or site not in index.sites():
+            st.info("The keyword explorer reads the page index; run `python inverted_index.py` once the pages are extracted.")
+        else:
+            col1, col2, col3 = st.columns([3, 1.2, 1])
+            query = col1.text_input("Words or phrase", key=f"{slug}_explorer_query", placeholder="remote desktop")
+            mode = col2.selectbox("Match", ["Exact phrase", "Words near each other"], key=f"{slug}_explorer_mode")
+            distance = col3.number_input("Within (words)", min_value=1, max_value=50, value=5, key=f"{slug}_explorer_distance",
+                                         disabled=mode == "Exact phrase")
+            if query.strip():
+                with section("keyword explorer"):
+                    hits = url_hits(index, query, 0 if mode == "Exact phrase" else distance, site, SITES[site]['internal_file'])
+                st.caption(f"{hits['Hits'].sum():,} matches on {len(hits):,} pages")
+                # url_hits returns the same cached frame per query, so its fingerprint is memoized
+                table_view(hits, key=f"{slug}_explorer_hits", query_key=dataset_fingerprint(hits))
     
         st.header("Sentiment Analysis Results", divider='rainbow')
         
@@ -116,13 +154,19 @@ def home():
         """, unsafe_allow_html=True)
         
         
-        df_sentiment = data_dict.get("analysis_results11.csv")
+        df_sentiment = load_dataset(SITES[site]['analysis_file'])
+        summaries = site_summaries([site])
+        if site not in summaries.index:
+            st.info(f"""`Data/{SITES[site]['analysis_file']}` has no scored pages for {site}. Run
+            `python scoring.py {SITES[site]['corpus']} {SITES[site]['analysis_file']}` once its pages are extracted.""")
+            return
+        summary = summaries.loc[site]
         sentiment_columns = ['POSITIVE SCORE', 'NEGATIVE SCORE', 'POLARITY SCORE', 
                             'SUBJECTIVITY SCORE', 'FOG INDEX', 'AVG SENTENCE LENGTH',
                             'WORD COUNT', 'SYLLABLE PER WORD', 'PERSONAL PRONOUNS']
         
         with st.expander("Click to view the dataset"):
-            st.dataframe(df_sentiment, use_container_width=True)
+            table_view(df_sentiment, key=f"{slug}_dataset")
 
         col7, col8 = st.columns([1.9, 1.1])
         with col7:
@@ -130,66 +174,74 @@ def home():
         <h3 class='header'>Sentiment Score Overview</h3>
         Below is the summary of sentiment scores for the analyzed content:
         """, unsafe_allow_html=True)
-            st.dataframe(df_sentiment[sentiment_columns].describe(), use_container_width=True)
+            with section("describe sentiment"):
+                summary_table = df_sentiment[sentiment_columns].describe()
+            st.dataframe(summary_table, use_container_width=True)
         
         with col8:
             st.markdown("<h3>Insights</h3>", unsafe_allow_html=True)
-            st.write(""" 
-                - **Content length:** The average word count of 772 words suggests substantial content, which search engines often favor. Longer, in-depth content tends to rank better for informational queries.
-                - **Readability:** The average FOG index of 18.0393 indicates fairly complex text. For SEO, we must consider simplifying some content to improve readability and user engagement, as search engines value user experience.
-                - **Sentiment analysis:** The positive sentiment (average polarity score of 0.9549) can be beneficial, as positive content often resonates better with readers and may lead to higher engagement and sharing rates.
+            st.write(f""" 
+                - **Content length:** The analysis covers {summary['Pages']:.0f} pages with an average word count of {summary['Word Count']:.0f} words; longer, in-depth content tends to rank better for informational queries.
+                - **Readability:** The average FOG index of {summary['Fog Index']:.4f} {'indicates fairly complex text. For SEO, we must consider simplifying some content to improve readability and user engagement, as search engines value user experience.' if summary['Fog Index'] >= 17 else 'indicates moderate complexity.'}
+                - **Sentiment analysis:** The average polarity score of {summary['Polarity Score']:.4f} {'is strongly positive, which often resonates better with readers and may lead to higher engagement and sharing rates.' if summary['Polarity Score'] > 0.5 else 'leaves room for a more positive tone.'}
                 """)
         st.divider()   
             
+        x_range = url_range(df_sentiment, key=f"{slug}_url_range")
+
         col1, col2 = st.columns([1.9, 1.1])
         with col1:
             # Positive vs Negative Scores (Graph)
             st.markdown("<h3>Positive vs Negative Sentiment</h3>", unsafe_allow_html=True)
-            fig_sentiment = go.Figure()
-            fig_sentiment.add_trace(go.Line(x=df_sentiment['URL_ID'], y=df_sentiment['POSITIVE SCORE'], 
-                                        name='Positive Score', marker_color='lightgreen'))
-            fig_sentiment.add_trace(go.Line(x=df_sentiment['URL_ID'], y=df_sentiment['NEGATIVE SCORE'], 
-                                        name='Negative Score', marker_color='salmon'))
-
-            fig_sentiment.update_layout(
-                barmode='group',
-                title="Positive vs Negative Sentiment Scores by URL",
-                xaxis_title="URL ID",
-                yaxis_title="Score",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#d2d2d6')
-            )
-            st.plotly_chart(fig_sentiment)
+            fig_sentiment = cached_figure(downsample(df_sentiment, 'URL_ID', ['POSITIVE SCORE', 'NEGATIVE SCORE'], x_range), {
+                'chart': 'figure',
+                'traces': [
+                    dict(type=trace_type(df_sentiment), columns={'x': 'URL_ID', 'y': 'POSITIVE SCORE'},
+                        props=dict(name='Positive Score', marker_color='lightgreen')),
+                    dict(type=trace_type(df_sentiment), columns={'x': 'URL_ID', 'y': 'NEGATIVE SCORE'},
+                        props=dict(name='Negative Score', marker_color='salmon')),
+                ],
+                'layout': dict(
+                    barmode='group',
+                    title="Positive vs Negative Sentiment Scores by URL",
+                    xaxis_title="URL ID",
+                    yaxis_title="Score",
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='#d2d2d6')
+                )})
+            plotly_chart(fig_sentiment, key=f"{slug}_sentiment_chart")
 
         with col2:
             st.markdown("<h3>Insights</h3>", unsafe_allow_html=True)
             st.write("""
             - **Positive Content**: URLs with higher positive sentiment scores indicate user-friendly content, which can improve dwell time and user engagement.
             - **Negative Sentiment**: High negative sentiment could indicate that content needs revisiting, especially if it's critical pages like product descriptions or landing pages.
-            - **Action**: We must consider rephrasing or enhancing content on URLs with high negative sentiment to improve user experience and SEO ranking.
-            """)
+            """ + ("""- **Action**: We must consider rephrasing or enhancing content on URLs with high negative sentiment to improve user experience and SEO ranking.
+            """ if primary else ""))
 
         st.divider()
 
         col3, col4 = st.columns([1.9, 1.1])
         with col3:
             st.markdown("<h3>Readability Metrics</h3>", unsafe_allow_html=True)
-            fig_readability = go.Figure()
-            fig_readability.add_trace(go.Scatter(x=df_sentiment['URL_ID'], y=df_sentiment['FOG INDEX'], 
-                                                name='Fog Index', mode='lines+markers', line=dict(color='#1cb3e0')))
-            fig_readability.add_trace(go.Scatter(x=df_sentiment['URL_ID'], y=df_sentiment['AVG SENTENCE LENGTH'], 
-                                                name='Avg Sentence Length', mode='lines+markers', line=dict(color='#ff7f0e')))
-
-            fig_readability.update_layout(
-                title="Fog Index and Average Sentence Length by URL",
-                xaxis_title="URL ID",
-                yaxis_title="Score",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#d2d2d6')
-            )
-            st.plotly_chart(fig_readability)
+            fig_readability = cached_figure(downsample(df_sentiment, 'URL_ID', ['FOG INDEX', 'AVG SENTENCE LENGTH'], x_range), {
+                'chart': 'figure',
+                'traces': [
+                    dict(type=trace_type(df_sentiment), columns={'x': 'URL_ID', 'y': 'FOG INDEX'},
+                        props=dict(name='Fog Index', mode='lines+markers', line=dict(color='#1cb3e0'))),
+                    dict(type=trace_type(df_sentiment), columns={'x': 'URL_ID', 'y': 'AVG SENTENCE LENGTH'},
+                        props=dict(name='Avg Sentence Length', mode='lines+markers', line=dict(color='#ff7f0e'))),
+                ],
+                'layout': dict(
+                    title="Fog Index and Average Sentence Length by URL",
+                    xaxis_title="URL ID",
+                    yaxis_title="Score",
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='#d2d2d6')
+                )})
+            plotly_chart(fig_readability, key=f"{slug}_readability_chart")
 
         with col4:
             # Insights for Readability Metrics
@@ -197,340 +249,170 @@ def home():
             st.write("""
             - **Fog Index**: High Fog Index indicates complex content. For SEO, simpler, easy-to-read content can rank better, especially for broader audiences.
             - **Avg Sentence Length**: Shorter sentences improve readability. Aim for a balance between brevity and clarity.
-            - **Action**: We must focus on simplifying content with high Fog Index scores to improve user retention and SEO rankings.
-            """)
+            """ + ("""- **Action**: We must focus on simplifying content with high Fog Index scores to improve user retention and SEO rankings.
+            """ if primary else ""))
 
         st.divider()
 
         col5, col6 = st.columns([1.9, 1.1])
         with col5:
             st.markdown("<h3>Word Count Distribution</h3>", unsafe_allow_html=True)
-            fig_word_count = px.histogram(df_sentiment, x='WORD COUNT', nbins=20, title='Word Count Distribution')
-            fig_word_count.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#d2d2d6'),
-                bargap=0.1 )
+            fig_word_count = cached_figure(df_sentiment, {
+                'chart': 'histogram',
+                'args': dict(x='WORD COUNT', nbins=20, title='Word Count Distribution'),
+                'layout': dict(
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='#d2d2d6'),
+                    bargap=0.1)})
             
-            st.plotly_chart(fig_word_count)
+            plotly_chart(fig_word_count, key=f"{slug}_word_count_histogram")
 
         with col6:
             st.markdown("<h3>Insights</h3>", unsafe_allow_html=True)
             st.write("""
             - **Word Count**: Longer articles tend to perform better in search engines. If the content is too short, it may not fully satisfy user intent.
-            - **Action**: We need to ensure that high-priority URLs have adequate word counts to match the competition, especially for more competitive keywords.
-            """)
+            """ + ("""- **Action**: We need to ensure that high-priority URLs have adequate word counts to match the competition, especially for more competitive keywords.
+            """ if primary else ""))
             
         st.divider()
 
-    def anydesk_content():
-        st.header("AnyDesk Content Analysis", divider='rainbow')
-
-        st.markdown("""
-            <div class='intro'>
-                <p>This page provides an in-depth analysis of <b>AnyDesk's</b> content, a major competitor to <b>Splashtop</b>, with a focus on <b>Remote Access</b> and related topics.</p>
-            </div>
-        """, unsafe_allow_html=True)
-
-        st.markdown("""
-            <div style="text-align: center;">
-                <img src="https://img.swapcard.com/?u=https%3A%2F%2Fcdn-api.swapcard.com%2Fpublic%2Fimages%2Fbac2e0339ab54511aaf8e3f7fe1e6269.png&q=0.8&m=fit&w=400&h=200" width="300">
-            </div>
-        """, unsafe_allow_html=True)
-        st.divider()
-
-        col1, col2 = st.columns([1.9, 1.2])
-        with col1:
-            st.markdown("""
-            <h3 class='header'>Keyword Frequency Analysis</h3>
-            <p>Below is a summary of the keyword frequency analysis, showing how often each keyword or phrase appears across the pages:</p>
-            """, unsafe_allow_html=True)
-
-            # AnyDesk Keyword Data
-            anydesk_data = {
-                'keyword': [
-                    'remote access', 'remote desktop', 'virtual access', 'remote control',
-                    'remote', 'remote desktop software', 'remote access solutions',
-                    'virtual desktop connection', 'secure remote access', 'remote control software'
-                ],
-                'frequency': [354, 403, 0, 18, 1973, 65, 0, 0, 7, 0]
-            }
-
-            df_anydesk = pd.DataFrame(anydesk_data)
-            st.dataframe(df_anydesk, use_container_width=True)
-
-        with col2:
-            st.markdown("""
-            <h3 class='header'>Analysis Report</h3>
-            <p><b>Key Insights:</b></p>
-            <ul>
-                <li>The term <b>"remote"</b> appears most frequently, with 1973 occurrences.</li>
-                <li><b>"Remote desktop"</b> and <b>"remote access"</b> are also significant, with 403 and 354 mentions, respectively.</li>
-                <li>Some keywords, such as <b>"virtual access"</b> and <b>"virtual desktop connection"</b>, have 0 occurrences, indicating a gap in coverage.</li>
-            </ul>
-
-            """, unsafe_allow_html=True)
-
-        st.divider()
-
-        st.markdown("""
-        <h3 class='header'>Keyword Frequency Treemap</h3>
-        This treemap visualizes the frequency of the keywords related to "Remote Access" found across AnyDesk’s pages:
-        """, unsafe_allow_html=True)
-
-        fig_splashtop = px.treemap(df_anydesk, values='frequency', path=['keyword'], 
-                                hover_data={'keyword': False, 'frequency': True})
-        fig_splashtop.update_traces(hovertemplate='<b>Keyword:</b> %{label}<br><b>Frequency:</b> %{value}<extra></extra>')
-        fig_splashtop.update_layout(
-            font_size=15,
-            margin=dict(l=10, r=10, t=50, b=10),
-            paper_bgcolor='rgba(0,0,0,0)',  
-            plot_bgcolor='rgba(0,0,0,0)'   
-        )
-        st.plotly_chart(fig_splashtop)
-
-        st.divider()
-        st.header("Sentiment Analysis Results", divider='rainbow')
-
-        st.markdown("""
-        <div class='intro'>
-            <p>This section provides a comprehensive analysis of sentiment scores and readability for the URLs analyzed. Below are the key metrics such as positive, negative, and polarity scores, as well as readability metrics like the Fog Index.</p>
-        </div>
-        """, unsafe_allow_html=True)
-
-        df_sentiment = data_dict.get("analysis_results12.csv")
-        sentiment_columns = ['POSITIVE SCORE', 'NEGATIVE SCORE', 'POLARITY SCORE', 
-                            'SUBJECTIVITY SCORE', 'FOG INDEX', 'AVG SENTENCE LENGTH',
-                            'WORD COUNT', 'SYLLABLE PER WORD', 'PERSONAL PRONOUNS']
-        
-        with st.expander("Click to view the dataset"):
-            st.dataframe(df_sentiment, use_container_width=True)
-
-        col7, col8 = st.columns([1.9, 1.1])
-        with col7:
-            st.markdown("""
-        <h3 class='header'>Sentiment Score Overview</h3>
-        Below is the summary of sentiment scores for the analyzed content:
-        """, unsafe_allow_html=True)
-            st.dataframe(df_sentiment[sentiment_columns].describe(), use_container_width=True)
-        
-        with col8:
-            st.markdown("<h3>Insights</h3>", unsafe_allow_html=True)
-            st.write(""" 
-                - The analysis covers 109 content items across various linguistic and stylistic measures.
-                - On average, the content has a strong positive sentiment (mean polarity score of 0.9745) and moderate complexity (average FOG index of 14.5885).
-                - The average word count is 982.9725 words per item, with significant variation (from 4 to 9,051 words).
-                """)
-
-        st.divider()
-
-        col1, col2 = st.columns([1.9, 1.1])
-        with col1:
-            st.markdown("<h3>Positive vs Negative Sentiment</h3>", unsafe_allow_html=True)
-            fig_sentiment = go.Figure()
-            fig_sentiment.add_trace(go.Line(x=df_sentiment['URL_ID'], y=df_sentiment['POSITIVE SCORE'], 
-                                        name='Positive Score', marker_color='lightgreen'))
-            fig_sentiment.add_trace(go.Line(x=df_sentiment['URL_ID'], y=df_sentiment['NEGATIVE SCORE'], 
-                                        name='Negative Score', marker_color='salmon'))
-
-            fig_sentiment.update_layout(
-                barmode='group',
-                title="Positive vs Negative Sentiment Scores by URL",
-                xaxis_title="URL ID",
-                yaxis_title="Score",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#d2d2d6')
-            )
-            st.plotly_chart(fig_sentiment, key="sentiment_bar_chart")
-
-        with col2:
-            st.markdown("<h3>Insights</h3>", unsafe_allow_html=True)
-            st.write("""
-            - **Positive Content**: URLs with higher positive sentiment scores indicate user-friendly content, which can improve dwell time and user engagement.
-            - **Negative Sentiment**: High negative sentiment could indicate that content needs revisiting, especially if it's critical pages like product descriptions or landing pages.
-            """)
-
-        st.divider()
-
-        col3, col4 = st.columns([1.9, 1.1])
-        with col3:
-            st.markdown("<h3>Readability Metrics</h3>", unsafe_allow_html=True)
-            fig_readability = go.Figure()
-            fig_readability.add_trace(go.Scatter(x=df_sentiment['URL_ID'], y=df_sentiment['FOG INDEX'], 
-                                                name='Fog Index', mode='lines+markers', line=dict(color='#1cb3e0')))
-            fig_readability.add_trace(go.Scatter(x=df_sentiment['URL_ID'], y=df_sentiment['AVG SENTENCE LENGTH'], 
-                                                name='Avg Sentence Length', mode='lines+markers', line=dict(color='#ff7f0e')))
-
-            fig_readability.update_layout(
-                title="Fog Index and Average Sentence Length by URL",
-                xaxis_title="URL ID",
-                yaxis_title="Score",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#d2d2d6')
-            )
-            st.plotly_chart(fig_readability, key="readability_chart")
-
-        with col4:
-            st.markdown("<h3>Insights</h3>", unsafe_allow_html=True)
-            st.write("""
-            - **Fog Index**: High Fog Index indicates complex content. For SEO, simpler, easy-to-read content can rank better, especially for broader audiences.
-            - **Avg Sentence Length**: Shorter sentences improve readability. Aim for a balance between brevity and clarity.
+    def comparison():
+        selected = st.multiselect("Websites to compare", site_names(), default=site_names(), key="comparison_sites")
+        if len(selected) < 2:
+            st.info("Select at least two websites to compare.")
+            return
+        focus = PRIMARY_SITE if PRIMARY_SITE in selected else selected[0]
+        rivals = [site for site in selected if site != focus]
 
-            """)
+        st.header(f"{' vs '.join(selected)}: A Content Comparison",divider='rainbow')
 
-        st.divider()
+        df_keywords = keyword_comparison(load_keyword_table(), selected)
 
-        col5, col6 = st.columns([1.9, 1.1])
-        with col5:
-            st.markdown("<h3>Word Count Distribution</h3>", unsafe_allow_html=True)
-            fig_word_count = px.histogram(df_sentiment, x='WORD COUNT', nbins=20, title='Word Count Distribution')
-            fig_word_count.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#d2d2d6'),
-                bargap=0.1)
-            st.plotly_chart(fig_word_count, key="word_count_histogram")
-
-        with col6:
-            st.markdown("<h3>Insights</h3>", unsafe_allow_html=True)
-            st.write("""
-            - **Word Count**: Longer articles tend to perform better in search engines. If the content is too short, it may not fully satisfy user intent.
-            """)
-
-        st.divider()
-
-    def comparison():
-        st.header("Splashtop vs AnyDesk: A Content Comparison",divider='rainbow')
-
-        splashtop_keywords = {
-            'remote access': 614,
-            'remote desktop': 487,
-            'virtual access': 0,
-            'remote control': 65,
-            'remote': 4045,
-            'remote desktop software': 62,
-            'remote access solutions': 52,
-            'virtual desktop connection': 0,
-            'secure remote access': 57,
-            'remote control software': 1
-        }
-        
-        anydesk_keywords = {
-            'remote access': 310,
-            'remote desktop': 456,
-            'virtual access': 20,
-            'remote control': 70,
-            'remote': 2900,
-            'remote desktop software': 80,
-            'remote access solutions': 30,
-            'virtual desktop connection': 10,
-            'secure remote access': 60,
-            'remote control software': 5
-        }
-        
         col1, col2 = st.columns([1.3, 1.7])       
         with col1:
             st.markdown("<h3>Keyword Frequency Table</h3>", unsafe_allow_html=True)
-            df_keywords = pd.DataFrame({
-                'Keyword': splashtop_keywords.keys(),
-                'Splashtop': splashtop_keywords.values(),
-                'AnyDesk': anydesk_keywords.values()
-            })
             st.dataframe(df_keywords, use_container_width=True)
             
         with col2:
             st.markdown("<h3>Keyword Frequency Chart</h3>", unsafe_allow_html=True)
-            fig = go.Figure(data=[
-                go.Bar(name='Splashtop', x=list(splashtop_keywords.keys()), y=list(splashtop_keywords.values())),
-                go.Bar(name='AnyDesk', x=list(anydesk_keywords.keys()), y=list(anydesk_keywords.values()))
-            ])
-            fig.update_layout(barmode='group', height=500, plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
-            st.plotly_chart(fig, use_container_width=True)
+            fig = cached_figure(df_keywords, {
+                'chart': 'figure',
+                'traces': [dict(type='bar', columns={'x': 'Keyword', 'y': site}, props={'name': site}) for site in selected],
+                'layout': dict(barmode='group', height=500, plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')})
+            plotly_chart(fig, use_container_width=True)
+
+        leaders = keyword_leaders(df_keywords, selected)
+        insights = []
+        for site, keywords in leaders.items():
+            if keywords:
+                insights.append(f"- **{site}** uses keywords like {' and '.join(repr(k) for k in keywords)} more often than the other sites.")
+        gaps = keyword_gaps(df_keywords, focus, rivals)
+        if gaps:
+            insights.append(f"- {focus} could benefit by strengthening content around {gaps[0]!r}.")
+        st.markdown("\n".join(insights))
 
-        st.markdown("""
-        - **Splashtop** uses keywords like 'remote access' and 'remote' more often.
-        - **AnyDesk** focuses more on 'remote desktop' and 'remote desktop software'.
-        - Splashtop could benefit by strengthening content around 'remote desktop'.
-        """)
+        st.divider()
+        st.markdown("<h3>Topic Gaps</h3>", unsafe_allow_html=True)
+        terms = load_terms()
+        if terms is None or not set(selected) <= set(terms['sites']):
+            st.info("Topic gaps are computed from the extracted pages; run `python topic_gap.py` once every selected site is crawled.")
+        else:
+            st.write(f"Words and phrases that {' and '.join(rivals)} cover on many more pages than {focus}, "
+                     "found among every 1-3 word phrase of the extracted pages rather than a fixed keyword list:")
+            method = st.radio("Ranking", METHODS, horizontal=True, key="comparison_gap_method")
+            with section("topic gaps"):
+                topics = topic_gaps(terms, focus, rivals, method)
+            col1, col2 = st.columns([1.6, 1.4])
+            with col1:
+                st.dataframe(topics, use_container_width=True, hide_index=True)
+            with col2:
+                fig = cached_figure(topics.head(15).iloc[::-1], {
+                    'chart': 'figure',
+                    'traces': [dict(type='bar', columns={'x': column, 'y': 'Term'}, props={'name': name, 'orientation': 'h'})
+                               for column, name in ((f'{focus} Pages (%)', focus), ('Rival Pages (%)', ' + '.join(rivals)))],
+                    'layout': dict(barmode='group', height=500, xaxis_title='Pages using the term (%)',
+                                   plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')})
+                plotly_chart(fig, use_container_width=True)
+            if len(topics):
+                st.markdown(f"- {focus} could add pages covering {', '.join(repr(term) for term in topics['Term'].head(3))}.")
 
         st.divider()
-        splashtop_metrics = {
-            'Word Count': 772.4,
-            'Fog Index': 18.04,
-            'Reading Time (min)': 15
-        }
-        
-        anydesk_metrics = {
-            'Word Count': 982.9 ,
-            'Fog Index': 14.25,
-            'Reading Time (min)': 12
-        }
+        summary = site_summaries(selected)
+        if summary.empty:
+            st.info("None of the selected websites has scored pages yet, so there are no content metrics to compare.")
+            return
+        unscored = [site for site in selected if site not in summary.index]
+        if unscored:
+            st.info(f"{', '.join(unscored)} {'has' if len(unscored) == 1 else 'have'} no scored pages and {'is' if len(unscored) == 1 else 'are'} left out of the metrics below.")
 
         col3, col4 = st.columns([1.5, 1.5])
         with col3:
             st.markdown("<h3>Content Metrics Table</h3>", unsafe_allow_html=True)
-            df_metrics = pd.DataFrame({
-                'Metric': splashtop_metrics.keys(),
-                'Splashtop': splashtop_metrics.values(),
-                'AnyDesk': anydesk_metrics.values()
-            })
-            st.dataframe(df_metrics, use_container_width=True)
+            st.dataframe(metrics_table(summary), use_container_width=True)
 
+        longest = summary['Word Count'].idxmax()
+        most_complex = summary['Fog Index'].idxmax()
+        most_personal = summary['Personal Pronouns'].idxmax()
+        largest = summary['Total Words'].idxmax()
         with col4:
             st.markdown("<h3>Key Insights from Metrics</h3>", unsafe_allow_html=True)
-            st.markdown("""
-            - **AnyDesk** has longer content on average, which can improve ranking for in-depth queries.
-            - **Splashtop** has more complex content, indicated by the higher Fog Index. Simplifying some content could boost readability.
-            - **Action**: Expanding content and simplifying readability may help Splashtop compete better.
-            """)
+            st.markdown(f"""
+            - **{longest}** has longer content on average ({summary.loc[longest, 'Word Count']:.0f} words), which can improve ranking for in-depth queries.
+            - **{most_complex}** has the most complex content, indicated by the highest Fog Index. Simplifying some content could boost readability.
+            """ + (f"""- **{focus}** covers {summary.loc[focus, 'Keyword Coverage (%)']:.0f}% of the tracked keywords.
+            """ if focus in summary.index else ""))
 
         st.divider()
 
         col5, col6 = st.columns([1.5, 1.5])
         with col5:
             st.markdown("<h3>Readability and Complexity</h3>", unsafe_allow_html=True)
-            st.markdown("""
-            - **Splashtop** has higher complexity (18.04 Fog Index), meaning its content is harder to read.
+            st.markdown(f"""
+            - **{most_complex}** has higher complexity ({summary.loc[most_complex, 'Fog Index']:.2f} Fog Index), meaning its content is harder to read.
             - **Action**: Simplifying the language could help make the content more accessible to a wider audience.
             """)
 
         with col6:
             st.markdown("<h3>Engagement through Personal Pronouns</h3>", unsafe_allow_html=True)
-            st.markdown("""
-            - **AnyDesk** uses more personal pronouns, which may create a more engaging, conversational tone.
-            - **Action**: Splashtop could benefit from a more conversational tone to enhance reader engagement.
-            """)
+            st.markdown(f"""
+            - **{most_personal}** uses more personal pronouns ({summary.loc[most_personal, 'Personal Pronouns']:.1f} per page), which may create a more engaging, conversational tone.
+            """ + (f"""- **Action**: {focus} could benefit from a more conversational tone to enhance reader engagement.
+            """ if most_personal != focus else ""))
 
         st.divider()
 
         col7, col8 = st.columns([1.5, 1.5])
         with col7:
             st.markdown("<h3>Content Volume</h3>", unsafe_allow_html=True)
-            st.markdown("""
-            - **Splashtop** has more content overall, which is great for maintaining its presence.
+            st.markdown(f"""
+            - **{largest}** has more content overall ({summary.loc[largest, 'Total Words']:,.0f} words across {summary.loc[largest, 'Pages']:.0f} pages), which is great for maintaining its presence.
             - **Action**: Keep producing a wide variety of content to stay ahead.
             """)
 
         with col8:
             st.markdown("<h3>Sentiment Analysis</h3>", unsafe_allow_html=True)
-            st.markdown("""
-            - Both companies maintain a very positive sentiment.
-            - **Action**: Continue to optimize content for positive user engagement.
+            positive = summary['Polarity Score'] > 0.5
+            st.markdown(("""
+            - All compared sites maintain a very positive sentiment.
+            """ if positive.all() else f"""
+            - {', '.join(summary.index[~positive])} could use a more positive tone.
+            """) + """- **Action**: Continue to optimize content for positive user engagement.
         """)
         
         st.divider()
 
     st.title("Remote Access Content Analysis")
 
-    tab1, tab2, tab3= st.tabs(["Splashtop Analysis", "AnyDesk Analysis","Comparison"])
-
-    with tab1:
-        splashtop_content()
+    # Only the selected tab is executed and sent to the browser; switching tabs triggers a rerun
+    sites = site_names()
+    tabs = st.tabs([f"{site} Analysis" for site in sites] + ["Comparison"], key="home_tab", on_change="rerun")
 
-    with tab2:
-        anydesk_content()
+    for site, tab in zip(sites, tabs):
+        if tab.open:
+            with tab, section(f"{site} tab"):
+                site_content(site)
         
-    with tab3:
-        comparison()
+    if tabs[-1].open:
+        with tabs[-1], section("comparison tab"):
+            comparison()
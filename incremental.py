@@ -0,0 +1,132 @@
+import os
+import sys
+import json
+import asyncio
+import hashlib
+import pandas as pd
+from corpus import save_document
+from crawler import crawl_async, extract_text, normalize_url
+from sites import PRIMARY_SITE, SITES
+
+MANIFEST_FILE = "manifest.json"
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(path + '.tmp', 'w') as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def content_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def export_hashes(export):
+    # Screaming Frog's Hash column is a digest of the page source
+    rows = export.dropna(subset=['Hash'])
+    return dict(zip(rows['Address'].map(normalize_url), rows['Hash']))
+
+
+def unchanged_urls(old_export, new_export):
+    old_hashes = export_hashes(old_export)
+    return {url for url, page_hash in export_hashes(new_export).items() if old_hashes.get(url) == page_hash}
+
+
+def conditional_headers(entry):
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+
+async def incremental_extract_async(links, site=PRIMARY_SITE, output_dir=None, old_export=None, new_export=None, **kwargs):
+    # Re-fetches only pages that may have changed and rewrites only pages whose text did.
+    # Returns the URL_IDs in each bucket so downstream scoring can process just report['changed'].
+    # The manifest lives next to the pages, in the site's corpus folder by default.
+    output_dir = output_dir or SITES[site]['corpus']
+    manifest = load_manifest(output_dir)
+    report = {'changed': [], 'unchanged': [], 'skipped': [], 'failed': []}
+    skip = unchanged_urls(old_export, new_export) if old_export is not None and new_export is not None else set()
+    sf_hashes = export_hashes(new_export) if new_export is not None else {}
+
+    def has_document(url_id):
+        return os.path.exists(os.path.join(output_dir, f"{url_id}.txt"))
+
+    pending = {}
+    for url, url_id in zip(links['URL'], links['URL_ID']):
+        key, url_id = normalize_url(url), str(url_id)
+        entry = manifest.get(key)
+        if key in skip and entry and entry['url_id'] == url_id and has_document(url_id):
+            entry['sf_hash'] = sf_hashes.get(key, entry.get('sf_hash'))
+            report['skipped'].append(url_id)
+        else:
+            pending[url] = (key, url_id)
+
+    def request_headers(url):
+        key, url_id = pending[url]
+        entry = manifest.get(key, {})
+        # Only ask for a 304 when we still hold the text stored under this URL_ID
+        if entry.get('url_id') == url_id and has_document(url_id):
+            return conditional_headers(entry)
+        return None
+
+    def handle(result):
+        key, url_id = pending[result['url']]
+        if result['error'] is not None:
+            print(f"Error extracting content from {result['url']}: {result['error']}")
+            report['failed'].append(url_id)
+            return
+        if result['status'] == 304:
+            report['unchanged'].append(url_id)
+            return
+
+        content = extract_text(result['body'])
+        if not content:
+            report['failed'].append(url_id)
+            return
+        headers = {name.lower(): value for name, value in result['headers'].items()}
+        entry = manifest.get(key, {})
+        digest = content_hash(content)
+        if entry.get('content_hash') == digest and entry.get('url_id') == url_id and has_document(url_id):
+            report['unchanged'].append(url_id)
+        else:
+            save_document(output_dir, url_id, content)
+            report['changed'].append(url_id)
+        manifest[key] = {
+            'url_id': url_id,
+            'content_hash': digest,
+            'etag': headers.get('etag'),
+            'last_modified': headers.get('last-modified'),
+            'sf_hash': sf_hashes.get(key, entry.get('sf_hash')),
+        }
+
+    stats = await crawl_async(list(pending), handle, request_headers=request_headers, **kwargs)
+    save_manifest(manifest, output_dir)
+    return report, stats
+
+
+def incremental_extract(links, site=PRIMARY_SITE, output_dir=None, old_export=None, new_export=None, **kwargs):
+    return asyncio.run(incremental_extract_async(links, site, output_dir, old_export, new_export, **kwargs))
+
+
+if __name__ == "__main__":
+    # python incremental.py links.csv [site [old_internal_all.csv new_internal_all.csv]]
+    site = sys.argv[2] if len(sys.argv) > 2 else PRIMARY_SITE
+    if site not in SITES:
+        sys.exit(f"Unknown site {site}; choose one of {', '.join(SITES)}")
+    links = pd.read_csv(sys.argv[1])
+    exports = [pd.read_csv(path, usecols=['Address', 'Hash']) for path in sys.argv[3:5]]
+    report, stats = incremental_extract(links, site, None, *exports)
+    print({bucket: len(url_ids) for bucket, url_ids in report.items()}, stats.summary())
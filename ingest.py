@@ -0,0 +1,91 @@
+import os
+import sys
+import pandas as pd
+from pandas.api.types import union_categoricals
+from cache import LRUCache
+from data_loader import DATA_DIR
+from profiler import section
+
+CHUNK_SIZE = 50_000
+# The columns used for content analysis (see data_preprocessing.ipynb), plus the
+# low-cardinality Status and Language fields
+RELEVANT_COLUMNS = [
+    'Address', 'Content Type', 'Status Code', 'Status', 'Indexability', 'Language',
+    'Title 1', 'Title 1 Length', 'Meta Description 1', 'Meta Description 1 Length',
+    'H1-1', 'H2-1', 'H2-2', 'Word Count', 'Readability', 'Text Ratio',
+    'Crawl Depth', 'Inlinks', 'Outlinks', 'Response Time',
+]
+CATEGORY_COLUMNS = ['Content Type', 'Indexability', 'Status', 'Language', 'Readability']
+TEXT_COLUMNS = ['Address', 'Title 1', 'Meta Description 1', 'H1-1', 'H2-1', 'H2-2']
+
+_pages = LRUCache(max_entries=8, sizeof=lambda df: int(df.memory_usage(deep=True).sum()))
+
+
+def _shrink(chunk, categories):
+    for column in chunk.columns:
+        if column in categories:
+            chunk[column] = chunk[column].astype('category')
+        elif pd.api.types.is_integer_dtype(chunk[column]):
+            chunk[column] = pd.to_numeric(chunk[column], downcast='integer')
+        elif pd.api.types.is_float_dtype(chunk[column]):
+            chunk[column] = pd.to_numeric(chunk[column], downcast='float')
+    return chunk
+
+
+def iter_export(path, columns=RELEVANT_COLUMNS, html_only=True, indexable_only=True, chunksize=CHUNK_SIZE):
+    # Streams a Screaming Frog export: only the projected columns are parsed and rows
+    # are filtered before the next chunk is read, so memory is bounded by the chunk
+    # size plus the rows that survive the filters.
+    wanted = set(columns)
+    categories = [column for column in CATEGORY_COLUMNS if column in wanted]
+    reader = pd.read_csv(path, usecols=lambda column: column in wanted,
+                         dtype={column: 'str' for column in categories + TEXT_COLUMNS if column in wanted},
+                         encoding='utf-8-sig', on_bad_lines='skip', chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            if html_only and 'Content Type' in chunk:
+                chunk = chunk[chunk['Content Type'].str.startswith('text/html', na=False)]
+            if indexable_only and 'Indexability' in chunk:
+                chunk = chunk[chunk['Indexability'] != 'Non-Indexable']
+            yield _shrink(chunk.copy(), categories)
+
+
+def concat_chunks(chunks):
+    # pd.concat turns categoricals with different categories into object columns,
+    # so category columns are combined separately with union_categoricals
+    if not chunks:
+        return pd.DataFrame()
+    categories = [column for column in chunks[0].columns if isinstance(chunks[0][column].dtype, pd.CategoricalDtype)]
+    frame = pd.concat([chunk.drop(columns=categories) for chunk in chunks], ignore_index=True)
+    for column in categories:
+        frame[column] = union_categoricals([chunk[column] for chunk in chunks])
+    return frame[chunks[0].columns]
+
+
+def ingest_export(file_name, folder=DATA_DIR, columns=RELEVANT_COLUMNS, html_only=True, indexable_only=True, chunksize=CHUNK_SIZE):
+    return concat_chunks(list(iter_export(os.path.join(folder, file_name), columns, html_only, indexable_only, chunksize)))
+
+
+def load_pages(file_name, folder=DATA_DIR, columns=RELEVANT_COLUMNS, html_only=True, indexable_only=True):
+    # Cached like data_loader.load_dataset: keyed on the file version and the ingest options
+    path = os.path.abspath(os.path.join(folder, file_name))
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size, tuple(columns), html_only, indexable_only)
+    pages = _pages.get(key)
+    if pages is None:
+        _pages.discard(lambda cached: cached[0] == path and cached[1:3] != key[1:3])
+        with section(f"ingest {file_name}"):
+            pages = _pages.put(key, ingest_export(file_name, folder, columns, html_only, indexable_only))
+    return pages
+
+
+def links_frame(pages):
+    # URL_ID/URL list the crawler extracts pages from (links.csv in the notebooks)
+    return pd.DataFrame({'URL_ID': range(1, len(pages) + 1), 'URL': pages['Address'].to_numpy()})
+
+
+if __name__ == "__main__":
+    # python ingest.py internal_all_anydesk.csv links_anydesk.csv
+    pages = ingest_export(sys.argv[1])
+    links_frame(pages).to_csv(sys.argv[2], index=False)
+    print(f"{len(pages)} indexable HTML pages, {pages.memory_usage(deep=True).sum() / 1e6:.1f} MB in memory")
@@ -0,0 +1,426 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from cache import LRUCache
+from corpus import document_ids, read_document, tokenize
+from data_loader import DATA_DIR
+from figure_cache import dataset_fingerprint
+from ingest import load_pages, links_frame
+from sites import SITES
+
+INDEX_FILE = "inverted_index.npz"
+MAX_TERM_LENGTH = 40  # longer tokens are URLs, hashes and other noise
+MAX_SEGMENTS = 8
+COMPACT_RATIO = 0.25  # compact a site once a quarter of its indexed documents are deleted
+TERM_BATCH = 50_000  # terms merged at a time while compacting, to bound memory
+SEGMENT_FIELDS = ['terms', 'df', 'doc_offsets', 'tf_offsets', 'pos_offsets', 'doc_bytes', 'tf_bytes', 'pos_bytes']
+
+_indexes = LRUCache(max_entries=2)
+_searches = LRUCache(max_entries=64)
+
+
+def encode_varints(values):
+    # LEB128: 7 bits per byte, high bit set on every byte but the last. Returns the
+    # bytes and the encoded size of each value.
+    values = np.asarray(values, dtype=np.uint64)
+    sizes = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        sizes += rest > 0
+        rest >>= np.uint64(7)
+    starts = np.cumsum(sizes) - sizes
+    shift = (np.arange(sizes.sum()) - np.repeat(starts, sizes)).astype(np.uint64) * np.uint64(7)
+    data = ((np.repeat(values, sizes) >> shift) & np.uint64(0x7F)).astype(np.uint8)
+    data[shift < np.repeat((sizes - 1) * 7, sizes).astype(np.uint64)] |= 0x80
+    return data, sizes
+
+
+def decode_varints(data):
+    data = np.asarray(data, dtype=np.uint8)
+    ends = np.flatnonzero(data < 0x80)
+    if len(ends) == len(data):
+        # Every value fits in one byte, the common case for position deltas
+        return data.astype(np.int64)
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    values = (data[starts] & 0x7F).astype(np.int64)
+    # Then add the k-th byte of every value that is longer than k bytes
+    longer = np.flatnonzero(ends > starts)
+    for k in range(1, int((ends - starts).max()) + 1):
+        longer = longer[ends[longer] - starts[longer] >= k]
+        values[longer] |= (data[starts[longer] + k] & 0x7F).astype(np.int64) << (7 * k)
+    return values
+
+
+def _segmented_cumsum(values, lengths):
+    # Running sums that restart at every segment, e.g. turning per-term deltas into doc numbers
+    totals = np.cumsum(values)
+    starts = np.cumsum(lengths) - lengths
+    before = np.concatenate([[0], totals])[starts]
+    return totals - np.repeat(before, lengths)
+
+
+def _byte_offsets(rows, sizes, count):
+    return np.concatenate([[0], np.cumsum(np.bincount(rows, weights=sizes, minlength=count).astype(np.int64))])
+
+
+class Segment:
+    # Immutable postings for a batch of documents. Terms are sorted; for each term the
+    # three varint streams hold its doc number deltas, term frequencies and, per
+    # document, the deltas between word positions.
+    def __init__(self, terms, df, doc_offsets, tf_offsets, pos_offsets, doc_bytes, tf_bytes, pos_bytes):
+        self.terms = terms
+        self.df = df
+        self.doc_offsets = doc_offsets
+        self.tf_offsets = tf_offsets
+        self.pos_offsets = pos_offsets
+        self.doc_bytes = doc_bytes
+        self.tf_bytes = tf_bytes
+        self.pos_bytes = pos_bytes
+
+    @classmethod
+    def from_occurrences(cls, vocabulary, term_ids, docs, positions):
+        # vocabulary[term_ids[i]] occurs in document docs[i] at word positions[i]
+        vocabulary = np.asarray(vocabulary, dtype=str)
+        order = np.argsort(vocabulary, kind='stable')
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        rows = rank[term_ids]
+        sort = np.lexsort((positions, docs, rows))
+        rows, docs, positions = rows[sort], np.asarray(docs, dtype=np.int64)[sort], np.asarray(positions, dtype=np.int64)[sort]
+
+        new_posting = np.concatenate([[True], (rows[1:] != rows[:-1]) | (docs[1:] != docs[:-1])])
+        posting_starts = np.flatnonzero(new_posting)
+        posting_rows, posting_docs = rows[posting_starts], docs[posting_starts]
+        tfs = np.diff(np.concatenate([posting_starts, [len(rows)]]))
+        new_term = np.concatenate([[True], posting_rows[1:] != posting_rows[:-1]])
+        doc_deltas = np.where(new_term, posting_docs, posting_docs - np.concatenate([[0], posting_docs[:-1]]))
+        position_deltas = np.where(new_posting, positions, positions - np.concatenate([[0], positions[:-1]]))
+
+        count = len(vocabulary)
+        doc_bytes, doc_sizes = encode_varints(doc_deltas)
+        tf_bytes, tf_sizes = encode_varints(tfs)
+        pos_bytes, pos_sizes = encode_varints(position_deltas)
+        return cls(vocabulary[order], np.bincount(posting_rows, minlength=count),
+                   _byte_offsets(posting_rows, doc_sizes, count), _byte_offsets(posting_rows, tf_sizes, count),
+                   _byte_offsets(rows, pos_sizes, count), doc_bytes, tf_bytes, pos_bytes)
+
+    @classmethod
+    def concat(cls, segments):
+        # Joins segments over disjoint, increasing term ranges
+        fields = {'terms': np.concatenate([segment.terms for segment in segments]).astype(str),
+                  'df': np.concatenate([segment.df for segment in segments])}
+        for stream in ('doc', 'tf', 'pos'):
+            offsets, data, base = [np.zeros(1, dtype=np.int64)], [], 0
+            for segment in segments:
+                offsets.append(getattr(segment, f'{stream}_offsets')[1:] + base)
+                data.append(getattr(segment, f'{stream}_bytes'))
+                base += len(data[-1])
+            fields[f'{stream}_offsets'] = np.concatenate(offsets)
+            fields[f'{stream}_bytes'] = np.concatenate(data).astype(np.uint8)
+        return cls(**fields)
+
+    def find(self, term):
+        row = np.searchsorted(self.terms, term)
+        return row if row < len(self.terms) and self.terms[row] == term else -1
+
+    def term_range(self, low, high=None):
+        # Rows of the terms in [low, high)
+        return np.searchsorted(self.terms, low), len(self.terms) if high is None else np.searchsorted(self.terms, high)
+
+    def postings(self, start, stop):
+        # Doc numbers and term frequencies of the terms in rows [start, stop), without positions
+        df = self.df[start:stop]
+        docs = _segmented_cumsum(decode_varints(self.doc_bytes[self.doc_offsets[start]:self.doc_offsets[stop]]), df)
+        tfs = decode_varints(self.tf_bytes[self.tf_offsets[start]:self.tf_offsets[stop]])
+        return np.repeat(np.arange(start, stop), df), docs, tfs
+
+    def occurrences(self, start, stop):
+        # One (row, doc, position) per occurrence of the terms in rows [start, stop)
+        rows, docs, tfs = self.postings(start, stop)
+        positions = _segmented_cumsum(decode_varints(self.pos_bytes[self.pos_offsets[start]:self.pos_offsets[stop]]), tfs)
+        return np.repeat(rows, tfs), np.repeat(docs, tfs), positions
+
+    def keys(self, row):
+        # doc << 32 | position for every occurrence of one term, in order, plus its postings
+        _, docs, tfs = self.postings(row, row + 1)
+        totals = np.cumsum(decode_varints(self.pos_bytes[self.pos_offsets[row]:self.pos_offsets[row + 1]]))
+        before = np.concatenate([[0], totals])[np.cumsum(tfs) - tfs]
+        return totals + np.repeat((docs << 32) - before, tfs), docs, tfs
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, field).nbytes for field in SEGMENT_FIELDS)
+
+
+def _empty_docs():
+    return pd.DataFrame({'url_id': pd.Series(dtype=str), 'size': pd.Series(dtype='int64'),
+                         'mtime_ns': pd.Series(dtype='int64'), 'live': pd.Series(dtype=bool)})
+
+
+def _index_documents(batch):
+    # Builds one segment for documents numbered first_doc, first_doc + 1, ...
+    folder, url_ids, first_doc = batch
+    vocabulary, term_ids, docs, positions = {}, [], [], []
+    for doc, url_id in enumerate(url_ids, first_doc):
+        tokens = [token for token in tokenize(read_document(folder, url_id)) if len(token) <= MAX_TERM_LENGTH]
+        term_ids.append(np.fromiter((vocabulary.setdefault(token, len(vocabulary)) for token in tokens), dtype=np.int64, count=len(tokens)))
+        docs.append(np.full(len(tokens), doc, dtype=np.int64))
+        positions.append(np.arange(len(tokens), dtype=np.int64))
+    if not vocabulary:
+        return None
+    return Segment.from_occurrences(list(vocabulary), np.concatenate(term_ids), np.concatenate(docs), np.concatenate(positions))
+
+
+def index_documents(folder, url_ids, first_doc=0, processes=None, batch_size=512):
+    batches = [(folder, url_ids[i:i + batch_size], first_doc + i) for i in range(0, len(url_ids), batch_size)]
+    if processes == 1 or len(batches) <= 1:
+        segments = list(map(_index_documents, batches))
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            segments = list(pool.map(_index_documents, batches))
+    return [segment for segment in segments if segment is not None]
+
+
+class InvertedIndex:
+    # Positional index over the extracted page text, partitioned by site. Each partition
+    # is a list of segments plus a document table keyed by URL_ID and the page file's size
+    # and mtime (like near_duplicates.SignatureStore). Updated or removed pages are marked
+    # dead and skipped at query time until the partition is compacted.
+    def __init__(self, path=os.path.join(DATA_DIR, INDEX_FILE)):
+        self.path = path
+        self.partitions = {}
+        # Identifies the saved file the partitions were read from; cleared on any change
+        self.version = None
+        if os.path.exists(path):
+            stat = os.stat(path)
+            self.version = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+            with np.load(path) as data:
+                for number, site in enumerate(data['sites']):
+                    prefix = f'p{number}_'
+                    docs = pd.DataFrame({'url_id': data[prefix + 'url_ids'], 'size': data[prefix + 'sizes'],
+                                         'mtime_ns': data[prefix + 'mtimes'], 'live': data[prefix + 'live']})
+                    segments = [Segment(**{field: data[f'{prefix}s{segment}_{field}'] for field in SEGMENT_FIELDS})
+                                for segment in range(int(data[prefix + 'segments']))]
+                    self.partitions[str(site)] = (segments, docs)
+
+    def sites(self):
+        return list(self.partitions)
+
+    def documents(self, site):
+        return self.partitions.get(site, ([], _empty_docs()))[1]
+
+    def add_documents(self, site, folder, url_ids, processes=None):
+        # Indexes the given pages as new documents; call remove_documents first for pages already indexed
+        self.version = None
+        segments, docs = self.partitions.get(site, ([], _empty_docs()))
+        stats = [os.stat(os.path.join(folder, f"{url_id}.txt")) for url_id in url_ids]
+        added = pd.DataFrame({'url_id': list(url_ids), 'size': [stat.st_size for stat in stats],
+                              'mtime_ns': [stat.st_mtime_ns for stat in stats], 'live': True}, columns=docs.columns)
+        segments = segments + index_documents(folder, list(url_ids), len(docs), processes)
+        self.partitions[site] = (segments, pd.concat([docs, added], ignore_index=True))
+        if len(segments) > MAX_SEGMENTS:
+            self.compact(site)
+
+    def remove_documents(self, site, url_ids):
+        self.version = None
+        segments, docs = self.partitions.get(site, ([], _empty_docs()))
+        docs.loc[docs['url_id'].isin(list(url_ids)), 'live'] = False
+        if len(docs) and (~docs['live']).mean() >= COMPACT_RATIO:
+            self.compact(site)
+
+    def update(self, site, folder, processes=None):
+        # Brings a partition in line with the extracted pages on disk; returns (indexed, removed) URL_IDs
+        docs = self.documents(site)
+        url_ids = document_ids(folder)
+        stats = [os.stat(os.path.join(folder, f"{url_id}.txt")) for url_id in url_ids]
+        # Typed like the document table, so a site without extracted pages merges cleanly
+        current = pd.DataFrame({'url_id': pd.Series(url_ids, dtype=str),
+                                'size': pd.Series([stat.st_size for stat in stats], dtype='int64'),
+                                'mtime_ns': pd.Series([stat.st_mtime_ns for stat in stats], dtype='int64')})
+        live = docs[docs['live']]
+        unchanged = live.merge(current, on=['url_id', 'size', 'mtime_ns'])['url_id']
+        stale = current.loc[~current['url_id'].isin(unchanged), 'url_id'].tolist()
+        removed = live.loc[~live['url_id'].isin(unchanged), 'url_id'].tolist()
+        self.remove_documents(site, removed)
+        if stale:
+            self.add_documents(site, folder, stale, processes)
+        return stale, sorted(set(removed) - set(stale))
+
+    def compact(self, site):
+        # Merges the segments into one, drops dead documents and renumbers the live ones
+        self.version = None
+        segments, docs = self.partitions[site]
+        live = docs['live'].to_numpy()
+        renumber = np.cumsum(live) - 1
+        boundaries = np.unique(np.concatenate([segment.terms for segment in segments]))[::TERM_BATCH] if segments else []
+        pieces = []
+        for low, high in zip(boundaries, list(boundaries[1:]) + [None]):
+            vocabulary, term_ids, doc_numbers, positions = [], [], [], []
+            for segment in segments:
+                start, stop = segment.term_range(low, high)
+                rows, seg_docs, seg_positions = segment.occurrences(start, stop)
+                keep = live[seg_docs]
+                term_ids.append(rows[keep] - start + sum(len(terms) for terms in vocabulary))
+                vocabulary.append(segment.terms[start:stop])
+                doc_numbers.append(renumber[seg_docs[keep]])
+                positions.append(seg_positions[keep])
+            # from_occurrences needs distinct terms, so map each segment's rows onto the batch vocabulary
+            terms, inverse = np.unique(np.concatenate(vocabulary), return_inverse=True)
+            term_ids = inverse[np.concatenate(term_ids)]
+            used = np.unique(term_ids)
+            if len(used):
+                remap = np.full(len(terms), -1, dtype=np.int64)
+                remap[used] = np.arange(len(used))
+                pieces.append(Segment.from_occurrences(terms[used], remap[term_ids], np.concatenate(doc_numbers), np.concatenate(positions)))
+        merged = [Segment.concat(pieces)] if pieces else []
+        self.partitions[site] = (merged, docs[live].reset_index(drop=True))
+
+    def occurrences(self, site, term):
+        # Sorted doc << 32 | position keys of a term's live occurrences in a site
+        segments, docs = self.partitions.get(site, ([], _empty_docs()))
+        live = docs['live'].to_numpy()
+        keys = []
+        for segment in segments:
+            row = segment.find(term)
+            if row >= 0:
+                seg_keys, seg_docs, tfs = segment.keys(row)
+                keys.append(seg_keys if live.all() else seg_keys[np.repeat(live[seg_docs], tfs)])
+        return np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
+
+    def term_frequencies(self, site, term):
+        # (doc numbers, counts) of a single term, read without decoding positions
+        segments, docs = self.partitions.get(site, ([], _empty_docs()))
+        live = docs['live'].to_numpy()
+        found_docs, found_tfs = [], []
+        for segment in segments:
+            row = segment.find(term)
+            if row >= 0:
+                _, seg_docs, tfs = segment.postings(row, row + 1)
+                found_docs.append(seg_docs[live[seg_docs]])
+                found_tfs.append(tfs[live[seg_docs]])
+        if not found_docs:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(found_docs), np.concatenate(found_tfs)
+
+    def nbytes(self):
+        return sum(segment.nbytes for segments, _ in self.partitions.values() for segment in segments)
+
+    def save(self):
+        arrays = {'sites': np.array(list(self.partitions), dtype=str)}
+        for number, (segments, docs) in enumerate(self.partitions.values()):
+            prefix = f'p{number}_'
+            arrays.update({prefix + 'url_ids': docs['url_id'].to_numpy(dtype=str), prefix + 'sizes': docs['size'].to_numpy(dtype='int64'),
+                           prefix + 'mtimes': docs['mtime_ns'].to_numpy(dtype='int64'), prefix + 'live': docs['live'].to_numpy(dtype=bool),
+                           prefix + 'segments': np.array(len(segments))})
+            for index, segment in enumerate(segments):
+                arrays.update({f'{prefix}s{index}_{field}': getattr(segment, field) for field in SEGMENT_FIELDS})
+        with open(self.path + '.tmp', 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(self.path + '.tmp', self.path)
+
+
+def _hits(index, site, doc_numbers, counts=None):
+    # doc_numbers are sorted; without counts, each run of one doc number is that many hits
+    if counts is None:
+        starts = np.flatnonzero(np.concatenate([[True], doc_numbers[1:] != doc_numbers[:-1]])) if len(doc_numbers) else np.empty(0, dtype=np.int64)
+        doc_numbers, counts = doc_numbers[starts], np.diff(np.concatenate([starts, [len(doc_numbers)]]))
+    docs = index.documents(site)
+    return pd.DataFrame({'Site': site, 'URL_ID': docs['url_id'].to_numpy()[doc_numbers], 'Hits': counts})
+
+
+def _result(frames):
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return pd.DataFrame({'Site': pd.Series(dtype=str), 'URL_ID': pd.Series(dtype=str), 'Hits': pd.Series(dtype='int64')})
+    return pd.concat(frames, ignore_index=True).sort_values(['Hits', 'Site'], ascending=[False, True], kind='stable').reset_index(drop=True)
+
+
+def phrase_hits(index, phrase, sites=None):
+    # Per-URL counts of an exact phrase; words are tokenized like the keyword counts
+    words = tokenize(phrase)
+    frames = []
+    for site in (sites if sites is not None else index.sites()) if words else []:
+        if len(words) == 1:
+            docs, tfs = index.term_frequencies(site, words[0])
+            frames.append(_hits(index, site, docs, tfs))
+            continue
+        # Shifting each word's positions back by its offset lines up the phrase starts;
+        # intersecting from the rarest word keeps the candidate set small
+        keys, *others = sorted((index.occurrences(site, word) - offset for offset, word in enumerate(words)), key=len)
+        for occurrences in others:
+            if not len(keys):
+                break
+            keys = np.intersect1d(keys, occurrences, assume_unique=True)
+        if len(keys):
+            frames.append(_hits(index, site, keys >> 32))
+    return _result(frames)
+
+
+def proximity_hits(index, query, distance, sites=None):
+    # Per-URL counts of the first word occurring with every other word at most `distance` words away
+    words = list(dict.fromkeys(tokenize(query)))
+    frames = []
+    for site in (sites if sites is not None else index.sites()) if words else []:
+        anchors = index.occurrences(site, words[0])
+        near = np.ones(len(anchors), dtype=bool)
+        for word in words[1:]:
+            # Keys put the doc number above the position, so a window never spans two documents
+            occurrences = index.occurrences(site, word)
+            near &= np.searchsorted(occurrences, anchors + distance, 'right') > np.searchsorted(occurrences, anchors - distance, 'left')
+        frames.append(_hits(index, site, anchors[near] >> 32))
+    return _result(frames)
+
+
+def search(index, query, distance=0, sites=None):
+    # Phrase search for distance 0, proximity search otherwise. Results are cached per
+    # saved index, as the explorer re-runs the same query on every rerun.
+    if index.version is None:
+        return proximity_hits(index, query, distance, sites) if distance else phrase_hits(index, query, sites)
+    key = (index.version, query, distance, tuple(sites) if sites is not None else None)
+    hits = _searches.get(key)
+    if hits is None:
+        hits = _searches.put(key, proximity_hits(index, query, distance, sites) if distance else phrase_hits(index, query, sites))
+    return hits
+
+
+def url_hits(index, query, distance, site, internal_file):
+    # search() for one site joined to the URLs of the crawl the pages were extracted from.
+    # Cached too, so the explorer table is the same frame on every rerun.
+    pages = load_pages(internal_file)
+    key = (index.version, query, distance, site, dataset_fingerprint(pages))
+    hits = _searches.get(key) if index.version is not None else None
+    if hits is None:
+        hits = search(index, query, distance, [site])
+        hits = hits.assign(URL_ID=pd.to_numeric(hits['URL_ID'], errors='coerce')).merge(links_frame(pages), on='URL_ID', how='left')
+        hits = hits[['URL_ID', 'URL', 'Hits']]
+        if index.version is not None:
+            hits = _searches.put(key, hits)
+    return hits
+
+
+def load_index(folder=DATA_DIR):
+    # Cached on the index file's version; None until `python inverted_index.py` has run
+    path = os.path.abspath(os.path.join(folder, INDEX_FILE))
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    index = _indexes.get(key)
+    if index is None:
+        index = _indexes.put(key, InvertedIndex(path))
+    return index
+
+
+if __name__ == "__main__":
+    # python inverted_index.py ["phrase to look up"]
+    index = InvertedIndex()
+    for site, config in SITES.items():
+        indexed, removed = index.update(site, config['corpus'])
+        print(f"{site}: {len(indexed)} pages indexed, {len(removed)} removed")
+    index.save()
+    print(f"{index.nbytes() / 1e6:.1f} MB of postings")
+    if len(sys.argv) > 1:
+        print(phrase_hits(index, sys.argv[1]).head(20).to_string(index=False))
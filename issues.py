@@ -1,39 +1,35 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import os
+from figure_cache import cached_figure
+from issues_cube import issues_cube, issue_rollups
+from table_view import table_view
+from profiler import profiled, plotly_chart
 
+@profiled("issues")
 def issues():
-    def load_data(folder_name="Data"):
-        data_dict = {}
-        for file_name in os.listdir(folder_name):
-            file_path = os.path.join(folder_name, file_name)
-            try:
-                df = pd.read_csv(file_path, on_bad_lines='skip')
-                data_dict[file_name] = df
-            except pd.errors.ParserError:
-                try:
-                    df = pd.read_excel(file_path)
-                    data_dict[file_name] = df
-                except Exception as e:
-                    with open(file_path, 'r') as file:
-                        content = file.read()
-                    df = pd.DataFrame({'content': [content]})
-                    data_dict[file_name] = df
-            except Exception as e:
-                st.error(f"Error loading {file_name}: {str(e)}")
-        return data_dict
-    data_dict = load_data()
-    
+    cube = issues_cube()
+    sites = list(dict.fromkeys(site for site, _ in cube['reports']))
+
     st.markdown("<h1 style='text-align: center;'>SEO Issues Overview Dashboard</h1><hr style='border: 2px solid rainbow; border-radius: 5px;'>", unsafe_allow_html=True)
-    st.markdown("""### Data Overview
+    if not sites:
+        st.info("""No issue reports were found. Export **Reports → Issues Overview** from Screaming Frog as
+        `Data/issues_overview_report.csv` (or `issues_overview_report_<site>.csv` for other sites) to fill this page.""")
+        return
+    col1, col2 = st.columns(2)
+    with col1:
+        site = st.selectbox("Website", sites, key="issues_site")
+    with col2:
+        crawls = [crawl for report_site, crawl in cube['reports'] if report_site == site]
+        # find_reports lists each site's crawls oldest first with the undated (latest) report last
+        crawl = st.selectbox("Crawl", crawls, index=len(crawls) - 1, key="issues_crawl")
+    rollups = issue_rollups(cube, site, crawl)
+
+    st.markdown(f"""### Data Overview
     This dashboard provides an analysis of SEO issues extracted from Screaming Frog. 
-    The data represents various issues identified for different URLs from the Splashtop website, including their types, priorities, and the percentage contribution to the total SEO issues. 
+    The data represents various issues identified for different URLs from the {site} website, including their types, priorities, and the percentage contribution to the total SEO issues. 
     Each plot below helps to visualize different aspects of the data.
     """)
 
-    df = data_dict.get("issues_overview_report.csv")
+    df = rollups['issues']
     st.markdown("""
         <style>
         h1 { text-align: center; }
@@ -45,34 +41,33 @@ def issues():
 
     st.subheader("SEO Issues Data Overview",divider='rainbow')
     st.write("The table below shows the data used for the analysis.")
-    st.dataframe(df) 
+    table_view(df, key="issues_dataset")
     st.divider()
 
     st.subheader("Distribution of Issue Types",divider='rainbow')
     st.write("""This pie chart shows the distribution of different issue types across the dataset. 
     Each slice represents the proportion of a specific issue type in relation to the total number of issues identified.""")
 
-    issue_type_counts = df['Issue Type'].value_counts().reset_index()
-    issue_type_counts.columns = ['Issue Type', 'Count']
-
-    fig1 = px.pie(issue_type_counts, values='Count', names='Issue Type', title='Distribution of Issue Types')
-    fig1.update_traces(marker=dict(line=dict(color='#000000', width=1)))
-    fig1.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+    fig1 = cached_figure(rollups['type_counts'], {
+        'chart': 'pie',
+        'args': dict(values='Count', names='Issue Type', title='Distribution of Issue Types'),
+        'update_traces': dict(marker=dict(line=dict(color='#000000', width=1))),
+        'layout': dict(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')})
 
-    st.plotly_chart(fig1, use_container_width=True)
+    plotly_chart(fig1, use_container_width=True)
     st.divider()
 
     st.subheader("Distribution of Issue Priority",divider='rainbow')
     st.write("""This pie chart provides insight into how SEO issues are prioritized. 
     It helps to understand the proportion of high, medium, and low priority issues that need attention.""")
 
-    issue_priority = df['Issue Priority'].value_counts().reset_index()
-    issue_priority.columns = ['Issue Priority', 'Count']
-    fig2 = px.pie(issue_priority, values='Count', names='Issue Priority',title='Distribution of Issue Priority')
-    fig2.update_traces(marker=dict(line=dict(color='#000000', width=1)))
-    fig2.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+    fig2 = cached_figure(rollups['priority_counts'], {
+        'chart': 'pie',
+        'args': dict(values='Count', names='Issue Priority', title='Distribution of Issue Priority'),
+        'update_traces': dict(marker=dict(line=dict(color='#000000', width=1))),
+        'layout': dict(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')})
 
-    st.plotly_chart(fig2, use_container_width=True)
+    plotly_chart(fig2, use_container_width=True)
     st.divider()
     
     st.subheader("Top 10 SEO Issues by Percentage",divider='rainbow')
@@ -81,25 +76,40 @@ def issues():
     It shows which issues are most common, allowing for focused troubleshooting.
     """)
 
-    fig3 = px.bar(df.nlargest(10, '% of Total'), 
-                x='% of Total', 
-                y='Issue Name', 
-                orientation='h',
-                title='Top 10 SEO Issues by Percentage')
-    fig3.update_layout(yaxis={'categoryorder':'total ascending'}, 
-                    paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+    fig3 = cached_figure(rollups['top_issues'], {
+        'chart': 'bar',
+        'args': dict(x='% of Total', y='Issue Name', orientation='h', title='Top 10 SEO Issues by Percentage'),
+        'layout': dict(yaxis={'categoryorder':'total ascending'},
+                    paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')})
 
-    st.plotly_chart(fig3, use_container_width=True)
+    plotly_chart(fig3, use_container_width=True)
     st.divider()
     st.subheader("Sunburst Chart of SEO Issues",divider='rainbow')
     st.write("""This sunburst chart visualizes a hierarchical breakdown of the issues, starting from the issue type, 
     then the priority level, and finally the specific issue name. It offers a layered view of how different types of issues are distributed.
     """)
 
-    fig4 = px.sunburst(df,path=['Issue Type', 'Issue Priority', 'Issue Name'], 
-                    values='% of Total',
-                    title='Sunburst Chart of SEO Issues')
-    fig4.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+    fig4 = cached_figure(rollups['hierarchy'], {
+        'chart': 'sunburst',
+        'args': dict(path=['Issue Type', 'Issue Priority', 'Issue Name'], values='% of Total',
+                    title='Sunburst Chart of SEO Issues'),
+        'layout': dict(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')})
+
+    plotly_chart(fig4, use_container_width=True)
+    st.divider()
+
+    if len(cube['reports']) > 1:
+        st.subheader("Issue Priority by Website and Crawl",divider='rainbow')
+        st.write("""This chart compares how many issues of each priority were reported for every website and crawl, 
+    making it easy to see which sites carry the most high-priority problems and how that changes between crawls.""")
+
+        priority_counts = cube['priority_counts'].assign(Report=lambda d: d['Site'] + ' · ' + d['Crawl'])
+        fig5 = cached_figure(priority_counts, {
+            'chart': 'bar',
+            'args': dict(x='Report', y='Count', color='Issue Priority', barmode='stack',
+                        title='Issue Priority by Website and Crawl',
+                        category_orders={'Issue Priority': ['High', 'Medium', 'Low']}),
+            'layout': dict(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')})
 
-    st.plotly_chart(fig4, use_container_width=True)
-    st.divider()
\ No newline at end of file
+        plotly_chart(fig5, use_container_width=True)
+        st.divider()
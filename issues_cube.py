@@ -0,0 +1,86 @@
+import os
+import re
+import pandas as pd
+from cache import LRUCache
+from data_loader import DATA_DIR, load_dataset
+from profiler import section
+from sites import SITES
+
+# The site suffix must not swallow the crawl date of an undated-site report
+REPORT_PATTERN = re.compile(r'^issues_overview_report(?:_(?!\d{4}-\d{2}-\d{2}\.csv$)(?P<site>[a-z0-9-]+?))?(?:_(?P<crawl>\d{4}-\d{2}-\d{2}))?\.csv$', re.I)
+LATEST_CRAWL = 'Latest'
+LEVELS = ['Issue Type', 'Issue Priority', 'Issue Name']
+
+_cubes = LRUCache(max_entries=4)
+
+
+def _site_suffixes():
+    # Report suffix -> site, from each registry site's issues_file
+    suffixes = {}
+    for site, config in SITES.items():
+        match = REPORT_PATTERN.match(config['issues_file'])
+        suffix = match.group('site') if match else None
+        suffixes[suffix.lower() if suffix else None] = site
+    return suffixes
+
+
+def find_reports(folder=DATA_DIR):
+    # issues_overview_report[_<site>][_<YYYY-MM-DD>].csv, in registry order with each
+    # site's crawls oldest first and the undated (latest) report last, like crawl_diff.find_crawls
+    suffixes = _site_suffixes()
+    reports = []
+    for file_name in sorted(os.listdir(folder)):
+        match = REPORT_PATTERN.match(file_name)
+        if match:
+            suffix = match.group('site')
+            site = suffixes.get(suffix.lower() if suffix else None, suffix.title() if suffix else None)
+            reports.append((site, match.group('crawl') or LATEST_CRAWL, file_name))
+    order = list(SITES)
+    return sorted(reports, key=lambda report: (order.index(report[0]) if report[0] in order else len(order), report[0] or '',
+                                               report[1] == LATEST_CRAWL, report[1]))
+
+
+def build_cube(reports, folder=DATA_DIR):
+    frames = []
+    for site, crawl, file_name in reports:
+        df = load_dataset(file_name, folder)
+        if df is not None:
+            frames.append(df.assign(Site=site, Crawl=crawl))
+    keys = ['Site', 'Crawl']
+    if not frames:
+        # No issues_overview_report*.csv in Data; the Issues page shows an empty state
+        return {'reports': [], 'priority_counts': pd.DataFrame(columns=keys + ['Issue Priority', 'Count']), 'slices': {}}
+    issues = pd.concat(frames, ignore_index=True)
+
+    # Every chart on the Issues page is a slice of one of these rollups
+    rollups = {
+        'issues': issues,
+        'type_counts': issues.groupby(keys + ['Issue Type'], sort=False).size().rename('Count').reset_index().sort_values('Count', ascending=False, kind='stable'),
+        'priority_counts': issues.groupby(keys + ['Issue Priority'], sort=False).size().rename('Count').reset_index().sort_values('Count', ascending=False, kind='stable'),
+        'top_issues': issues.sort_values('% of Total', ascending=False, kind='stable').groupby(keys).head(10),
+        'hierarchy': issues.groupby(keys + LEVELS, as_index=False, sort=False)[['URLs', '% of Total']].sum(),
+    }
+    slices = {}
+    for name, frame in rollups.items():
+        for report, group in frame.groupby(keys, sort=False):
+            slices.setdefault(report, {})[name] = group.drop(columns=keys).reset_index(drop=True)
+    return {
+        'reports': list(slices),
+        'priority_counts': rollups['priority_counts'],
+        'slices': slices,
+    }
+
+
+def issues_cube(folder=DATA_DIR):
+    # Rebuilt only when a report is added, removed or modified
+    reports = find_reports(folder)
+    key = tuple((file_name, os.stat(os.path.join(folder, file_name)).st_mtime_ns) for _, _, file_name in reports)
+    cube = _cubes.get(key)
+    if cube is None:
+        with section("build issues cube"):
+            cube = _cubes.put(key, build_cube(reports, folder))
+    return cube
+
+
+def issue_rollups(cube, site, crawl=LATEST_CRAWL):
+    return cube['slices'][(site, crawl)]
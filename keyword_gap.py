@@ -0,0 +1,97 @@
+import sys
+import numpy as np
+import pandas as pd
+from cache import LRUCache
+from data_loader import load_dataset
+from figure_cache import dataset_fingerprint
+from sites import PRIMARY_SITE
+
+RANKINGS_FILE = "keyword_rankings.csv"
+# Every other column of a rank export is a competitor's ranking position (blank or 0 = not ranking)
+KEYWORD_FIELDS = ['Keyword', 'Intent', 'Volume', 'KD%', 'CPC', 'Competition']
+# Expected organic click-through rate for positions 1-20; lower positions get no clicks
+CTR_CURVE = np.array([
+    0.319, 0.247, 0.187, 0.133, 0.095, 0.068, 0.049, 0.035, 0.025, 0.018,
+    0.012, 0.010, 0.009, 0.008, 0.007, 0.006, 0.005, 0.004, 0.004, 0.003,
+])
+# Per-keyword charts only draw the highest-volume keywords; large exports have 100k+ rows
+TOP_KEYWORDS = 20
+PLOTTED_KEYWORDS = 1000
+
+_gaps = LRUCache(max_entries=8)
+
+
+def competitor_columns(rankings):
+    return [column for column in rankings.columns if column not in KEYWORD_FIELDS]
+
+
+def rank_matrix(rankings, competitors):
+    # Dense keywords x competitors float32 matrix; inf marks "not ranking"
+    ranks = rankings[competitors].to_numpy(dtype=np.float32, na_value=np.nan)
+    ranks[~(ranks > 0)] = np.inf
+    return ranks
+
+
+def expected_ctr(ranks):
+    ctr = np.zeros(ranks.shape)
+    ranked = ranks <= len(CTR_CURVE)
+    ctr[ranked] = CTR_CURVE[ranks[ranked].astype(int) - 1]
+    return ctr
+
+
+def gap_analysis(rankings, site=PRIMARY_SITE):
+    competitors = competitor_columns(rankings)
+    others = [column for column in competitors if column != site]
+    ranks = rank_matrix(rankings, competitors)
+    volume = rankings['Volume'].to_numpy(dtype=float)
+    best = ranks.min(axis=1, keepdims=True)
+
+    # A keyword counts as won by every competitor sharing the best position
+    top = (ranks == best) & np.isfinite(best)
+    clicks = volume[:, None] * expected_ctr(ranks)
+    own = ranks[:, competitors.index(site)]
+    rivals = ranks[:, [competitors.index(column) for column in others]]
+    ranked_by_rival = np.isfinite(rivals).any(axis=1)
+
+    keywords = rankings[['Keyword', 'Volume']].assign(**{site: own})
+    by_volume = rankings.iloc[np.argsort(-np.nan_to_num(volume, nan=-np.inf), kind='stable')[:PLOTTED_KEYWORDS]]
+    winners = np.array(competitors, dtype=object)[ranks.argmin(axis=1)]
+    return {
+        'competitors': competitors,
+        'top_keywords': by_volume.head(TOP_KEYWORDS),
+        'plotted_keywords': by_volume,
+        'winners': rankings[['Keyword']].assign(Winner=np.where(np.isfinite(best[:, 0]), winners, None)),
+        'top_share': pd.DataFrame({'Competitor': competitors, 'Share': top.sum(axis=0) / len(rankings) * 100}),
+        'share_of_voice': pd.DataFrame({
+            'Competitor': competitors,
+            'Estimated Clicks': clicks.sum(axis=0).round(),
+            'Share of Voice': clicks.sum(axis=0) / (clicks.sum() or 1) * 100,
+        }),
+        # Missing: competitors rank but the site does not; weak: the site ranks below every
+        # competitor that ranks (unranked rivals don't count as outranking it)
+        'missing': keywords[~np.isfinite(own) & ranked_by_rival].sort_values('Volume', ascending=False, kind='stable'),
+        'weak': keywords[np.isfinite(own) & ((own[:, None] > rivals) | ~np.isfinite(rivals)).all(axis=1) & np.isfinite(rivals).any(axis=1)].sort_values('Volume', ascending=False, kind='stable'),
+    }
+
+
+def keyword_gap(rankings, site=PRIMARY_SITE):
+    key = (dataset_fingerprint(rankings), site)
+    gaps = _gaps.get(key)
+    if gaps is None:
+        gaps = _gaps.put(key, gap_analysis(rankings, site))
+    return gaps
+
+
+def load_rankings():
+    return load_dataset(RANKINGS_FILE)
+
+
+if __name__ == "__main__":
+    # python keyword_gap.py [site]
+    rankings = load_rankings()
+    site = sys.argv[1] if len(sys.argv) > 1 else PRIMARY_SITE
+    if site not in competitor_columns(rankings):
+        sys.exit(f"{RANKINGS_FILE} has no ranking column for {site}")
+    gaps = keyword_gap(rankings, site)
+    print(gaps['share_of_voice'].to_string(index=False))
+    print(f"{len(gaps['missing'])} missing and {len(gaps['weak'])} weak keywords")
@@ -0,0 +1,176 @@
+import os
+import sys
+import hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from corpus import CORPUS_DIR, document_ids, read_document, tokenize
+from cache import LRUCache
+from data_loader import DATA_DIR, load_dataset
+from figure_cache import dataset_fingerprint
+from sites import SITES
+
+KEYWORD_FILE = "keyword_frequency.csv"
+URL_KEYWORD_FILE = "keyword_frequency_by_url.csv"
+SITE_CORPORA = {site: config['corpus'] for site, config in SITES.items()}
+DEFAULT_KEYWORDS = [
+    'remote access', 'remote desktop', 'virtual access', 'remote control',
+    'remote', 'remote desktop software', 'remote access solutions',
+    'virtual desktop connection', 'secure remote access', 'remote control software',
+]
+
+_tables = LRUCache(max_entries=4)
+
+
+class KeywordAutomaton:
+    # Aho-Corasick automaton over word tokens: every phrase, including phrases nested
+    # inside longer ones ('remote' in 'remote access'), is counted in one pass.
+    def __init__(self, phrases):
+        self.phrases = list(phrases)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for index, phrase in enumerate(self.phrases):
+            state = 0
+            for token in tokenize(phrase):
+                if token not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][token] = len(self.goto) - 1
+                state = self.goto[state][token]
+            if state:
+                self.output[state].append(index)
+        self._link()
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(token, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def count(self, tokens):
+        counts = [0] * len(self.phrases)
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for index in output[state]:
+                counts[index] += 1
+        return counts
+
+
+_worker_automaton = None
+
+
+def _init_worker(phrases):
+    global _worker_automaton
+    _worker_automaton = KeywordAutomaton(phrases)
+
+
+def _count_documents(batch):
+    folder, url_ids = batch
+    rows = []
+    for url_id in url_ids:
+        counts = _worker_automaton.count(tokenize(read_document(folder, url_id)))
+        rows.extend((url_id, index, count) for index, count in enumerate(counts) if count)
+    return rows
+
+
+def count_corpus(folder, phrases=DEFAULT_KEYWORDS, processes=None, batch_size=64):
+    # Per-URL counts in long form (URL_ID, keyword, frequency); zero counts are omitted
+    phrases = list(dict.fromkeys(phrases))
+    url_ids = document_ids(folder)
+    batches = [(folder, url_ids[i:i + batch_size]) for i in range(0, len(url_ids), batch_size)]
+    if processes == 1 or len(batches) <= 1:
+        _init_worker(phrases)
+        results = list(map(_count_documents, batches))
+    else:
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(list(phrases),)) as pool:
+            results = list(pool.map(_count_documents, batches))
+
+    rows = [row for batch_rows in results for row in batch_rows]
+    df = pd.DataFrame(rows, columns=['URL_ID', 'keyword', 'frequency'])
+    df['keyword'] = pd.Categorical.from_codes(df['keyword'], categories=list(phrases))
+    return df
+
+
+def site_rollup(url_counts, phrases=DEFAULT_KEYWORDS):
+    phrases = list(dict.fromkeys(phrases))
+    totals = url_counts.groupby('keyword', observed=False)['frequency'].sum()
+    return totals.reindex(list(phrases), fill_value=0).rename_axis('keyword').reset_index()
+
+
+def build_keyword_tables(site_corpora=SITE_CORPORA, phrases=DEFAULT_KEYWORDS, processes=None):
+    by_url, by_site = [], []
+    for site, folder in site_corpora.items():
+        url_counts = count_corpus(folder, phrases, processes)
+        by_url.append(url_counts.assign(site=site))
+        by_site.append(site_rollup(url_counts, phrases).assign(site=site))
+    url_table = pd.concat(by_url, ignore_index=True)[['site', 'URL_ID', 'keyword', 'frequency']]
+    site_table = pd.concat(by_site, ignore_index=True)[['site', 'keyword', 'frequency']]
+    return site_table, url_table
+
+
+def corpus_version(folder):
+    # Any page that is saved, rewritten or removed changes the version
+    digest = hashlib.blake2b(digest_size=16)
+    for entry in sorted(os.scandir(folder), key=lambda entry: entry.name):
+        if entry.name.endswith('.txt'):
+            stat = entry.stat()
+            digest.update(f"{entry.name}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+    return digest.hexdigest()
+
+
+def load_keyword_table(phrases=DEFAULT_KEYWORDS):
+    # Counted from the extracted pages of every site whose corpus is present, so the tables
+    # follow the content; other sites fall back to Data/keyword_frequency.csv (python keywords.py)
+    corpora = {site: folder for site, folder in SITE_CORPORA.items() if document_ids(folder)}
+    has_file = os.path.exists(os.path.join(DATA_DIR, KEYWORD_FILE))
+    saved = load_dataset(KEYWORD_FILE) if has_file or not corpora else None
+    if not corpora:
+        return saved
+
+    key = (tuple((site, folder, corpus_version(folder)) for site, folder in corpora.items()), tuple(phrases),
+           None if saved is None else dataset_fingerprint(saved))
+    table = _tables.get(key)
+    if table is None:
+        site_table, _ = build_keyword_tables(corpora, phrases)
+        if saved is not None:
+            site_table = pd.concat([site_table, saved[~saved['site'].isin(list(corpora))]], ignore_index=True)
+        table = _tables.put(key, site_table)
+    return table
+
+
+def site_keywords(keyword_table, site):
+    return keyword_table[keyword_table['site'] == site][['keyword', 'frequency']].reset_index(drop=True)
+
+
+def keyword_comparison(keyword_table, sites):
+    wide = keyword_table.pivot(index='keyword', columns='site', values='frequency')
+    order = list(dict.fromkeys(keyword_table['keyword']))
+    # A registry site missing from the keyword table counts as zero mentions
+    return wide.reindex(index=order, columns=list(sites)).fillna(0).astype(int).rename_axis('Keyword').reset_index().rename_axis(None, axis=1)
+
+
+if __name__ == "__main__":
+    # python keywords.py [phrases.txt]
+    phrases = DEFAULT_KEYWORDS
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding='utf-8') as file:
+            phrases = [line.strip() for line in file if line.strip()]
+    corpora = {site: folder for site, folder in SITE_CORPORA.items() if os.path.isdir(folder)}
+    if not corpora:
+        sys.exit(f"No extracted pages found under {CORPUS_DIR}/; run the crawler first")
+    site_table, url_table = build_keyword_tables(corpora, phrases)
+    site_table.to_csv(os.path.join(DATA_DIR, KEYWORD_FILE), index=False)
+    url_table.to_csv(os.path.join(DATA_DIR, URL_KEYWORD_FILE), index=False)
+    print(site_table.to_string(index=False))
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+WEBGL_THRESHOLD = 5000
+MAX_POINTS = 4000
+
+
+def is_large(df):
+    return len(df) > WEBGL_THRESHOLD
+
+
+def trace_type(df):
+    # Browsers stall on SVG traces with tens of thousands of points; switch to WebGL
+    return 'scattergl' if is_large(df) else 'scatter'
+
+
+def minmax_indices(columns, max_points=MAX_POINTS):
+    # Keeps the first, last, minimum and maximum row of every bucket for every series.
+    # Rows are shared between series so they can still be drawn from one frame.
+    n = len(columns[0])
+    buckets = max(1, max_points // (2 + 2 * len(columns)))
+    bucket = np.arange(n) * buckets // n
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    keep = [starts, np.r_[starts[1:], n] - 1]
+    for values in columns:
+        # NaN rows are left out: idxmin/idxmax raise on a bucket that is entirely NaN
+        present = np.flatnonzero(~np.isnan(values))
+        grouped = pd.Series(values[present], index=present).groupby(bucket[present])
+        keep.append(grouped.idxmin().to_numpy(dtype=int))
+        keep.append(grouped.idxmax().to_numpy(dtype=int))
+    return np.unique(np.concatenate(keep))
+
+
+def downsample(df, x, ys, x_range=None, max_points=MAX_POINTS):
+    # Frames are expected sorted by x (URL_ID order); only the visible x_range is sampled,
+    # so narrowing the range re-fetches full detail for that window.
+    if x_range is not None:
+        values = df[x].to_numpy()
+        df = df.iloc[np.searchsorted(values, x_range[0], 'left'):np.searchsorted(values, x_range[1], 'right')]
+    if len(df) <= max_points:
+        return df
+    indices = minmax_indices([df[y].to_numpy(dtype=float) for y in ys], max_points)
+    return df.iloc[indices]
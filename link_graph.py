@@ -0,0 +1,200 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from cache import LRUCache
+from crawler import extract_links, normalize_url
+from data_loader import DATA_DIR
+from profiler import section
+
+INLINK_COLUMNS = ['Type', 'Source', 'Destination']
+CHUNK_SIZE = 500_000
+
+_graphs = LRUCache(max_entries=4, sizeof=lambda graph: graph.nbytes())
+
+
+class LinkGraph:
+    # Directed link graph with URLs interned to integer IDs. The adjacency is a CSR
+    # matrix (row = source, column = destination) with int32 indices and one byte per
+    # edge, so 5M edges take about 25 MB plus the URL table.
+    def __init__(self, urls, sources, destinations):
+        self.urls = np.asarray(urls, dtype=object)
+        n = len(self.urls)
+        sources, destinations = np.asarray(sources, dtype=np.int32), np.asarray(destinations, dtype=np.int32)
+        external = sources != destinations
+        adjacency = sp.csr_matrix((np.ones(external.sum(), dtype=np.int8), (sources[external], destinations[external])), shape=(n, n))
+        adjacency.sum_duplicates()
+        adjacency.data[:] = 1
+        self.adjacency = adjacency
+        self.ids = pd.Index(self.urls)
+        self.metrics = {}
+
+    @classmethod
+    def from_edges(cls, sources, destinations, pages=()):
+        # pages: URLs known from the crawl even when nothing links to them (orphans)
+        # Raw strings are interned first so normalize_url runs once per distinct URL, not per edge
+        sources, destinations = pd.Series(sources, dtype=object), pd.Series(destinations, dtype=object)
+        pages = pd.Series(list(pages), dtype=object)
+        raw_codes, raw_urls = pd.factorize(pd.concat([pages, sources, destinations], ignore_index=True), use_na_sentinel=False)
+        url_codes, urls = pd.factorize(pd.Series(raw_urls, dtype=object).map(normalize_url))
+        codes = url_codes[raw_codes][len(pages):]
+        return cls(urls, codes[:len(sources)], codes[len(sources):])
+
+    def nbytes(self):
+        return self.adjacency.data.nbytes + self.adjacency.indices.nbytes + self.adjacency.indptr.nbytes + self.urls.nbytes
+
+    def __len__(self):
+        return len(self.urls)
+
+    @property
+    def edges(self):
+        return self.adjacency.nnz
+
+    def in_degree(self):
+        return np.asarray(self.adjacency.sum(axis=0)).ravel()
+
+    def out_degree(self):
+        return np.asarray(self.adjacency.sum(axis=1)).ravel()
+
+
+def read_inlinks(path, chunksize=CHUNK_SIZE):
+    # Screaming Frog "All Inlinks" bulk export; only followed hyperlinks are kept
+    sources, destinations = [], []
+    with pd.read_csv(path, usecols=INLINK_COLUMNS, dtype=str, encoding='utf-8-sig', chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk = chunk[chunk['Type'] == 'Hyperlink']
+            sources.append(chunk['Source'])
+            destinations.append(chunk['Destination'])
+    if not sources:
+        return pd.Series(dtype=object), pd.Series(dtype=object)
+    return pd.concat(sources, ignore_index=True), pd.concat(destinations, ignore_index=True)
+
+
+def graph_from_inlinks(path, pages=()):
+    return LinkGraph.from_edges(*read_inlinks(path), pages)
+
+
+def graph_from_crawl(results):
+    # results: crawler.fetch result dicts (url, body, error)
+    sources, destinations, pages = [], [], []
+    for result in results:
+        if result['error'] is None and result['body']:
+            pages.append(result['url'])
+            links = extract_links(result['body'], result['url'])
+            sources.extend([result['url']] * len(links))
+            destinations.extend(links)
+    return LinkGraph.from_edges(sources, destinations, pages)
+
+
+def pagerank(graph, damping=0.85, tol=1e-8, max_iter=100):
+    n = len(graph)
+    if not n:
+        return np.empty(0)
+    out_degree = graph.out_degree().astype(float)
+    dangling = out_degree == 0
+    inverse = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    transposed = graph.adjacency.T.tocsr().astype(np.float64)
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        # Pages without outlinks spread their rank evenly over the whole graph
+        updated = damping * (transposed @ (rank * inverse)) + (damping * rank[dangling].sum() + 1 - damping) / n
+        if np.abs(updated - rank).sum() < tol:
+            return updated
+        rank = updated
+    return rank
+
+
+def hits(graph, tol=1e-8, max_iter=100):
+    n = len(graph)
+    adjacency = graph.adjacency.astype(np.float64)
+    transposed = adjacency.T.tocsr()
+    hubs = np.full(n, 1.0 / max(n, 1))
+    authorities = hubs
+    for _ in range(max_iter):
+        authorities = transposed @ hubs
+        authorities /= authorities.sum() or 1
+        updated = adjacency @ authorities
+        updated /= updated.sum() or 1
+        if np.abs(updated - hubs).sum() < tol:
+            hubs = updated
+            break
+        hubs = updated
+    return hubs, authorities
+
+
+def crawl_depths(graph, start):
+    # Breadth-first search by sparse frontier expansion; -1 marks unreachable pages
+    depths = np.full(len(graph), -1, dtype=np.int32)
+    if start not in graph.ids:
+        return depths
+    frontier = np.zeros(len(graph), dtype=bool)
+    frontier[graph.ids.get_loc(start)] = True
+    transposed = graph.adjacency.T.tocsr()
+    depth = 0
+    while frontier.any():
+        depths[frontier] = depth
+        frontier = (transposed @ frontier.astype(np.int32)) > 0
+        frontier &= depths < 0
+        depth += 1
+    return depths
+
+
+def orphan_pages(graph, start=None):
+    orphans = graph.in_degree() == 0
+    if start is not None and start in graph.ids:
+        orphans[graph.ids.get_loc(start)] = False
+    return graph.urls[orphans]
+
+
+def link_metrics(graph, start):
+    hubs, authorities = hits(graph)
+    return pd.DataFrame({
+        'URL': graph.urls,
+        'PageRank': pagerank(graph),
+        'Hub': hubs,
+        'Authority': authorities,
+        'Inlinks': graph.in_degree(),
+        'Outlinks': graph.out_degree(),
+        'Depth': crawl_depths(graph, normalize_url(start)),
+    })
+
+
+def depth_distribution(depths):
+    counts = pd.Series(depths).value_counts().sort_index()
+    labels = counts.index.map(lambda depth: 'Unreachable' if depth < 0 else str(depth))
+    return pd.DataFrame({'Depth': labels, 'Pages': counts.to_numpy()})
+
+
+def _version(path):
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def load_graph(inlinks_file, pages=None, folder=DATA_DIR):
+    # Cached on the export's version, like data_loader.load_dataset. pages is the
+    # crawled URL list (e.g. internal_all's Address column), needed to spot orphans.
+    path = os.path.abspath(os.path.join(folder, inlinks_file))
+    key = _version(path) + (len(pages) if pages is not None else 0,)
+    graph = _graphs.get(key)
+    if graph is None:
+        _graphs.discard(lambda cached: cached[0] == path and cached != key)
+        with section(f"link graph {inlinks_file}"):
+            graph = _graphs.put(key, graph_from_inlinks(path, () if pages is None else pages))
+    return graph
+
+
+def cached_link_metrics(graph, start):
+    # Kept on the graph so the metrics are dropped together with it from the cache
+    if start not in graph.metrics:
+        with section("link metrics"):
+            graph.metrics[start] = link_metrics(graph, start)
+    return graph.metrics[start]
+
+
+if __name__ == "__main__":
+    # python link_graph.py all_inlinks.csv https://www.splashtop.com/
+    graph = load_graph(sys.argv[1])
+    metrics = link_metrics(graph, sys.argv[2])
+    print(f"{len(graph)} pages, {graph.edges} links, {graph.nbytes() / 1e6:.1f} MB")
+    print(metrics.nlargest(20, 'PageRank').to_string(index=False))
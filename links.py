@@ -0,0 +1,93 @@
+import os
+import streamlit as st
+from data_loader import DATA_DIR
+from figure_cache import cached_figure
+from ingest import load_pages
+from large_series import is_large
+from link_graph import load_graph, cached_link_metrics, depth_distribution, orphan_pages
+from sites import SITES, site_names
+from profiler import profiled, plotly_chart
+
+LINK_COLUMNS = ['Address', 'Content Type', 'Indexability', 'Crawl Depth', 'Unique Inlinks', 'Outlinks', 'Link Score']
+
+@profiled("links")
+def links():
+    st.markdown("<h1 style='text-align: center;'>Internal Link Structure</h1><hr style='border: 2px solid rainbow; border-radius: 5px;'>", unsafe_allow_html=True)
+
+    site = st.selectbox("Website", site_names(), key="links_site")
+    config = SITES[site]
+    pages = load_pages(config['internal_file'], columns=LINK_COLUMNS, indexable_only=False)
+    has_graph = os.path.exists(os.path.join(DATA_DIR, config['inlinks_file']))
+
+    if has_graph:
+        graph = load_graph(config['inlinks_file'], pages['Address'])
+        metrics = cached_link_metrics(graph, config['home_url'])
+        orphans = orphan_pages(graph, config['home_url'])
+        link_count = graph.edges
+    else:
+        st.info(f"""No link graph is available for {site}. Export **Bulk Export → Links → All Inlinks** from Screaming Frog as
+        `Data/{config['inlinks_file']}` to compute PageRank, hubs and authorities. The charts below use the per-URL aggregates from `{config['internal_file']}`.""")
+        metrics = pages.rename(columns={'Address': 'URL', 'Unique Inlinks': 'Inlinks', 'Crawl Depth': 'Depth', 'Link Score': 'PageRank'})
+        metrics['Depth'] = metrics['Depth'].fillna(-1).astype(int)
+        orphans = metrics[(metrics['Inlinks'] == 0) & (metrics['Depth'] != 0)]['URL'].to_numpy()
+        link_count = int(metrics['Outlinks'].sum())
+
+    st.markdown(f"""### Data Overview
+    This page analyses how the HTML pages of the {site} website link to each other. Pages that receive many internal links
+    pass more authority to search engines, while orphan pages and deeply nested pages are harder for crawlers and users to reach.
+    """)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Pages", f"{len(metrics):,}")
+    col2.metric("Internal Links", f"{link_count:,}")
+    col3.metric("Orphan Pages", f"{len(orphans):,}")
+    # A site without internal links has no depths at all
+    max_depth = metrics['Depth'].max()
+    col4.metric("Max Crawl Depth", int(max_depth) if len(metrics) and max_depth == max_depth else "–")
+    st.divider()
+
+    st.subheader("Crawl Depth Distribution",divider='rainbow')
+    st.write("""This chart shows how many clicks away from the home page each page is.
+    Important pages should be reachable within three clicks; unreachable pages are not linked from any page reachable from the home page.""")
+
+    fig1 = cached_figure(depth_distribution(metrics['Depth'].to_numpy()), {
+        'chart': 'bar',
+        'args': dict(x='Depth', y='Pages', title='Pages by Crawl Depth'),
+        'layout': dict(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')})
+
+    plotly_chart(fig1, use_container_width=True)
+    st.divider()
+
+    rank_column = 'PageRank' if metrics['PageRank'].notna().any() else 'Inlinks'
+    st.subheader(f"Top 20 Pages by {rank_column}",divider='rainbow')
+    st.write("""This bar chart lists the pages that collect the most internal link equity.
+    These pages are the best places to link from when promoting new or under-performing content.""")
+
+    fig2 = cached_figure(metrics.nlargest(20, rank_column).sort_values(rank_column), {
+        'chart': 'bar',
+        'args': dict(x=rank_column, y='URL', orientation='h', title=f'Top 20 Pages by {rank_column}', hover_data=['Inlinks', 'Depth']),
+        'layout': dict(height=600, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')})
+
+    plotly_chart(fig2, use_container_width=True)
+    st.divider()
+
+    if has_graph:
+        st.subheader("Hubs and Authorities",divider='rainbow')
+        st.write("""Hubs are pages that link to many important pages (navigation, resource indexes),
+        while authorities are pages that many good hubs link to. Pages in the top right corner play both roles.""")
+
+        linked = metrics[metrics['Inlinks'] + metrics['Outlinks'] > 0]
+        fig3 = cached_figure(linked, {
+            'chart': 'scatter',
+            # One marker per page: large sites are drawn with WebGL like large_series.trace_type
+            'args': dict(x='Hub', y='Authority', hover_name='URL', hover_data=['Inlinks', 'Outlinks'], title='Hub vs Authority Scores',
+                         render_mode='webgl' if is_large(linked) else 'auto'),
+            'layout': dict(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')})
+
+        plotly_chart(fig3, use_container_width=True)
+        st.divider()
+
+    st.subheader("Orphan Pages",divider='rainbow')
+    st.write("These pages were crawled but receive no internal links, so they rely on sitemaps or external links to be discovered.")
+    st.dataframe(metrics[metrics['URL'].isin(orphans)][['URL', 'Depth', 'Outlinks']], use_container_width=True)
+    st.divider()
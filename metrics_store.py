@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+import sqlite3
+import pandas as pd
+from corpus import read_document
+from crawler import normalize_url
+from data_loader import DATA_DIR
+from incremental import content_hash, load_manifest
+from scoring import ANALYSIS_COLUMNS, score_corpus
+
+STORE_FILE = "metrics.sqlite"
+METRIC_COLUMNS = ANALYSIS_COLUMNS[1:]
+COUNT_COLUMNS = ['COMPLEX WORD COUNT', 'WORD COUNT', 'PERSONAL PRONOUNS']
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+class MetricsStore:
+    # Per-URL analysis results keyed by site and normalized URL. Each row remembers the hash
+    # of the text it was scored from, so a refresh only rescores pages whose text changed.
+    # URL_IDs are the corpus file names, so exports join back to extracted_content/<site>/<URL_ID>.txt.
+    def __init__(self, path=os.path.join(DATA_DIR, STORE_FILE)):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        key = [row[1] for row in sorted(self.conn.execute('PRAGMA table_info(metrics)'), key=lambda row: row[5]) if row[5]]
+        if key and key != ['site', 'url']:
+            # Stores written when URLs were keyed across sites are rebuilt; every page is rescored once
+            self.conn.execute('DROP TABLE metrics')
+        metric_defs = ', '.join(f'{_quote(col)} REAL' for col in METRIC_COLUMNS)
+        self.conn.execute(f'''CREATE TABLE IF NOT EXISTS metrics (
+            site TEXT NOT NULL,
+            url TEXT NOT NULL,
+            url_id INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            scored_at REAL NOT NULL,
+            {metric_defs},
+            PRIMARY KEY (site, url))''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS metrics_site ON metrics (site, url_id)')
+        self.conn.commit()
+
+    def hashes(self, site):
+        return dict(self.conn.execute('SELECT url, content_hash FROM metrics WHERE site = ?', (site,)))
+
+    def stale(self, site, documents):
+        # documents maps URL -> content hash; returns the URLs that need (re)scoring
+        stored = self.hashes(site)
+        return [url for url, digest in documents.items() if stored.get(normalize_url(url)) != digest]
+
+    def upsert(self, site, scores):
+        # scores: analysis_results-shaped frame (URL_ID is the corpus file name) plus 'URL'
+        # and 'CONTENT_HASH' columns
+        now = time.time()
+        rows = [[site, normalize_url(record['URL']), record['URL_ID'], record['CONTENT_HASH'], now]
+                + [record[col] for col in METRIC_COLUMNS] for record in scores.to_dict('records')]
+
+        columns = ['site', 'url', 'url_id', 'content_hash', 'scored_at'] + METRIC_COLUMNS
+        updates = ', '.join(f'{_quote(col)} = excluded.{_quote(col)}' for col in columns[2:])
+        self.conn.executemany(
+            f'INSERT INTO metrics ({", ".join(map(_quote, columns))}) VALUES ({", ".join("?" * len(columns))}) '
+            f'ON CONFLICT(site, url) DO UPDATE SET {updates}',
+            rows)
+        self.conn.commit()
+        return len(rows)
+
+    def renumber(self, site, url_ids):
+        # url_ids maps URL -> corpus URL_ID; unchanged pages keep their scores under a new ID
+        self.conn.executemany('UPDATE metrics SET url_id = ? WHERE site = ? AND url = ? AND url_id IS NOT ?',
+                              [(url_id, site, normalize_url(url), url_id) for url, url_id in url_ids.items()])
+        self.conn.commit()
+
+    def compact(self, site, keep_urls):
+        # Drops pages that are no longer in the site's link list and reclaims the space
+        keep = {normalize_url(url) for url in keep_urls}
+        removed = [url for url in self.hashes(site) if url not in keep]
+        if removed:
+            self.conn.executemany('DELETE FROM metrics WHERE site = ? AND url = ?', [(site, url) for url in removed])
+            self.conn.commit()
+            self.conn.execute('VACUUM')
+        return len(removed)
+
+    def export(self, site, include_url=False):
+        metrics = ', '.join(_quote(col) for col in METRIC_COLUMNS)
+        df = pd.read_sql_query(
+            f'SELECT url AS URL, url_id AS URL_ID, {metrics} FROM metrics WHERE site = ? ORDER BY url_id',
+            self.conn, params=(site,))
+        df[COUNT_COLUMNS] = df[COUNT_COLUMNS].astype(int)
+        return df[(['URL'] if include_url else []) + ANALYSIS_COLUMNS]
+
+    def close(self):
+        self.conn.close()
+
+
+def refresh_site(store, site, links, corpus_dir, processes=None):
+    # links is the URL_ID/URL frame the corpus was extracted from
+    manifest = load_manifest(corpus_dir)
+    documents, url_ids = {}, {}
+    for url, url_id in zip(links['URL'], links['URL_ID']):
+        url_id = str(url_id)
+        entry = manifest.get(normalize_url(url))
+        if entry and entry.get('url_id') == url_id:
+            digest = entry['content_hash']
+        elif os.path.exists(os.path.join(corpus_dir, f"{url_id}.txt")):
+            digest = content_hash(read_document(corpus_dir, url_id))
+        else:
+            continue
+        documents[url], url_ids[url] = digest, url_id
+
+    stale = store.stale(site, documents)
+    store.renumber(site, url_ids)
+    if stale:
+        scores = score_corpus(corpus_dir, [url_ids[url] for url in stale], processes)
+        scores['URL'] = stale
+        scores['CONTENT_HASH'] = [documents[url] for url in stale]
+        store.upsert(site, scores)
+    removed = store.compact(site, documents)
+    return {'scored': len(stale), 'unchanged': len(documents) - len(stale), 'removed': removed}
+
+
+if __name__ == "__main__":
+    # python metrics_store.py Splashtop links.csv extracted_content/splashtop analysis_results11.csv
+    site, links_path, corpus_dir, output = sys.argv[1:5]
+    store = MetricsStore()
+    print(refresh_site(store, site, pd.read_csv(links_path), corpus_dir))
+    store.export(site).to_csv(os.path.join(DATA_DIR, output), index=False)
+    store.close()
@@ -0,0 +1,199 @@
+import os
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from corpus import document_ids, read_document, tokenize
+from data_loader import DATA_DIR
+from sites import SITES
+
+SIGNATURE_FILE = "minhash_signatures.npz"
+NEAR_DUPLICATE_FILE = "near_duplicates.csv"
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 16  # 16 bands x 8 rows: pairs around 0.7 Jaccard and above become candidates
+THRESHOLD = 0.8
+# Buckets larger than this (template pages, boilerplate) are not paired all-to-all; each
+# page is paired with its BUCKET_WINDOW nearest neighbours in signature order instead
+MAX_BUCKET = 500
+BUCKET_WINDOW = 50
+MAX_HASH = np.uint64(0xFFFFFFFF)
+
+# Multiply-shift hash family: h(x) = ((a * x + b) mod 2**64) >> 32 with odd a
+_rng = np.random.default_rng(20241019)
+PERMUTATIONS = (_rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64) | np.uint64(1),
+                _rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64))
+
+_token_hashes = {}
+
+
+def shingle_hashes(text, size=SHINGLE_SIZE):
+    # 32-bit hashes of the distinct word n-grams of a page
+    tokens = tokenize(text)
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    hashes = np.fromiter((_token_hashes.get(token) or _token_hashes.setdefault(token, zlib.crc32(token.encode()))
+                          for token in tokens), dtype=np.uint64, count=len(tokens))
+    size = min(size, len(hashes))
+    shingles = hashes[:len(hashes) - size + 1].copy()
+    with np.errstate(over='ignore'):
+        for offset in range(1, size):
+            shingles = shingles * np.uint64(0x100000001B3) ^ hashes[offset:len(hashes) - size + 1 + offset]
+    return np.unique((shingles ^ (shingles >> np.uint64(32))) & MAX_HASH)
+
+
+def minhash(shingles, permutations=PERMUTATIONS):
+    if not len(shingles):
+        return np.full(NUM_PERM, MAX_HASH, dtype=np.uint32)
+    a, b = permutations
+    with np.errstate(over='ignore'):
+        values = (shingles[:, None] * a + b) >> np.uint64(32)
+    return values.min(axis=0).astype(np.uint32)
+
+
+def _sign_documents(batch):
+    folder, url_ids = batch
+    return np.stack([minhash(shingle_hashes(read_document(folder, url_id))) for url_id in url_ids])
+
+
+def sign_documents(folder, url_ids, processes=None, batch_size=256):
+    batches = [(folder, url_ids[i:i + batch_size]) for i in range(0, len(url_ids), batch_size)]
+    if not batches:
+        return np.empty((0, NUM_PERM), dtype=np.uint32)
+    if processes == 1 or len(batches) <= 1:
+        results = list(map(_sign_documents, batches))
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            results = list(pool.map(_sign_documents, batches))
+    return np.concatenate(results)
+
+
+class SignatureStore:
+    # MinHash signatures of every extracted page, keyed by (site, URL_ID) and the page
+    # file's size and mtime. Only new or modified pages are signed on update.
+    def __init__(self, path=os.path.join(DATA_DIR, SIGNATURE_FILE)):
+        self.path = path
+        if os.path.exists(path):
+            with np.load(path) as data:
+                self.keys = pd.DataFrame({'site': data['sites'], 'url_id': data['url_ids'],
+                                          'size': data['sizes'], 'mtime_ns': data['mtimes']})
+                self.signatures = data['signatures']
+        else:
+            self.keys = pd.DataFrame({'site': pd.Series(dtype=str), 'url_id': pd.Series(dtype=str),
+                                      'size': pd.Series(dtype='int64'), 'mtime_ns': pd.Series(dtype='int64')})
+            self.signatures = np.empty((0, NUM_PERM), dtype=np.uint32)
+
+    def update(self, site, folder, processes=None):
+        # Returns the keys of the pages that were (re)signed
+        url_ids = document_ids(folder)
+        stats = [os.stat(os.path.join(folder, f"{url_id}.txt")) for url_id in url_ids]
+        current = pd.DataFrame({'site': site, 'url_id': url_ids,
+                                'size': [stat.st_size for stat in stats],
+                                'mtime_ns': [stat.st_mtime_ns for stat in stats]}, columns=self.keys.columns)
+
+        known = self.keys.reset_index().merge(current, on=list(self.keys.columns), how='inner')
+        stale = current[~current['url_id'].isin(known['url_id'])]
+        keep = (self.keys['site'] != site).to_numpy().copy()
+        keep[known['index'].to_numpy()] = True
+
+        self.keys = pd.concat([self.keys[keep], stale], ignore_index=True)
+        self.signatures = np.concatenate([self.signatures[keep], sign_documents(folder, stale['url_id'].tolist(), processes)])
+        return list(zip(stale['site'], stale['url_id']))
+
+    def save(self):
+        with open(self.path + '.tmp', 'wb') as file:
+            np.savez(file, sites=self.keys['site'].to_numpy(dtype=str), url_ids=self.keys['url_id'].to_numpy(dtype=str),
+                     sizes=self.keys['size'].to_numpy(dtype='int64'), mtimes=self.keys['mtime_ns'].to_numpy(dtype='int64'),
+                     signatures=self.signatures)
+        os.replace(self.path + '.tmp', self.path)
+
+
+def _band_groups(band_signatures):
+    # Row indices of every group of at least two identical band signatures
+    keys = pd.util.hash_pandas_object(pd.DataFrame(band_signatures), index=False).to_numpy()
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    ends = np.r_[starts[1:], len(sorted_keys)]
+    return [order[start:end] for start, end in zip(starts, ends) if end - start > 1]
+
+
+def _bucket_pairs(signatures, members, focus):
+    members = np.sort(members)
+    if len(members) > MAX_BUCKET:
+        # Sorted neighbourhood: similar signatures sort next to each other, so a window
+        # keeps linear cost and still gives every page candidates
+        members = members[np.lexsort(signatures[members].T[::-1])]
+        left = np.concatenate([members[:-k] for k in range(1, min(BUCKET_WINDOW, len(members) - 1) + 1)])
+        right = np.concatenate([members[k:] for k in range(1, min(BUCKET_WINDOW, len(members) - 1) + 1)])
+    elif focus is None:
+        left, right = np.triu_indices(len(members), k=1)
+        left, right = members[left], members[right]
+    else:
+        # Only pairs with a focus page: focus members x the whole bucket
+        chosen = members[focus[members]]
+        left, right = np.repeat(chosen, len(members)), np.tile(members, len(chosen))
+    keep = left != right
+    if focus is not None:
+        keep &= focus[left] | focus[right]
+    return np.stack([np.minimum(left, right), np.maximum(left, right)], axis=1)[keep]
+
+
+def candidate_pairs(signatures, bands=BANDS, focus=None):
+    # LSH banding: pages whose signatures agree on every row of at least one band share
+    # a bucket. Only pairs within a bucket are compared, never all pairs. focus is an
+    # optional boolean mask; when given, only pairs involving a focus page are generated.
+    rows = signatures.shape[1] // bands
+    usable = np.flatnonzero((signatures != np.uint32(MAX_HASH)).any(axis=1))
+    if focus is not None:
+        focus = np.asarray(focus, dtype=bool)
+    pairs = []
+    for band in range(bands):
+        for group in _band_groups(signatures[usable, band * rows:(band + 1) * rows]):
+            members = usable[group]
+            if focus is None or focus[members].any():
+                pairs.append(_bucket_pairs(signatures, members, focus))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    # Deduplicated as packed int64 keys; np.unique(axis=0) sorts rows far more slowly
+    pairs = np.concatenate(pairs).astype(np.int64)
+    packed = np.unique(pairs[:, 0] * len(signatures) + pairs[:, 1])
+    return np.stack([packed // len(signatures), packed % len(signatures)], axis=1)
+
+
+def near_duplicates(store, threshold=THRESHOLD, sites=None, only=None, bands=BANDS):
+    # only: (site, URL_ID) keys, e.g. the pages just signed; pairs not involving them are skipped
+    keys = store.keys.reset_index(drop=True)
+    selected = np.flatnonzero(keys['site'].isin(sites)) if sites is not None else np.arange(len(keys))
+    focus = None
+    if only is not None:
+        # Filtered while pairing, so the incremental path costs what it finds, not a full run
+        focus = pd.MultiIndex.from_frame(keys.loc[selected, ['site', 'url_id']]).isin(list(only))
+    pairs = selected[candidate_pairs(store.signatures[selected], bands, focus)]
+    similarity = np.concatenate([
+        (store.signatures[chunk[:, 0]] == store.signatures[chunk[:, 1]]).mean(axis=1)
+        for chunk in np.array_split(pairs, max(1, len(pairs) // 100_000))]) if len(pairs) else np.empty(0)
+    pairs, similarity = pairs[similarity >= threshold], similarity[similarity >= threshold]
+
+    left, right = keys.iloc[pairs[:, 0]].reset_index(drop=True), keys.iloc[pairs[:, 1]].reset_index(drop=True)
+    result = pd.DataFrame({
+        'Site A': left['site'], 'URL_ID A': left['url_id'],
+        'Site B': right['site'], 'URL_ID B': right['url_id'],
+        'Similarity': similarity.round(3),
+    })
+    result['Scope'] = np.where(result['Site A'] == result['Site B'], 'Within site', 'Cross site')
+    return result.sort_values('Similarity', ascending=False, kind='stable').reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    # python near_duplicates.py [threshold]
+    threshold = float(sys.argv[1]) if len(sys.argv) > 1 else THRESHOLD
+    store = SignatureStore()
+    for site, config in SITES.items():
+        signed = store.update(site, config['corpus'])
+        print(f"{site}: {len(signed)} pages signed")
+    store.save()
+    result = near_duplicates(store, threshold)
+    result.to_csv(os.path.join(DATA_DIR, NEAR_DUPLICATE_FILE), index=False)
+    print(result['Scope'].value_counts().to_string())
@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from cache import LRUCache
+
+MAX_RECORDS = 5000
+# Set SPLASHTOP_PROFILE_LOG to also append every record to a JSON-lines file
+PROFILE_LOG = os.environ.get("SPLASHTOP_PROFILE_LOG")
+
+_recorders = LRUCache(max_entries=64)
+
+
+class Recorder:
+    # Per-session section timings. tracemalloc is process-wide, so allocation figures
+    # also include other sessions rendering at the same moment.
+    def __init__(self):
+        self.enabled = False
+        self.run = 0
+        self.payload = 0
+        # False when this Streamlit version has no ctx._enqueue to wrap; payload_kb is then None
+        self.counts_payload = False
+        self.stack = []
+        self.records = deque(maxlen=MAX_RECORDS)
+
+
+def _recorder():
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return _recorders.get(ctx.session_id) if ctx is not None else None
+
+
+def _count_payload(ctx, recorder):
+    # Every message sent to the browser passes through ctx._enqueue; the original is kept
+    # on the wrapper so _stop_counting can put it back. _enqueue is private to Streamlit,
+    # so when it is missing the profiler keeps timing sections without payload sizes.
+    enqueue = getattr(ctx, '_enqueue', None)
+    if not callable(enqueue):
+        return False
+    if getattr(enqueue, 'profiled', False):
+        return True
+
+    def counting_enqueue(msg):
+        recorder.payload += msg.ByteSize()
+        enqueue(msg)
+
+    counting_enqueue.profiled = True
+    counting_enqueue.original = enqueue
+    ctx._enqueue = counting_enqueue
+    return True
+
+
+def _stop_counting(ctx):
+    enqueue = getattr(ctx, '_enqueue', None)
+    if getattr(enqueue, 'profiled', False):
+        ctx._enqueue = enqueue.original
+
+
+def start_run(enabled):
+    # Call once at the top of every rerun, before any section runs
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return
+    recorder = _recorders.get(ctx.session_id)
+    if recorder is None:
+        if not enabled:
+            return
+        recorder = _recorders.put(ctx.session_id, Recorder())
+    recorder.enabled = enabled
+    recorder.run += 1
+    recorder.stack = []
+    if enabled:
+        recorder.counts_payload = _count_payload(ctx, recorder)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+    else:
+        _stop_counting(ctx)
+        # Tracing slows every allocation in the process, so it only runs while some
+        # session has profiling on
+        if tracemalloc.is_tracing() and not any(other.enabled for _, other in _recorders.items()):
+            tracemalloc.stop()
+
+
+@contextmanager
+def section(name):
+    recorder = _recorder()
+    if recorder is None or not recorder.enabled:
+        yield
+        return
+
+    parent = recorder.stack[-1] if recorder.stack else None
+    current, peak = tracemalloc.get_traced_memory()
+    if parent is not None:
+        parent['peak'] = max(parent['peak'], peak)
+    tracemalloc.reset_peak()
+    frame = {'name': name, 'memory': current, 'peak': current, 'payload': recorder.payload}
+    recorder.stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        frame['peak'] = max(frame['peak'], peak)
+        recorder.stack.pop()
+        if parent is not None:
+            parent['peak'] = max(parent['peak'], frame['peak'])
+        record = {
+            'run': recorder.run,
+            'section': ' / '.join([f['name'] for f in recorder.stack] + [name]),
+            'depth': len(recorder.stack),
+            'seconds': round(seconds, 6),
+            'allocated_kb': round((current - frame['memory']) / 1024, 1),
+            'peak_kb': round((frame['peak'] - frame['memory']) / 1024, 1),
+            'payload_kb': round((recorder.payload - frame['payload']) / 1024, 1) if recorder.counts_payload else None,
+            'timestamp': time.time(),
+        }
+        recorder.records.append(record)
+        if PROFILE_LOG:
+            with open(PROFILE_LOG, 'a') as file:
+                file.write(json.dumps(record) + '\n')
+
+
+def profiled(name):
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with section(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def plotly_chart(fig, name=None, **kwargs):
+    # st.plotly_chart with the figure's serialization and send time recorded
+    title = fig.layout.title.text if fig.layout.title and fig.layout.title.text else 'chart'
+    with section(f"render {name or title}"):
+        return st.plotly_chart(fig, **kwargs)
+
+
+def last_run(recorder=None):
+    recorder = recorder or _recorder()
+    if recorder is None or not recorder.records:
+        return []
+    run = recorder.records[-1]['run']
+    return [record for record in recorder.records if record['run'] == run]
+
+
+def export_jsonl(records):
+    return ''.join(json.dumps(record) + '\n' for record in records)
+
+
+def render_panel(limit=10):
+    # Sidebar panel with the slowest sections of the last rerun
+    recorder = _recorder()
+    if recorder is None or not recorder.enabled:
+        return
+    records = sorted(last_run(recorder), key=lambda record: record['seconds'], reverse=True)
+    st.markdown("<h3>Slowest Sections</h3>", unsafe_allow_html=True)
+    if not records:
+        st.write("No sections were recorded in this run.")
+        return
+    st.dataframe(
+        [{key: record[key] for key in ('section', 'seconds', 'allocated_kb', 'peak_kb', 'payload_kb')} for record in records[:limit]],
+        use_container_width=True, hide_index=True)
+    st.download_button("Download profile (JSON lines)", export_jsonl(recorder.records),
+                       file_name="profile.jsonl", mime="application/jsonl")
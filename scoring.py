@@ -0,0 +1,120 @@
+import os
+import re
+import sys
+from collections import Counter
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+import nltk
+import pandas as pd
+from corpus import document_ids, read_document
+from data_loader import DATA_DIR
+
+ANALYSIS_COLUMNS = [
+    'URL_ID', 'POSITIVE SCORE', 'NEGATIVE SCORE', 'POLARITY SCORE', 'SUBJECTIVITY SCORE',
+    'AVG SENTENCE LENGTH', 'PERCENTAGE OF COMPLEX WORDS', 'FOG INDEX',
+    'AVG NUMBER OF WORDS PER SENTENCE', 'COMPLEX WORD COUNT', 'WORD COUNT',
+    'SYLLABLE PER WORD', 'PERSONAL PRONOUNS', 'AVG WORD LENGTH',
+]
+PERSONAL_PRONOUNS = {'i', 'we', 'my', 'ours', 'us'}
+WORD_RE = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
+SENTENCE_RE = re.compile(r'[.!?]+(?:\s+|$)')
+
+_stop_words = None
+_analyzer = None
+
+
+def _load_nltk():
+    global _stop_words, _analyzer
+    if _analyzer is not None:
+        return
+    from nltk.corpus import stopwords
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    for resource, path in [('stopwords', 'corpora/stopwords'), ('vader_lexicon', 'sentiment/vader_lexicon.zip')]:
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            nltk.download(resource, quiet=True)
+    _stop_words = frozenset(stopwords.words('english'))
+    _analyzer = SentimentIntensityAnalyzer()
+
+
+@lru_cache(maxsize=200_000)
+def syllable_count(word):
+    count = sum(1 for char in word if char in 'aeiou')
+    if word.endswith(('es', 'ed')) and count > 1:
+        count -= 1
+    return max(count, 1)
+
+
+def score_text(text):
+    _load_nltk()
+    # Tokenize once; every readability metric is derived from these word counts
+    raw_words = WORD_RE.findall(text)
+    words = Counter(word.lower() for word in raw_words)
+    cleaned = {word: n for word, n in words.items() if word not in _stop_words}
+    word_count = sum(cleaned.values())
+    sentences = max(len([s for s in SENTENCE_RE.split(text) if s.strip()]), 1)
+
+    syllables = complex_words = characters = 0
+    for word, n in cleaned.items():
+        word_syllables = syllable_count(word)
+        syllables += word_syllables * n
+        characters += len(word) * n
+        if word_syllables > 2:
+            complex_words += n
+
+    pronouns = sum(1 for word in raw_words if word.lower() in PERSONAL_PRONOUNS and word != 'US')
+    sentiment = _analyzer.polarity_scores(text)
+    avg_sentence_length = word_count / sentences
+    pct_complex = complex_words / word_count * 100 if word_count else 0.0
+    return {
+        'POSITIVE SCORE': sentiment['pos'],
+        'NEGATIVE SCORE': sentiment['neg'],
+        'POLARITY SCORE': sentiment['compound'],
+        'SUBJECTIVITY SCORE': sentiment['neu'],
+        'AVG SENTENCE LENGTH': avg_sentence_length,
+        'PERCENTAGE OF COMPLEX WORDS': pct_complex,
+        'FOG INDEX': 0.4 * (avg_sentence_length + pct_complex),
+        'AVG NUMBER OF WORDS PER SENTENCE': avg_sentence_length,
+        'COMPLEX WORD COUNT': complex_words,
+        'WORD COUNT': word_count,
+        'SYLLABLE PER WORD': syllables / word_count if word_count else 0.0,
+        'PERSONAL PRONOUNS': pronouns,
+        'AVG WORD LENGTH': characters / word_count if word_count else 0.0,
+    }
+
+
+def _score_documents(batch):
+    folder, url_ids = batch
+    return [{'URL_ID': url_id, **score_text(read_document(folder, url_id))} for url_id in url_ids]
+
+
+def score_documents(documents):
+    # documents: iterable of (URL_ID, text) pairs, scored in-process
+    rows = [{'URL_ID': url_id, **score_text(text)} for url_id, text in documents]
+    return pd.DataFrame(rows, columns=ANALYSIS_COLUMNS)
+
+
+def score_corpus(folder, url_ids=None, processes=None, batch_size=32):
+    url_ids = document_ids(folder) if url_ids is None else [str(url_id) for url_id in url_ids]
+    batches = [(folder, url_ids[i:i + batch_size]) for i in range(0, len(url_ids), batch_size)]
+    if processes == 1 or len(batches) <= 1:
+        results = list(map(_score_documents, batches))
+    else:
+        _load_nltk()  # download missing NLTK data once, before the workers start
+        with ProcessPoolExecutor(processes, initializer=_load_nltk) as pool:
+            results = list(pool.map(_score_documents, batches))
+
+    df = pd.DataFrame([row for rows in results for row in rows], columns=ANALYSIS_COLUMNS)
+    # Corpus files are named by the numeric URL_ID, so keep the existing integer column type
+    if df['URL_ID'].str.isdigit().all():
+        df['URL_ID'] = df['URL_ID'].astype(int)
+    return df
+
+
+if __name__ == "__main__":
+    # python scoring.py extracted_content/splashtop analysis_results11.csv
+    folder, output = sys.argv[1], sys.argv[2]
+    df = score_corpus(folder)
+    df.to_csv(os.path.join(DATA_DIR, output), index=False)
+    print(f"Scored {len(df)} pages into {os.path.join(DATA_DIR, output)}")
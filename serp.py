@@ -0,0 +1,53 @@
+import streamlit as st
+from figure_cache import cached_figure
+from serp_snippets import (TITLE_LIMIT, DESCRIPTION_LIMIT, TITLE_FONT_SIZE, DESCRIPTION_FONT_SIZE,
+                           audit_snippets, serp_audit, load_serp)
+from table_view import table_view
+from profiler import profiled, plotly_chart
+
+@profiled("serp")
+def serp():
+    st.markdown("<h1 style='text-align: center;'>SERP Snippet Audit</h1><hr style='border: 2px solid rainbow; border-radius: 5px;'>", unsafe_allow_html=True)
+    st.markdown("""### Data Overview
+    Google cuts titles and meta descriptions that are wider than the space on the results page, measured in pixels rather than characters.
+    Widths here are computed from the Arial glyph widths Google uses (20px titles, 14px descriptions), so rewritten titles can be checked without a new crawl.
+    """)
+
+    col1, col2 = st.columns(2)
+    title_limit = col1.number_input("Title limit (px)", min_value=100, max_value=2000, value=TITLE_LIMIT, step=10, key="serp_title_limit")
+    description_limit = col2.number_input("Description limit (px)", min_value=100, max_value=3000, value=DESCRIPTION_LIMIT, step=10, key="serp_description_limit")
+    st.divider()
+
+    st.subheader("Snippet Checker",divider='rainbow')
+    st.write("Paste candidate titles and descriptions, one per line, to see their width and how Google would display them.")
+    col1, col2 = st.columns(2)
+    titles = col1.text_area("Titles", key="serp_titles", height=150)
+    descriptions = col2.text_area("Descriptions", key="serp_descriptions", height=150)
+    for label, text, limit, font_size in (("Titles", titles, title_limit, TITLE_FONT_SIZE), ("Descriptions", descriptions, description_limit, DESCRIPTION_FONT_SIZE)):
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        if lines:
+            st.markdown(f"<h3>{label}</h3>", unsafe_allow_html=True)
+            st.dataframe(audit_snippets(lines, limit, font_size), use_container_width=True, hide_index=True)
+    st.divider()
+
+    audit = serp_audit(load_serp(), title_limit, description_limit)
+    st.subheader("Crawled Titles and Descriptions",divider='rainbow')
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Pages", f"{len(audit):,}")
+    col2.metric("Truncated Titles", f"{audit['Title Truncated'].sum():,}")
+    col3.metric("Truncated Descriptions", f"{audit['Description Truncated'].sum():,}")
+    if 'Crawled Title Pixels' in audit:
+        difference = (audit['Title Pixels'] - audit['Crawled Title Pixels']).abs().mean()
+        st.caption(f"Computed title widths differ from Screaming Frog's rendered widths by {difference:.1f}px on average.")
+
+    for column, limit in (('Title Pixels', title_limit), ('Description Pixels', description_limit)):
+        fig = cached_figure(audit[[column]], {
+            'chart': 'histogram',
+            'args': dict(x=column, nbins=40, title=f'{column.split()[0]} Width Distribution'),
+            'layout': dict(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', bargap=0.05,
+                           shapes=[dict(type='line', x0=limit, x1=limit, y0=0, y1=1, yref='paper', line=dict(color='red', dash='dash'))])})
+        plotly_chart(fig, use_container_width=True)
+
+    st.write("Pages whose title or description is wider than the limit:")
+    table_view(audit, key="serp_truncated", any_of=['Title Truncated', 'Description Truncated'])
+    st.divider()
@@ -0,0 +1,157 @@
+import sys
+import numpy as np
+import pandas as pd
+from cache import LRUCache
+from data_loader import load_dataset
+from figure_cache import dataset_fingerprint
+
+SERP_FILE = "serp_summary.csv"
+# Google renders desktop titles in Arial 20px and descriptions in Arial 14px. The limits
+# are Screaming Frog's defaults for "Over X Pixels".
+TITLE_FONT_SIZE = 20
+DESCRIPTION_FONT_SIZE = 14
+TITLE_LIMIT = 561
+DESCRIPTION_LIMIT = 985
+ELLIPSIS = ' ...'
+
+# Advance widths in 1/1000 em from the Helvetica AFM, which Arial is metric-compatible with.
+# Printable ASCII (32-126) in code point order, then Latin-1 (160-255).
+ASCII_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+LATIN1_WIDTHS = [
+    278, 333, 556, 556, 556, 556, 260, 556, 333, 737, 370, 556, 584, 333, 737, 333,
+    400, 584, 333, 333, 333, 556, 537, 278, 333, 333, 365, 556, 834, 834, 834, 611,
+    667, 667, 667, 667, 667, 667, 1000, 722, 667, 667, 667, 667, 278, 278, 278, 278,
+    722, 722, 778, 778, 778, 778, 778, 584, 778, 722, 722, 722, 722, 667, 667, 611,
+    556, 556, 556, 556, 556, 556, 889, 500, 556, 556, 556, 556, 278, 278, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 584, 611, 556, 556, 556, 556, 500, 556, 500,
+]
+PUNCTUATION_WIDTHS = {
+    0x2013: 556, 0x2014: 1000, 0x2018: 222, 0x2019: 222, 0x201A: 222, 0x201C: 333,
+    0x201D: 333, 0x201E: 333, 0x2022: 350, 0x2026: 1000, 0x20AC: 556, 0x2122: 1000,
+}
+DEFAULT_WIDTH = 556
+# CJK, Hangul and fullwidth forms render at a full em
+WIDE_RANGES = [(0x1100, 0x115F), (0x2E80, 0xA4CF), (0xAC00, 0xD7A3), (0xF900, 0xFAFF), (0xFE30, 0xFE4F), (0xFF00, 0xFF60), (0xFFE0, 0xFFE6)]
+
+
+def _width_table():
+    # One uint16 per BMP code point, so measuring is a single gather
+    table = np.full(0x10000, DEFAULT_WIDTH, dtype=np.uint16)
+    table[:32] = 0
+    table[32:127] = ASCII_WIDTHS
+    table[160:256] = LATIN1_WIDTHS
+    for start, end in WIDE_RANGES:
+        table[start:end + 1] = 1000
+    for code_point, width in PUNCTUATION_WIDTHS.items():
+        table[code_point] = width
+    return table
+
+
+GLYPH_WIDTHS = _width_table()
+
+_audits = LRUCache(max_entries=8)
+
+
+def _code_points(texts):
+    # All texts as one flat code point array plus the length of each text
+    # Joining a numpy object array is much faster than iterating an Arrow-backed Series
+    texts = pd.Series(texts, dtype=object).fillna('').astype(str).to_numpy(dtype=object)
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    code_points = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype=np.uint32)
+    return code_points, lengths
+
+
+def _glyph_widths(code_points):
+    if len(code_points) and code_points.max() > 0xFFFF:
+        widths = GLYPH_WIDTHS[np.minimum(code_points, 0xFFFF)]
+        # Astral code points are emoji or rare CJK, both a full em wide
+        widths[code_points > 0xFFFF] = 1000
+        return widths
+    return GLYPH_WIDTHS[code_points]
+
+
+def _segment_sums(values, lengths):
+    # np.add.reduceat sums the next segment for empty ones, so those are zeroed afterwards
+    sums = np.zeros(len(lengths), dtype=np.int64)
+    nonempty = lengths > 0
+    if nonempty.any():
+        starts = np.cumsum(lengths) - lengths
+        sums[nonempty] = np.add.reduceat(values, starts[nonempty], dtype=np.int64)
+    return sums
+
+
+def pixel_widths(texts, font_size=TITLE_FONT_SIZE):
+    code_points, lengths = _code_points(texts)
+    return np.rint(_segment_sums(_glyph_widths(code_points), lengths) * font_size / 1000).astype(np.int64)
+
+
+def visible_lengths(texts, limit, font_size=TITLE_FONT_SIZE):
+    # Number of leading characters shown before Google cuts the text and appends an ellipsis
+    code_points, lengths = _code_points(texts)
+    widths = _glyph_widths(code_points)
+    cumulative = np.concatenate([[0], np.cumsum(widths, dtype=np.int64) * font_size])
+    starts = np.cumsum(lengths) - lengths
+    # Width of each text up to and including every character, in 1/1000 px
+    running = cumulative[1:] - np.repeat(cumulative[starts], lengths)
+    budget = (limit - pixel_widths([ELLIPSIS], font_size)[0]) * 1000
+    fits = _segment_sums(running <= budget, lengths)
+    return np.where(cumulative[starts + lengths] - cumulative[starts] <= limit * 1000, lengths, fits)
+
+
+def audit_snippets(texts, limit, font_size):
+    texts = pd.Series(texts, dtype=object).fillna('').astype(str).reset_index(drop=True)
+    widths = pixel_widths(texts, font_size)
+    visible = visible_lengths(texts, limit, font_size)
+    truncated = widths > limit
+    shown = [text[:count].rstrip() + ELLIPSIS.strip() if cut else text for text, count, cut in zip(texts, visible, truncated)]
+    return pd.DataFrame({
+        'Text': texts,
+        'Characters': texts.str.len(),
+        'Pixel Width': widths,
+        'Limit': limit,
+        'Truncated': truncated,
+        'Shown As': shown,
+    })
+
+
+def serp_audit(serp, title_limit=TITLE_LIMIT, description_limit=DESCRIPTION_LIMIT):
+    # Per-URL title/description widths for a serp_summary export, cached on its content
+    key = (dataset_fingerprint(serp), title_limit, description_limit)
+    audit = _audits.get(key)
+    if audit is None:
+        titles = serp['Title'].fillna('').astype(str)
+        descriptions = serp['Description'].fillna('').astype(str)
+        audit = pd.DataFrame({
+            'URL': serp['URL'].to_numpy(),
+            'Title': titles.to_numpy(),
+            'Title Pixels': pixel_widths(titles, TITLE_FONT_SIZE),
+            'Description': descriptions.to_numpy(),
+            'Description Pixels': pixel_widths(descriptions, DESCRIPTION_FONT_SIZE),
+        })
+        audit['Title Truncated'] = audit['Title Pixels'] > title_limit
+        audit['Description Truncated'] = audit['Description Pixels'] > description_limit
+        if 'Pixel Length' in serp:
+            # Screaming Frog's own measurements, kept to show how closely the table matches
+            audit['Crawled Title Pixels'] = pd.to_numeric(serp['Pixel Length'], errors='coerce').to_numpy()
+        audit = _audits.put(key, audit)
+    return audit
+
+
+def load_serp():
+    return load_dataset(SERP_FILE)
+
+
+if __name__ == "__main__":
+    # python serp_snippets.py "Candidate title one" "Candidate title two"
+    if len(sys.argv) > 1:
+        print(audit_snippets(sys.argv[1:], TITLE_LIMIT, TITLE_FONT_SIZE).to_string(index=False))
+    else:
+        audit = serp_audit(load_serp())
+        print(f"{audit['Title Truncated'].sum()} truncated titles and {audit['Description Truncated'].sum()} truncated descriptions of {len(audit)} URLs")
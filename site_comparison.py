@@ -0,0 +1,65 @@
+import pandas as pd
+from cache import LRUCache
+from data_loader import load_dataset
+from figure_cache import dataset_fingerprint
+from keywords import load_keyword_table
+from sites import SITES
+
+READING_WPM = 200
+SUMMARY_COLUMNS = ['URL_ID', 'WORD COUNT', 'FOG INDEX', 'PERSONAL PRONOUNS', 'POLARITY SCORE']
+SUMMARY_METRICS = {
+    'Pages': ('URL_ID', 'size'),
+    'Word Count': ('WORD COUNT', 'mean'),
+    'Total Words': ('WORD COUNT', 'sum'),
+    'Fog Index': ('FOG INDEX', 'mean'),
+    'Personal Pronouns': ('PERSONAL PRONOUNS', 'mean'),
+    'Polarity Score': ('POLARITY SCORE', 'mean'),
+}
+
+_summaries = LRUCache(max_entries=64)
+
+
+def summarize_sites(frames, keyword_table):
+    # frames maps site -> analysis_results frame; all sites are summarized in one grouped pass
+    metrics = pd.concat([df[SUMMARY_COLUMNS].assign(Site=site) for site, df in frames.items()], ignore_index=True)
+    summary = metrics.groupby('Site', sort=False).agg(**SUMMARY_METRICS)
+    summary['Reading Time (min)'] = summary['Word Count'] / READING_WPM
+    coverage = keyword_table['frequency'].gt(0).groupby(keyword_table['site']).mean() * 100
+    summary['Keyword Coverage (%)'] = coverage.reindex(summary.index)
+    return summary
+
+
+def site_summaries(sites):
+    # Summaries are cached per site and per version of its data, so only sites whose
+    # exports changed (or were never seen) go through the grouped pass.
+    keyword_table = load_keyword_table()
+    frames = {site: load_dataset(SITES[site]['analysis_file'], columns=SUMMARY_COLUMNS) for site in sites}
+    # Sites without a scored page have nothing to summarize and are left out
+    frames = {site: df for site, df in frames.items() if df is not None and len(df)}
+    keyword_key = dataset_fingerprint(keyword_table)
+    keys = {site: (site, dataset_fingerprint(df), keyword_key) for site, df in frames.items()}
+
+    missing = {site: df for site, df in frames.items() if keys[site] not in _summaries}
+    if missing:
+        for site, row in summarize_sites(missing, keyword_table).iterrows():
+            _summaries.put(keys[site], row)
+    return pd.DataFrame([_summaries.get(keys[site]) for site in frames]).rename_axis('Site')
+
+
+def metrics_table(summary, metrics=('Word Count', 'Fog Index', 'Personal Pronouns', 'Reading Time (min)', 'Keyword Coverage (%)')):
+    return summary[list(metrics)].round(2).T.rename_axis('Metric').reset_index().rename_axis(None, axis=1)
+
+
+def keyword_leaders(keyword_table, sites):
+    # For each site, its top two keywords among those it mentions more than every other selected site
+    values = keyword_table[list(sites)]
+    leads = values.eq(values.max(axis=1), axis=0)
+    leads = leads[leads.sum(axis=1) == 1]
+    return {site: keyword_table.loc[leads.index[leads[site]]].nlargest(2, site)['Keyword'].tolist() for site in sites}
+
+
+def keyword_gaps(keyword_table, site, competitors):
+    # Keywords where the best competitor out-mentions the site, largest competitor count first
+    best = keyword_table[list(competitors)].max(axis=1)
+    gaps = keyword_table.assign(best=best)[best > keyword_table[site]]
+    return gaps.sort_values('best', ascending=False, kind='stable')['Keyword'].tolist()
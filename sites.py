@@ -0,0 +1,36 @@
+import os
+from corpus import CORPUS_DIR
+
+# Every site analysed by the dashboard. Adding a competitor only needs an entry here,
+# its Screaming Frog and analysis_results exports in Data and its pages under extracted_content/.
+PRIMARY_SITE = 'Splashtop'
+SITES = {
+    'Splashtop': {
+        'analysis_file': 'analysis_results11.csv',
+        'internal_file': 'internal_all.csv',
+        'inlinks_file': 'all_inlinks.csv',
+        'issues_file': 'issues_overview_report.csv',
+        'home_url': 'https://www.splashtop.com/',
+        'corpus': os.path.join(CORPUS_DIR, 'splashtop'),
+        'logo': 'https://www.splashtop.com/splashtop-logo-large.png',
+        'intro': "Welcome to the <b>Splashtop Content Analysis</b> web app! This web application is designed to analyze the content coverage of Splashtop's website around the phrase <b>“Remote Access”</b> and its related keywords.",
+    },
+    'AnyDesk': {
+        'analysis_file': 'analysis_results12.csv',
+        'internal_file': 'internal_all_anydesk.csv',
+        'inlinks_file': 'all_inlinks_anydesk.csv',
+        'issues_file': 'issues_overview_report_anydesk.csv',
+        'home_url': 'https://anydesk.com/en',
+        'corpus': os.path.join(CORPUS_DIR, 'anydesk'),
+        'logo': 'https://img.swapcard.com/?u=https%3A%2F%2Fcdn-api.swapcard.com%2Fpublic%2Fimages%2Fbac2e0339ab54511aaf8e3f7fe1e6269.png&q=0.8&m=fit&w=400&h=200',
+        'intro': "This page provides an in-depth analysis of <b>AnyDesk's</b> content, a major competitor to <b>Splashtop</b>, with a focus on <b>Remote Access</b> and related topics.",
+    },
+}
+
+
+def site_names():
+    return list(SITES)
+
+
+def site_slug(site):
+    return site.lower().replace(' ', '_')
@@ -0,0 +1,61 @@
+import os
+import sys
+import json
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from data_loader import DATA_DIR, snapshot_paths
+
+COMPRESSION = "zstd"
+
+
+def _to_arrow(df):
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Screaming Frog columns sometimes mix numbers and text; store those as strings
+        mixed = {col: df[col].astype('string') for col in df.columns if df[col].dtype == object}
+        return pa.Table.from_pandas(df.assign(**mixed), preserve_index=False)
+
+
+def convert_export(file_name, folder=DATA_DIR):
+    source = os.path.join(folder, file_name)
+    stat = os.stat(source)
+    df = pd.read_csv(source, on_bad_lines='skip')
+    table = _to_arrow(df)
+
+    parquet_path, schema_path = snapshot_paths(file_name, folder)
+    os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+    pq.write_table(table, parquet_path, compression=COMPRESSION)
+    schema = {
+        'source': file_name,
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'rows': table.num_rows,
+        'columns': {field.name: str(field.type) for field in table.schema},
+    }
+    with open(schema_path, 'w') as file:
+        json.dump(schema, file, indent=2)
+    return schema
+
+
+def convert_all(folder=DATA_DIR):
+    converted = {}
+    for file_name in sorted(os.listdir(folder)):
+        if not file_name.endswith('.csv'):
+            continue
+        try:
+            converted[file_name] = convert_export(file_name, folder)
+        except Exception as e:
+            print(f"Skipping {file_name}: {str(e)}")
+    return converted
+
+
+if __name__ == "__main__":
+    # python snapshot_store.py [file.csv ...]
+    if len(sys.argv) > 1:
+        results = {name: convert_export(name) for name in sys.argv[1:]}
+    else:
+        results = convert_all()
+    for name, schema in results.items():
+        print(f"{name}: {schema['rows']} rows, {len(schema['columns'])} columns")
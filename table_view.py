@@ -0,0 +1,147 @@
+import hashlib
+import sqlite3
+import threading
+import pandas as pd
+import streamlit as st
+from cache import LRUCache
+from figure_cache import dataset_fingerprint
+from profiler import section
+
+PAGE_SIZE = 50
+MAX_TABLES = 16
+MAX_RESULTS = 4
+# Indexed as soon as a frame is registered; other columns get an index the first time
+# someone sorts by them
+INDEXED_COLUMNS = ['Address', 'Status Code', 'Indexability']
+# Low-cardinality columns offered as value filters when present
+FILTER_COLUMNS = ['Status Code', 'Indexability', 'Issue Type', 'Issue Priority', 'Intent']
+# Set by export_report so headless renders get every row instead of one page
+FULL_TABLES_KEY = "table_view_full"
+
+# One database per process, shared by every session like the other caches. It is a
+# temporary on-disk database: SQLite only keeps its page cache in memory, so the copy of a
+# large export spills to a temp file instead of doubling the frame's memory.
+_conn = sqlite3.connect('', check_same_thread=False)
+_lock = threading.Lock()
+_tables = LRUCache(max_entries=MAX_TABLES)
+# Per-query frames (search results) churn quickly, so they get their own smaller LRU and
+# never push the dataset tables out
+_results = LRUCache(max_entries=MAX_RESULTS)
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _index(table, column):
+    _conn.execute(f'CREATE INDEX IF NOT EXISTS {_quote(f"{table}_{column}")} ON {table} ({_quote(column)})')
+
+
+def register(df, query_key=None):
+    # Copies the frame into SQLite once per distinct content and returns its table name.
+    # Per-query frames pass the inputs they were derived from as query_key instead, so they
+    # are not re-hashed on every rerun.
+    if query_key is None:
+        tables, key, prefix = _tables, dataset_fingerprint(df), 't'
+    else:
+        tables, key, prefix = _results, hashlib.blake2b(repr(query_key).encode(), digest_size=16).hexdigest(), 'q'
+    table = tables.get(key)
+    if table is not None:
+        return table
+    table = f"{prefix}_{key}"
+    with _lock, section(f"register table {len(df):,} rows"):
+        frame = df.reset_index(drop=True)
+        frame.columns = [str(column) for column in frame.columns]
+        frame.to_sql(table, _conn, index=True, index_label='_row', if_exists='replace')
+        for column in INDEXED_COLUMNS:
+            if column in frame:
+                _index(table, column)
+        tables.put(key, table)
+        # Drop the tables the LRUs have evicted
+        live = {name for _, name in _tables.items()} | {name for _, name in _results.items()}
+        for (name,) in _conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+            if name not in live:
+                _conn.execute(f'DROP TABLE {_quote(name)}')
+    return table
+
+
+def _on_table(df, query_key, function, *args):
+    # Another session can evict and drop the table between register() and the query, so a
+    # missing table is registered again rather than trusted
+    try:
+        return function(register(df, query_key), *args)
+    except sqlite3.OperationalError as error:
+        if 'no such table' not in str(error):
+            raise
+        return function(register(df, query_key), *args)
+
+
+def distinct_values(table, column, limit=200):
+    with _lock:
+        rows = _conn.execute(f'SELECT DISTINCT {_quote(column)} FROM {table} WHERE {_quote(column)} IS NOT NULL '
+                             f'ORDER BY 1 LIMIT {int(limit)}').fetchall()
+    return [value for (value,) in rows]
+
+
+def query_page(table, columns, filters=None, search=None, search_columns=(), sort=None, descending=False, page=1, page_size=PAGE_SIZE, any_of=()):
+    # Returns one page of rows and the number of rows matching the filters; any_of keeps
+    # rows where at least one of those boolean columns is true
+    clauses, params = [], []
+    if any_of:
+        clauses.append('(' + ' OR '.join(f'{_quote(column)} = 1' for column in any_of) + ')')
+    for column, values in (filters or {}).items():
+        if values:
+            clauses.append(f'{_quote(column)} IN ({", ".join("?" * len(values))})')
+            params.extend(values)
+    if search and search_columns:
+        # % and _ typed by the user are literal characters, not wildcards
+        pattern = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        clauses.append('(' + ' OR '.join(f"{_quote(column)} LIKE ? ESCAPE '\\'" for column in search_columns) + ')')
+        params.extend([f'%{pattern}%'] * len(search_columns))
+    where = f' WHERE {" AND ".join(clauses)}' if clauses else ''
+    order = f'{_quote(sort)} {"DESC" if descending else "ASC"}, _row' if sort else '_row'
+
+    with _lock:
+        if sort:
+            _index(table, sort)
+        total = _conn.execute(f'SELECT COUNT(*) FROM {table}{where}', params).fetchone()[0]
+        rows = _conn.execute(f'SELECT {", ".join(map(_quote, columns))} FROM {table}{where} ORDER BY {order} '
+                             f'LIMIT ? OFFSET ?', params + [page_size, (page - 1) * page_size]).fetchall()
+    return pd.DataFrame(rows, columns=columns), total
+
+
+def table_view(df, key, page_size=PAGE_SIZE, any_of=(), query_key=None):
+    # Drop-in for st.dataframe on large frames: filtering, sorting and paging run in SQLite
+    # and only the visible page of rows is sent to the browser. Pass any_of instead of a
+    # filtered copy, and for per-query frames a query_key naming the inputs they came from.
+    if st.session_state.get(FULL_TABLES_KEY):
+        st.dataframe(df[df[list(any_of)].any(axis=1)] if any_of else df, use_container_width=True, hide_index=True)
+        return
+    columns = [str(column) for column in df.columns]
+    text_columns = [str(column) for column in df.columns
+                    if not pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column])]
+    filter_columns = [column for column in FILTER_COLUMNS if column in columns]
+
+    controls = st.columns(2 + len(filter_columns))
+    search = controls[0].text_input("Search", key=f"{key}_search", placeholder=", ".join(text_columns[:3]))
+    sort = controls[1].selectbox("Sort by", ["(original order)"] + columns, key=f"{key}_sort")
+    filters = {}
+    for control, column in zip(controls[2:], filter_columns):
+        filters[column] = control.multiselect(column, _on_table(df, query_key, distinct_values, column), key=f"{key}_{column}", placeholder="All")
+    sort = None if sort == "(original order)" else sort
+    descending = st.toggle("Descending", key=f"{key}_descending") if sort else False
+
+    page = st.session_state.get(f"{key}_page", 1)
+    query = (columns, filters, search.strip(), text_columns, sort, descending)
+    rows, total = _on_table(df, query_key, query_page, *query, page, page_size, any_of)
+    pages = max(1, -(-total // page_size))
+    if page > pages:
+        # The filters shrank the result below the current page
+        page = st.session_state[f"{key}_page"] = pages
+        rows, total = _on_table(df, query_key, query_page, *query, page, page_size, any_of)
+
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+    col1, col2 = st.columns([1, 3])
+    col1.number_input("Page", min_value=1, max_value=pages, key=f"{key}_page")
+    first = (page - 1) * page_size + 1 if total else 0
+    col2.caption(f"Rows {first:,}–{min(page * page_size, total):,} of {total:,} (page {page} of {pages})")
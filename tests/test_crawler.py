@@ -0,0 +1,177 @@
+import os
+import sys
+import time
+import threading
+import pandas as pd
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from crawler import crawl, extract_corpus
+from incremental import incremental_extract, load_manifest
+
+
+class Site:
+    # Pages served by the fixture server: path -> (etag, html). Paths listed in
+    # `failures` answer 503 that many times before serving the page.
+    def __init__(self):
+        self.pages = {}
+        self.failures = {}
+        self.requests = []
+
+
+@pytest.fixture
+def server():
+    site = Site()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            site.requests.append((self.path, time.monotonic(), dict(self.headers)))
+            if site.failures.get(self.path):
+                site.failures[self.path] -= 1
+                self.send_response(503)
+                self.send_header('Retry-After', '0')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if self.path not in site.pages:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            etag, html = site.pages[self.path]
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            body = html.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    site.url = f"http://127.0.0.1:{httpd.server_port}"
+    yield site
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def page(text):
+    return f"<html><head><style>p {{}}</style></head><body><p>{text}</p><script>x = 1</script></body></html>"
+
+
+def test_retries_transient_errors(server):
+    server.pages['/flaky'] = ('"v1"', page("Remote desktop"))
+    server.failures['/flaky'] = 2
+
+    results, stats = crawl([server.url + '/flaky', server.url + '/missing'], retries=3, backoff=0.01)
+    by_path = {result['url'][len(server.url):]: result for result in results}
+
+    assert by_path['/flaky']['status'] == 200
+    assert by_path['/flaky']['error'] is None
+    # 404 is not retried and is reported as an error
+    assert by_path['/missing']['error'] == "HTTP 404"
+    assert stats.retries == 2
+    assert stats.requests == 4
+    assert (stats.pages, stats.errors) == (1, 1)
+
+
+def test_gives_up_after_retries(server):
+    server.pages['/down'] = ('"v1"', page("Remote desktop"))
+    server.failures['/down'] = 10
+
+    results, stats = crawl([server.url + '/down'], retries=2, backoff=0.01)
+
+    assert results[0]['status'] == 503
+    assert results[0]['error'] == "HTTP 503"
+    assert stats.requests == 3
+    assert stats.retries == 2
+
+
+def test_failing_callback_does_not_abort_crawl(server):
+    for i in range(4):
+        server.pages[f'/{i}'] = (f'"{i}"', page(f"Page {i}"))
+    handled = []
+
+    def on_result(result):
+        if result['url'].endswith('/1'):
+            raise OSError("No space left on device")
+        handled.append(result['url'])
+
+    _, stats = crawl([f"{server.url}/{i}" for i in range(4)], on_result=on_result, concurrency=2)
+
+    assert len(handled) == 3
+    assert stats.callback_errors == 1
+    assert stats.summary()['callback_errors'] == 1
+
+
+def test_extract_corpus_saves_by_url_id(server, tmp_path):
+    server.pages['/a'] = ('"a1"', page("Remote access"))
+    links = pd.DataFrame({'URL_ID': [7], 'URL': [server.url + '/a']})
+
+    saved, stats = extract_corpus(links, output_dir=str(tmp_path))
+
+    assert saved == [os.path.join(str(tmp_path), '7.txt')]
+    assert open(saved[0], encoding='utf-8').read() == "Remote access"
+
+
+def test_rate_limits_per_host(server):
+    for i in range(6):
+        server.pages[f'/{i}'] = (f'"{i}"', page(f"Page {i}"))
+
+    results, stats = crawl([f"{server.url}/{i}" for i in range(6)], concurrency=6, per_host_rate=20.0, burst=1)
+
+    assert stats.pages == 6
+    # One token up front, then one every 1/20 s for the remaining five requests
+    times = sorted(at for _, at, _ in server.requests)
+    assert times[-1] - times[0] >= 5 / 20 * 0.9
+
+
+def test_incremental_uses_etags(server, tmp_path):
+    server.pages['/a'] = ('"a1"', page("Remote access"))
+    server.pages['/b'] = ('"b1"', page("Remote support"))
+    links = pd.DataFrame({'URL_ID': [1, 2], 'URL': [server.url + '/a', server.url + '/b']})
+    output_dir = str(tmp_path)
+
+    report, _ = incremental_extract(links, output_dir=output_dir, backoff=0.01)
+    assert sorted(report['changed']) == ['1', '2']
+    assert open(os.path.join(output_dir, '1.txt'), encoding='utf-8').read() == "Remote access"
+    assert load_manifest(output_dir)[server.url + '/a']['etag'] == '"a1"'
+
+    # Second run sends If-None-Match and the server answers 304 for unchanged pages
+    server.pages['/b'] = ('"b2"', page("Remote support for teams"))
+    server.requests.clear()
+    report, stats = incremental_extract(links, output_dir=output_dir, backoff=0.01)
+
+    sent = {path: headers.get('If-None-Match') for path, _, headers in server.requests}
+    assert sent == {'/a': '"a1"', '/b': '"b1"'}
+    assert report['unchanged'] == ['1']
+    assert report['changed'] == ['2']
+    assert stats.not_modified == 1
+    assert open(os.path.join(output_dir, '2.txt'), encoding='utf-8').read() == "Remote support for teams"
+    assert load_manifest(output_dir)[server.url + '/b']['etag'] == '"b2"'
+
+
+def test_incremental_refetches_missing_documents(server, tmp_path):
+    server.pages['/a'] = ('"a1"', page("Remote access"))
+    links = pd.DataFrame({'URL_ID': [1], 'URL': [server.url + '/a']})
+    output_dir = str(tmp_path)
+
+    incremental_extract(links, output_dir=output_dir, backoff=0.01)
+    os.remove(os.path.join(output_dir, '1.txt'))
+    server.requests.clear()
+    report, _ = incremental_extract(links, output_dir=output_dir, backoff=0.01)
+
+    # Without the stored text a 304 would leave the page missing, so no validator is sent
+    assert server.requests[0][2].get('If-None-Match') is None
+    assert report['changed'] == ['1']
+    assert os.path.exists(os.path.join(output_dir, '1.txt'))
@@ -0,0 +1,246 @@
+import os
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from cache import LRUCache
+from corpus import document_ids, read_document, tokenize
+from data_loader import DATA_DIR
+from sites import PRIMARY_SITE, SITES
+
+TERMS_FILE = "topic_terms.npz"
+NGRAM_SIZES = (1, 2, 3)
+N_FEATURES = 1 << 20  # hashed vocabulary size; colliding n-grams share a column
+LABELED_TERMS = 5000  # most widespread n-grams per site that get their text recorded
+MIN_PAGES = 3
+MAX_DF = 0.8  # n-grams on more of a site's pages than this are navigation and footer text
+STOP_DF = 0.5  # words on more of all pages than this are function words; n-grams may not start or end with one
+PRIOR_SIZE = 10_000  # pseudo-counts of the log-odds Dirichlet prior
+METHODS = ['Log-odds', 'TF-IDF']
+
+_token_hashes = {}
+_terms = LRUCache(max_entries=2)
+_gaps = LRUCache(max_entries=16)
+
+
+def _ngram_hashes(tokens, size):
+    # Same multiply-xor mixing as near_duplicates.shingle_hashes, one hash per n-gram start
+    hashes = np.fromiter((_token_hashes.get(token) or _token_hashes.setdefault(token, zlib.crc32(token.encode()))
+                          for token in tokens), dtype=np.uint64, count=len(tokens))
+    ngrams = hashes[:len(hashes) - size + 1].copy()
+    with np.errstate(over='ignore'):
+        for offset in range(1, size):
+            ngrams = ngrams * np.uint64(0x100000001B3) ^ hashes[offset:len(hashes) - size + 1 + offset]
+    return ngrams
+
+
+def _buckets(hashes):
+    return ((hashes ^ (hashes >> np.uint64(32))) % np.uint64(N_FEATURES)).astype(np.int64)
+
+
+def ngram_buckets(tokens, sizes=NGRAM_SIZES):
+    return np.concatenate([_buckets(_ngram_hashes(tokens, size)) for size in sizes if len(tokens) >= size] or [np.empty(0, dtype=np.int64)])
+
+
+def document_term_matrix(folder, url_ids):
+    # Sparse pages x N_FEATURES matrix of 1-3-gram counts
+    rows, columns = [], []
+    for row, url_id in enumerate(url_ids):
+        buckets = ngram_buckets(tokenize(read_document(folder, url_id)))
+        rows.append(np.full(len(buckets), row, dtype=np.int64))
+        columns.append(buckets)
+    rows, columns = np.concatenate(rows or [[]]).astype(np.int64), np.concatenate(columns or [[]]).astype(np.int64)
+    return sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, columns)), shape=(len(url_ids), N_FEATURES))
+
+
+def _document_term_matrix(batch):
+    return document_term_matrix(*batch)
+
+
+def iter_matrices(folder, url_ids, processes=None, batch_size=256):
+    batches = [(folder, url_ids[i:i + batch_size]) for i in range(0, len(url_ids), batch_size)]
+    if processes == 1 or len(batches) <= 1:
+        yield from map(_document_term_matrix, batches)
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            yield from pool.map(_document_term_matrix, batches)
+
+
+def site_terms(folder, processes=None):
+    # Streams a site's pages through document_term_matrix in batches and keeps only the
+    # column totals, so memory stays at a few N_FEATURES vectors whatever the page count
+    url_ids = document_ids(folder)
+    totals = {'docs': len(url_ids), 'counts': np.zeros(N_FEATURES), 'pages': np.zeros(N_FEATURES), 'tf': np.zeros(N_FEATURES)}
+    for matrix in iter_matrices(folder, url_ids, processes):
+        row_totals = np.asarray(matrix.sum(axis=1)).ravel()
+        totals['counts'] += np.bincount(matrix.indices, weights=matrix.data, minlength=N_FEATURES)
+        totals['pages'] += np.bincount(matrix.indices, minlength=N_FEATURES)
+        # Relative frequency of each n-gram within its page, summed over pages
+        totals['tf'] += np.bincount(matrix.indices, weights=matrix.data / np.repeat(np.maximum(row_totals, 1), np.diff(matrix.indptr)),
+                                    minlength=N_FEATURES)
+    return totals
+
+
+def label_buckets(folder, buckets):
+    # Second pass: the text of the first n-gram seen in each wanted column, reading pages
+    # only until every column is resolved
+    wanted, labels = np.unique(np.asarray(buckets, dtype=np.int64)), {}
+    for url_id in document_ids(folder):
+        tokens = tokenize(read_document(folder, url_id))
+        for size in NGRAM_SIZES:
+            if len(tokens) < size:
+                continue
+            found = _buckets(_ngram_hashes(tokens, size))
+            for start in np.flatnonzero(np.isin(found, wanted)):
+                labels.setdefault(int(found[start]), ' '.join(tokens[start:start + size]))
+            wanted = wanted[~np.isin(wanted, found)]
+        if not len(wanted):
+            break
+    return labels
+
+
+def build_terms(site_corpora, processes=None):
+    # Column totals per site plus the text of each site's most widespread n-grams
+    sites, labels = {}, {}
+    for site, folder in site_corpora.items():
+        totals = site_terms(folder, processes)
+        if not totals['docs']:
+            continue
+        pages = np.where(totals['pages'] <= MAX_DF * totals['docs'], totals['pages'], 0)
+        top = np.argsort(pages, kind='stable')[::-1][:LABELED_TERMS]
+        top = top[pages[top] >= MIN_PAGES]
+        labels.update(label_buckets(folder, [bucket for bucket in top if bucket not in labels]))
+        sites[site] = totals
+    return sites, labels
+
+
+def save_terms(sites, labels, path=os.path.join(DATA_DIR, TERMS_FILE)):
+    # Only nonzero columns are stored
+    arrays = {'sites': np.array(list(sites), dtype=str),
+              'label_buckets': np.array(list(labels), dtype=np.int64), 'label_terms': np.array(list(labels.values()), dtype=str)}
+    for number, totals in enumerate(sites.values()):
+        nonzero = np.flatnonzero(totals['pages'])
+        arrays.update({f'p{number}_docs': np.array(totals['docs']), f'p{number}_buckets': nonzero,
+                       f'p{number}_counts': totals['counts'][nonzero].astype(np.float32),
+                       f'p{number}_pages': totals['pages'][nonzero].astype(np.int32),
+                       f'p{number}_tf': totals['tf'][nonzero].astype(np.float32)})
+    with open(path + '.tmp', 'wb') as file:
+        np.savez_compressed(file, **arrays)
+    os.replace(path + '.tmp', path)
+
+
+def load_terms(folder=DATA_DIR):
+    # Cached on the file version like inverted_index.load_index; None until `python topic_gap.py` has run
+    path = os.path.abspath(os.path.join(folder, TERMS_FILE))
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    terms = _terms.get(key)
+    if terms is None:
+        sites = {}
+        with np.load(path) as data:
+            for number, site in enumerate(data['sites']):
+                totals = {'docs': int(data[f'p{number}_docs'])}
+                for field in ('counts', 'pages', 'tf'):
+                    totals[field] = np.zeros(N_FEATURES)
+                    totals[field][data[f'p{number}_buckets']] = data[f'p{number}_{field}']
+                sites[str(site)] = totals
+            labels = pd.Series(data['label_terms'].astype(object), index=data['label_buckets'])
+        # Columns of each label's first and last word, for the function word check
+        words = labels.str.split()
+        edges = np.stack([_buckets(_ngram_hashes(words.str[0].tolist(), 1)), _buckets(_ngram_hashes(words.str[-1].tolist(), 1))], axis=1)
+        terms = _terms.put(key, {'key': key, 'sites': sites, 'labels': labels, 'edges': edges.reshape(-1, 2)})
+    return terms
+
+
+def _log_odds(focus, rivals, focus_total, rival_total, background):
+    # z-scored log-odds ratio with an informative Dirichlet prior (Monroe et al., "Fightin'
+    # Words"); positive when the rivals use a term more than the focus site. background is
+    # each term's share of all n-grams.
+    alpha = PRIOR_SIZE * background
+    rival_odds = np.log(rivals + alpha) - np.log(rival_total + PRIOR_SIZE - rivals - alpha)
+    focus_odds = np.log(focus + alpha) - np.log(focus_total + PRIOR_SIZE - focus - alpha)
+    return (rival_odds - focus_odds) / np.sqrt(1 / (rivals + alpha) + 1 / (focus + alpha))
+
+
+def _tfidf_difference(focus_tf, focus_docs, rival_tf, rival_docs, pages):
+    # Difference in average share of a page's n-grams (%), weighted by idf over every site's pages
+    idf = np.log((1 + focus_docs + rival_docs) / (1 + pages)) + 1
+    return idf * (rival_tf / max(rival_docs, 1) - focus_tf / max(focus_docs, 1)) * 100
+
+
+def _drop_subphrases(terms, rival_pages):
+    # "unattended" is only news if it shows up outside "unattended access setup", so a
+    # term is dropped when a longer listed term contains it on nearly as many pages
+    padded = [f' {term} ' for term in terms]
+    keep = np.ones(len(terms), dtype=bool)
+    for i, term in enumerate(padded):
+        for j, other in enumerate(padded):
+            if i != j and len(other) > len(term) and term in other and rival_pages[j] >= 0.9 * rival_pages[i]:
+                keep[i] = False
+                break
+    return keep
+
+
+def topic_gaps(terms, focus=PRIMARY_SITE, rivals=None, method='Log-odds', top=25):
+    # N-grams the rival sites cover on many more pages than the focus site
+    rivals = [site for site in (rivals or terms['sites']) if site != focus and site in terms['sites']]
+    key = (terms['key'], focus, tuple(rivals), method, top)
+    gaps = _gaps.get(key)
+    if gaps is not None:
+        return gaps
+    own = terms['sites'][focus]
+    pooled = {field: sum(terms['sites'][site][field] for site in rivals) for field in ('counts', 'pages', 'tf')}
+    rival_docs = sum(terms['sites'][site]['docs'] for site in rivals)
+    all_pages = own['pages'] + pooled['pages']
+    all_docs = own['docs'] + rival_docs
+
+    labels = terms['labels']
+    buckets = labels.index.to_numpy()
+    # Brand names would top every list, and boilerplate on most of a site's pages says
+    # nothing about topics
+    brands = {token for site in [focus] + rivals for token in tokenize(site)}
+    keep = ~labels.str.split().map(lambda tokens: bool(brands.intersection(tokens))).to_numpy()
+    keep &= (pooled['pages'][buckets] >= MIN_PAGES) & (pooled['pages'][buckets] <= MAX_DF * rival_docs)
+    keep &= own['pages'][buckets] <= MAX_DF * own['docs']
+    keep &= (all_pages[terms['edges']] <= STOP_DF * all_docs).all(axis=1)
+    buckets = buckets[keep]
+
+    if method == 'TF-IDF':
+        scores = _tfidf_difference(own['tf'][buckets], own['docs'], pooled['tf'][buckets], rival_docs, all_pages[buckets])
+    else:
+        totals = own['counts'] + pooled['counts']
+        scores = _log_odds(own['counts'][buckets], pooled['counts'][buckets], own['counts'].sum(), pooled['counts'].sum(),
+                           totals[buckets] / totals.sum())
+    # Sub-phrases are folded among a few times more candidates than are shown
+    order = np.argsort(-scores, kind='stable')[:top * 4]
+    order = order[scores[order] > 0]
+    order = order[_drop_subphrases(labels.loc[buckets[order]].tolist(), pooled['pages'][buckets[order]])][:top]
+    buckets = buckets[order]
+    gaps = pd.DataFrame({
+        'Term': labels.loc[buckets].to_numpy(),
+        f'{focus} Pages (%)': (own['pages'][buckets] / max(own['docs'], 1) * 100).round(1),
+        'Rival Pages (%)': (pooled['pages'][buckets] / max(rival_docs, 1) * 100).round(1),
+        f'{focus} Mentions': own['counts'][buckets].astype(int),
+        'Rival Mentions': pooled['counts'][buckets].astype(int),
+        'Score': scores[order].round(3),
+    })
+    return _gaps.put(key, gaps)
+
+
+if __name__ == "__main__":
+    # python topic_gap.py [focus site]
+    focus = sys.argv[1] if len(sys.argv) > 1 else PRIMARY_SITE
+    sites, labels = build_terms({site: config['corpus'] for site, config in SITES.items()})
+    if not sites:
+        sys.exit("No extracted pages found; run the crawler first")
+    save_terms(sites, labels)
+    for site, totals in sites.items():
+        print(f"{site}: {totals['docs']} pages, {np.count_nonzero(totals['pages']):,} distinct n-gram columns")
+    terms = load_terms()
+    if focus in terms['sites']:
+        print(topic_gaps(terms, focus).to_string(index=False))
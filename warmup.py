@@ -0,0 +1,120 @@
+import os
+import time
+import pickle
+import hashlib
+import importlib
+
+BUNDLE_PREFIX = "warmup_"
+# Process-wide caches filled while a page renders. Figures are left out: unpickling a
+# plotly figure re-validates every property, which takes longer than building it again
+CACHES = [
+    ('data_loader', '_cache'),
+    ('ingest', '_pages'),
+    ('issues_cube', '_cubes'),
+    ('keywords', '_tables'),
+    ('site_comparison', '_summaries'),
+    ('keyword_gap', '_gaps'),
+    ('link_graph', '_graphs'),
+    ('crawl_diff', '_diffs'),
+]
+
+_seeded = set()
+_code_version = None
+
+
+def _data_dir(folder):
+    # data_loader pulls in pandas and pyarrow, so app.py only pays for it once a page needs data
+    if folder is None:
+        from data_loader import DATA_DIR
+        folder = DATA_DIR
+    return folder
+
+
+def bundle_path(page, folder=None):
+    return os.path.join(_data_dir(folder), f"{BUNDLE_PREFIX}{page}.pkl")
+
+
+def code_version():
+    # Digest of the app's modules: a bundle built by another checkout may hold aggregates
+    # with different shapes or columns, or classes that no longer exist
+    global _code_version
+    if _code_version is None:
+        here = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.blake2b(digest_size=16)
+        for file_name in sorted(os.listdir(here)):
+            if file_name.endswith('.py'):
+                digest.update(file_name.encode())
+                with open(os.path.join(here, file_name), 'rb') as file:
+                    digest.update(file.read())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+def data_manifest(folder=None):
+    # A bundle is only valid for exactly these files and this code. The cached keys hold
+    # absolute paths, so a bundle moved with its folder could never hit and is rebuilt.
+    folder = os.path.abspath(_data_dir(folder))
+    manifest = {'folder': folder, 'code': code_version()}
+    for file_name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, file_name)
+        if os.path.isfile(path) and not file_name.startswith(BUNDLE_PREFIX):
+            stat = os.stat(path)
+            manifest[file_name] = (stat.st_mtime_ns, stat.st_size)
+    return manifest
+
+
+def _caches():
+    return {(module, attribute): getattr(importlib.import_module(module), attribute) for module, attribute in CACHES}
+
+
+def build_bundles(views=None):
+    # Renders every view of a page headlessly, starting from empty caches, and pickles
+    # what the page cached into one file per page, so a worker only reads what its page needs
+    from export_report import report_views, run_view
+    views = report_views() if views is None else views
+    manifest = data_manifest()
+    paths = []
+    for page in dict.fromkeys(view[1] for view in views):
+        for cache in _caches().values():
+            cache.clear()
+        for _, view_page, _, state in views:
+            if view_page == page:
+                run_view(page, state)
+        # Only caches the page used, so loading it imports nothing the page doesn't
+        bundle = {'manifest': manifest, 'caches': {key: cache.items() for key, cache in _caches().items() if len(cache)}}
+        path = bundle_path(page)
+        with open(path + '.tmp', 'wb') as file:
+            pickle.dump(bundle, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+        paths.append(path)
+    return paths
+
+
+def load_bundle(page, folder=None):
+    # Seeds the caches with the page's bundle once per process, after the page module is
+    # imported. A missing or stale bundle is ignored and the page loads its data as usual.
+    if page in _seeded:
+        return False
+    _seeded.add(page)
+    try:
+        with open(bundle_path(page, folder), 'rb') as file:
+            bundle = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        # AttributeError and ImportError: the bundle pickled a class or module that was renamed
+        return False
+    if not isinstance(bundle, dict) or bundle.get('manifest') != data_manifest(folder):
+        return False
+    for (module, attribute), items in bundle['caches'].items():
+        cache = getattr(importlib.import_module(module), attribute)
+        for key, value in items:
+            if key not in cache:
+                cache.put(key, value)
+    return True
+
+
+if __name__ == "__main__":
+    # python warmup.py; run again whenever the exports in Data change
+    start = time.perf_counter()
+    for path in build_bundles():
+        print(f"Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+    print(f"Built warm-up bundles in {time.perf_counter() - start:.1f}s")